@@ -0,0 +1,56 @@
+"""
+Stock de almacen: cambios relativos sobre almacen_items.stock_actual.
+
+Nunca se escribe el valor leido por la sesion: cada cambio es un UPDATE
+relativo y los descuentos llevan la condicion de stock en el mismo UPDATE,
+asi dos tecnicos que sacan las ultimas unidades a la vez no pueden dejar
+el stock en negativo.
+"""
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.app.models.almacen_item import AlmacenItem
+
+
+def _mover(db: Session, item_id: int, cantidad: float, minimo: float | None = None) -> bool:
+    stock = func.coalesce(AlmacenItem.stock_actual, 0.0)
+    query = db.query(AlmacenItem).filter(AlmacenItem.id == item_id)
+    if minimo is not None:
+        query = query.filter(stock >= minimo)
+    return query.update({AlmacenItem.stock_actual: stock + cantidad}, synchronize_session=False) > 0
+
+
+def _expirar(db: Session, item: AlmacenItem):
+    if item in db:
+        db.expire(item, ["stock_actual"])
+
+
+def descontar_stock(db: Session, item: AlmacenItem, cantidad: float) -> bool:
+    """
+    UPDATE ... SET stock_actual = stock_actual - cantidad WHERE id = ? AND
+    stock_actual >= cantidad. Devuelve False (sin cambiar nada) si no alcanza.
+    """
+    aplicado = _mover(db, item.id, -cantidad, minimo=cantidad)
+    _expirar(db, item)
+    return aplicado
+
+
+def sumar_stock(db: Session, item: AlmacenItem, cantidad: float):
+    """Suma cantidad al stock, sin condicion."""
+    _mover(db, item.id, cantidad)
+    _expirar(db, item)
+
+
+def ajustar_stock(db: Session, item: AlmacenItem, diferencia: float):
+    """
+    Aplica una diferencia: si es positiva se descuenta (con la condicion de
+    stock) y si es negativa se suma. Lanza HTTPException 400 si no
+    alcanza.
+    """
+    if diferencia > 0:
+        if not descontar_stock(db, item, diferencia):
+            raise HTTPException(status_code=400, detail="Stock insuficiente")
+    elif diferencia < 0:
+        sumar_stock(db, item, -diferencia)
@@ -0,0 +1,128 @@
+"""
+Libro de caja: registro de movimientos y saldo incremental.
+"""
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from backend.app.models.caja import Caja
+from backend.app.models.movimiento_caja import CategoriaMovimiento, MovimientoCaja
+
+
+TIPOS_MOVIMIENTO = ("ingreso", "egreso")
+
+
+def registrar_movimiento_caja(db: Session, caja: Caja, tipo: str, monto: float, **campos):
+    """
+    Crea un MovimientoCaja y aplica su monto a los acumulados de la caja
+    dentro de la misma transaccion de la sesion.
+    """
+    if tipo not in TIPOS_MOVIMIENTO:
+        raise ValueError(f"Tipo de movimiento invalido: {tipo}")
+
+    categoria = CategoriaMovimiento(campos.pop("categoria", CategoriaMovimiento.MANUAL))
+    movimiento = MovimientoCaja(
+        caja_id=caja.id,
+        tipo=tipo,
+        categoria=categoria.value,
+        monto=monto,
+        **campos
+    )
+    db.add(movimiento)
+    _aplicar_a_caja(db, caja, tipo, monto or 0.0)
+    return movimiento
+
+
+def _aplicar_a_caja(db: Session, caja: Caja, tipo: str, monto: float):
+    # UPDATE relativo al valor almacenado: no depende de lo que la sesion
+    # haya leido antes, asi que no se pierden incrementos concurrentes.
+    if tipo == "ingreso":
+        valores = {
+            Caja.total_ingresos: func.coalesce(Caja.total_ingresos, 0.0) + monto,
+            Caja.saldo_final: func.coalesce(Caja.saldo_final, 0.0) + monto,
+        }
+    else:
+        valores = {
+            Caja.total_egresos: func.coalesce(Caja.total_egresos, 0.0) + monto,
+            Caja.saldo_final: func.coalesce(Caja.saldo_final, 0.0) - monto,
+        }
+    db.query(Caja).filter(Caja.id == caja.id).update(valores, synchronize_session=False)
+    db.expire(caja, ["total_ingresos", "total_egresos", "saldo_final"])
+
+
+def calcular_totales_caja(db: Session, caja_id: int):
+    """
+    Recalcula desde cero los ingresos y egresos de una caja en una sola
+    lectura agrupada sobre movimientos_caja.
+    """
+    totales = db.query(
+        func.coalesce(func.sum(case(
+            (MovimientoCaja.tipo == "ingreso", MovimientoCaja.monto), else_=0.0
+        )), 0.0).label("ingresos"),
+        func.coalesce(func.sum(case(
+            (MovimientoCaja.tipo == "egreso", MovimientoCaja.monto), else_=0.0
+        )), 0.0).label("egresos"),
+        func.count(MovimientoCaja.id).label("movimientos")
+    ).filter(MovimientoCaja.caja_id == caja_id).one()
+    return float(totales.ingresos), float(totales.egresos), int(totales.movimientos)
+
+
+def verificar_caja(db: Session, caja: Caja, corregir: bool = False, tolerancia: float = 0.01):
+    """
+    Compara los acumulados guardados con el recalculo completo y reporta
+    la diferencia. Con corregir=True reemplaza los acumulados por el recalculo.
+    """
+    ingresos, egresos, movimientos = calcular_totales_caja(db, caja.id)
+    saldo_calculado = (caja.saldo_inicial or 0.0) + ingresos - egresos
+
+    guardado_ingresos = caja.total_ingresos or 0.0
+    guardado_egresos = caja.total_egresos or 0.0
+    guardado_saldo = caja.saldo_final or 0.0
+
+    diferencias = {
+        "ingresos": guardado_ingresos - ingresos,
+        "egresos": guardado_egresos - egresos,
+        "saldo": guardado_saldo - saldo_calculado if caja.estado == "abierta" else 0.0,
+    }
+    consistente = all(abs(valor) <= tolerancia for valor in diferencias.values())
+
+    corregida = False
+    if corregir and not consistente:
+        caja.total_ingresos = ingresos
+        caja.total_egresos = egresos
+        if caja.estado == "abierta":
+            caja.saldo_final = saldo_calculado
+        corregida = True
+
+    return {
+        "caja_id": caja.id,
+        "estado": caja.estado,
+        "movimientos": movimientos,
+        "guardado": {
+            "ingresos": guardado_ingresos,
+            "egresos": guardado_egresos,
+            "saldo": guardado_saldo,
+        },
+        "calculado": {
+            "ingresos": ingresos,
+            "egresos": egresos,
+            "saldo": saldo_calculado,
+        },
+        "diferencias": diferencias,
+        "consistente": consistente,
+        "corregida": corregida,
+    }
+
+
+def posicion_orden(db: Session, orden_id: int):
+    """
+    Neto por categoria de los movimientos de una orden, en una sola lectura
+    agrupada sobre el indice (orden_id, categoria).
+    """
+    filas = db.query(
+        MovimientoCaja.categoria,
+        func.coalesce(func.sum(MovimientoCaja.monto), 0.0)
+    ).filter(
+        MovimientoCaja.orden_id == orden_id
+    ).group_by(MovimientoCaja.categoria).all()
+    return {categoria: float(total) for categoria, total in filas}
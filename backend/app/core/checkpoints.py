@@ -0,0 +1,68 @@
+"""
+Checkpoints del WAL de SQLite.
+
+Con journal_mode=WAL las escrituras van primero al archivo medinautos.db-wal
+y un checkpoint las pasa a la base. Un hilo hace uno PASSIVE (no espera a
+nadie) cada INTERVALO_CHECKPOINT segundos para que el WAL no crezca, y al
+apagar la aplicacion run_medinautos.py hace uno FULL, que deja todo en
+medinautos.db.
+"""
+
+import threading
+
+from sqlalchemy import text
+
+from backend.app.core.database import engine
+
+
+INTERVALO_CHECKPOINT = 300
+MODOS = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+_parar = threading.Event()
+_hilo = None
+
+
+def checkpoint(modo: str = "PASSIVE", motor=None):
+    """
+    Ejecuta PRAGMA wal_checkpoint. Devuelve (ocupado, paginas_wal,
+    paginas_copiadas); ocupado=1 si algun lector o escritor lo impidio.
+    """
+    modo = modo.upper()
+    if modo not in MODOS:
+        raise ValueError(f"Modo de checkpoint invalido: {modo}")
+    with (motor or engine).connect() as conn:
+        fila = conn.execute(text(f"PRAGMA wal_checkpoint({modo})")).first()
+        conn.commit()
+    return tuple(fila) if fila else None
+
+
+def _checkpoints_periodicos():
+    while not _parar.wait(INTERVALO_CHECKPOINT):
+        try:
+            checkpoint("PASSIVE")
+        except Exception:
+            pass
+
+
+def iniciar_checkpoints():
+    global _hilo
+    if _hilo is not None and _hilo.is_alive():
+        return
+    _parar.clear()
+    _hilo = threading.Thread(target=_checkpoints_periodicos, name="wal-checkpoint", daemon=True)
+    _hilo.start()
+
+
+def detener_checkpoints():
+    _parar.set()
+
+
+def cerrar_base(modo: str = "FULL"):
+    """
+    Para el hilo, pasa todo el WAL a la base y cierra las conexiones.
+    """
+    detener_checkpoints()
+    try:
+        return checkpoint(modo)
+    finally:
+        engine.dispose()
@@ -0,0 +1,281 @@
+"""
+Datos del dashboard: calculo con consultas agrupadas y snapshot en memoria.
+
+El snapshot se reutiliza entre solicitudes hasta que cambie algo que el
+dashboard muestra (ordenes, caja, vehiculos, clientes, tecnicos, alertas) o
+hasta que cambie el dia. La invalidacion se dispara al confirmar la
+transaccion, desde los eventos de la sesion, para no depender de que cada
+ruta se acuerde de hacerlo.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from itertools import chain
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, joinedload
+
+from backend.app.core.caja import TIPOS_MOVIMIENTO
+from backend.app.core.database import SessionLocal
+from backend.app.core.etag import calcular_etag, serializar_json
+from backend.app.core.eventos import publicar
+from backend.app.models.alerta_mantenimiento import AlertaMantenimiento
+from backend.app.models.cliente import Cliente
+from backend.app.models.detalle_orden import DetalleOrden
+from backend.app.models.mecanico import Mecanico
+from backend.app.models.movimiento_caja import MovimientoCaja
+from backend.app.models.orden_trabajo import OrdenTrabajo
+from backend.app.models.servicio import Servicio
+from backend.app.models.vehiculo import Vehiculo
+
+
+MODELOS_DASHBOARD = (
+    Cliente,
+    Vehiculo,
+    Mecanico,
+    OrdenTrabajo,
+    DetalleOrden,
+    Servicio,
+    MovimientoCaja,
+    AlertaMantenimiento,
+)
+
+_bloqueo = threading.Lock()
+_generacion = 0
+_snapshot = None
+
+
+# ======================================================
+# CALCULO
+# ======================================================
+
+def _cumpleanios(db: Session, hoy: date):
+    cumple_hoy = []
+    cumple_proximos = []
+    tecnicos = db.query(Mecanico).filter(Mecanico.fecha_nacimiento.isnot(None)).all()
+    for tecnico in tecnicos:
+        fecha = tecnico.fecha_nacimiento
+        cumple_este_anio = fecha.replace(year=hoy.year)
+        if cumple_este_anio < hoy:
+            cumple_este_anio = fecha.replace(year=hoy.year + 1)
+
+        dias = (cumple_este_anio - hoy).days
+        data = {
+            "id": tecnico.id,
+            "nombre": f"{tecnico.nombres} {tecnico.apellidos}".strip(),
+            "telefono": tecnico.telefono,
+            "fecha": cumple_este_anio.isoformat()
+        }
+        if dias == 0:
+            cumple_hoy.append(data)
+        elif 0 < dias <= 7:
+            cumple_proximos.append(data)
+    return cumple_hoy, cumple_proximos
+
+
+def _alertas(db: Session):
+    """
+    Lee el estado precalculado en alertas_mantenimiento (core/novedades).
+    """
+    alertas_proximas_total = db.query(func.count(AlertaMantenimiento.id)).filter(
+        AlertaMantenimiento.estado == "proximo"
+    ).scalar()
+
+    # regla_id mantiene las filas distintas: Query deduplica con joinedload.
+    filas = db.query(AlertaMantenimiento.regla_id, Vehiculo).join(
+        Vehiculo, Vehiculo.id == AlertaMantenimiento.vehiculo_id
+    ).options(
+        joinedload(Vehiculo.cliente)
+    ).filter(
+        AlertaMantenimiento.estado == "vencido"
+    ).order_by(Vehiculo.id.asc(), AlertaMantenimiento.regla_id.asc()).all()
+
+    alertas_vencidas = []
+    alertas_vencidas_map = {}
+    for _, vehiculo in filas:
+        if vehiculo.id not in alertas_vencidas_map:
+            cliente = vehiculo.cliente
+            alerta = {
+                "vehiculo_id": vehiculo.id,
+                "placa": vehiculo.placa,
+                "cliente": cliente.nombre if cliente else "-",
+                "telefono": cliente.telefono if cliente and cliente.telefono else "-",
+                "total": 1
+            }
+            alertas_vencidas_map[vehiculo.id] = alerta
+            alertas_vencidas.append(alerta)
+        else:
+            alertas_vencidas_map[vehiculo.id]["total"] += 1
+    return alertas_vencidas, alertas_proximas_total
+
+
+def calcular_dashboard(db: Session, hoy: date | None = None):
+    hoy = hoy or date.today()
+    inicio_hoy = datetime.combine(hoy, datetime.min.time())
+
+    cumple_hoy, cumple_proximos = _cumpleanios(db, hoy)
+    alertas_vencidas, alertas_proximas_total = _alertas(db)
+
+    clientes, vehiculos = db.query(
+        select(func.count(Cliente.id)).scalar_subquery(),
+        select(func.count(Vehiculo.id)).scalar_subquery()
+    ).one()
+
+    ordenes = {"abierta": 0, "en_proceso": 0, "cerrada": 0, "cancelada": 0}
+    ordenes_total = 0
+    for estado, cantidad in db.query(
+        OrdenTrabajo.estado, func.count(OrdenTrabajo.id)
+    ).group_by(OrdenTrabajo.estado):
+        ordenes_total += cantidad
+        if estado in ordenes:
+            ordenes[estado] = cantidad
+
+    inicio_mes = inicio_hoy.replace(day=1)
+    totales_mes = dict(db.query(
+        MovimientoCaja.tipo, func.coalesce(func.sum(MovimientoCaja.monto), 0)
+    ).filter(
+        MovimientoCaja.tipo.in_(TIPOS_MOVIMIENTO),
+        MovimientoCaja.fecha >= inicio_mes
+    ).group_by(MovimientoCaja.tipo).all())
+    ingresos_mes = float(totales_mes.get("ingreso") or 0)
+    egresos_mes = float(totales_mes.get("egreso") or 0)
+
+    inicio_semana = inicio_hoy - timedelta(days=6)
+    semana = {}
+    for dia, tipo, total in db.query(
+        func.date(MovimientoCaja.fecha),
+        MovimientoCaja.tipo,
+        func.coalesce(func.sum(MovimientoCaja.monto), 0)
+    ).filter(
+        MovimientoCaja.tipo.in_(TIPOS_MOVIMIENTO),
+        MovimientoCaja.fecha >= inicio_semana
+    ).group_by(func.date(MovimientoCaja.fecha), MovimientoCaja.tipo):
+        semana[(str(dia), tipo)] = float(total or 0)
+
+    ingresos_semana = []
+    for offset in range(6, -1, -1):
+        key = (hoy - timedelta(days=offset)).isoformat()
+        ingresos_semana.append({
+            "dia": key,
+            "ingresos": semana.get((key, "ingreso"), 0),
+            "egresos": semana.get((key, "egreso"), 0)
+        })
+
+    top_servicios = [
+        {
+            "nombre": row.nombre,
+            "total": float(row.total or 0),
+            "cantidad": int(row.cantidad or 0)
+        }
+        for row in db.query(
+            Servicio.nombre.label("nombre"),
+            func.sum(DetalleOrden.subtotal).label("total"),
+            func.sum(DetalleOrden.cantidad).label("cantidad")
+        ).join(DetalleOrden, DetalleOrden.servicio_id == Servicio.id).group_by(
+            Servicio.id
+        ).order_by(func.sum(DetalleOrden.subtotal).desc()).limit(5)
+    ]
+
+    return {
+        "clientes": clientes,
+        "vehiculos": vehiculos,
+        "ordenes_total": ordenes_total,
+        "ordenes_abiertas": ordenes["abierta"],
+        "ordenes_proceso": ordenes["en_proceso"],
+        "ordenes_cerradas": ordenes["cerrada"],
+        "ordenes_canceladas": ordenes["cancelada"],
+        "ingresos_mes": ingresos_mes,
+        "egresos_mes": egresos_mes,
+        "utilidad_mes": ingresos_mes - egresos_mes,
+        "ingresos_semana": ingresos_semana,
+        "top_servicios": top_servicios,
+        "cumple_hoy": cumple_hoy,
+        "cumple_proximos": cumple_proximos,
+        "cumple_hoy_total": len(cumple_hoy),
+        "cumple_proximos_total": len(cumple_proximos),
+        "alertas_vencidas": alertas_vencidas,
+        "alertas_vencidas_total": sum(item["total"] for item in alertas_vencidas),
+        "alertas_proximas_total": alertas_proximas_total,
+        "estado": "Operativo"
+    }
+
+
+# ======================================================
+# SNAPSHOT
+# ======================================================
+
+def obtener_snapshot(db: Session):
+    """
+    Devuelve (contenido_json, etag) del dashboard, recalculando solo si hubo
+    cambios desde el ultimo calculo o si cambio el dia.
+    """
+    global _snapshot
+    hoy = date.today()
+    snapshot = _snapshot
+    if snapshot and snapshot["generacion"] == _generacion and snapshot["fecha"] == hoy:
+        return snapshot["contenido"], snapshot["etag"]
+
+    with _bloqueo:
+        # Otra solicitud pudo recalcular mientras se esperaba el bloqueo.
+        snapshot = _snapshot
+        if snapshot and snapshot["generacion"] == _generacion and snapshot["fecha"] == hoy:
+            return snapshot["contenido"], snapshot["etag"]
+
+        # Si hay una escritura durante el calculo, la generacion avanza y
+        # este snapshot nace vencido: la siguiente solicitud recalcula.
+        generacion = _generacion
+        contenido = serializar_json(calcular_dashboard(db, hoy))
+        _snapshot = {
+            "generacion": generacion,
+            "fecha": hoy,
+            "contenido": contenido,
+            "etag": calcular_etag(contenido),
+        }
+        return contenido, _snapshot["etag"]
+
+
+def invalidar_dashboard():
+    global _generacion
+    _generacion += 1
+    publicar("dashboard")
+
+
+# ======================================================
+# INVALIDACION POR ESCRITURAS
+# ======================================================
+
+def _afecta_dashboard(objetos) -> bool:
+    return any(isinstance(objeto, MODELOS_DASHBOARD) for objeto in objetos)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _marcar_cambios(session, contexto):
+    if _afecta_dashboard(chain(session.new, session.dirty, session.deleted)):
+        session.info["dashboard_cambio"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _marcar_cambios_masivos(estado):
+    # insert()/update()/delete() ejecutados por la sesion no pasan por el flush.
+    if (estado.is_insert or estado.is_update or estado.is_delete) and estado.bind_mapper is not None:
+        if issubclass(estado.bind_mapper.class_, MODELOS_DASHBOARD):
+            estado.session.info["dashboard_cambio"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_al_confirmar(session):
+    # Liberar un SAVEPOINT (core/escritor) tambien dispara after_commit: se
+    # espera al COMMIT real para no cachear datos aun sin confirmar.
+    if session.in_nested_transaction():
+        return
+    if session.info.pop("dashboard_cambio", False):
+        invalidar_dashboard()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_cambios(session):
+    # Deshacer un SAVEPOINT no descarta las marcas de las unidades anteriores
+    # del lote; a lo sumo se invalida de mas.
+    if session.in_nested_transaction():
+        return
+    session.info.pop("dashboard_cambio", None)
@@ -2,16 +2,66 @@
 Configuración de base de datos - MedinAutos
 """
 
-from sqlalchemy import create_engine
+import os
+import re
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = "sqlite:///./medinautos.db"
 
+# ============================================
+# Perfil de almacenamiento SQLite
+# ============================================
+# Se aplica a cada conexion nueva. WAL deja leer mientras otro escribe y
+# busy_timeout hace esperar al segundo escritor en lugar de fallar con
+# "database is locked". Cada valor se puede cambiar con la variable de
+# entorno MEDINAUTOS_SQLITE_<PRAGMA> (p. ej. MEDINAUTOS_SQLITE_JOURNAL_MODE=DELETE
+# si la base esta en una carpeta de red, donde WAL no funciona).
+PERFIL_SQLITE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,        # ms
+    "cache_size": -20000,        # negativo = KiB (~20 MB)
+    "mmap_size": 134217728,      # 128 MB
+    "temp_store": "MEMORY",
+}
+
+_VALOR_PRAGMA = re.compile(r"^-?\w+$")
+
+
+def perfil_sqlite() -> dict:
+    perfil = dict(PERFIL_SQLITE)
+    for pragma in PERFIL_SQLITE:
+        valor = os.environ.get(f"MEDINAUTOS_SQLITE_{pragma.upper()}")
+        if valor is None:
+            continue
+        if not _VALOR_PRAGMA.match(valor.strip()):
+            raise ValueError(f"Valor invalido para PRAGMA {pragma}: {valor!r}")
+        perfil[pragma] = valor.strip()
+    return perfil
+
+
+def aplicar_perfil(conexion_dbapi, perfil: dict | None = None):
+    cursor = conexion_dbapi.cursor()
+    try:
+        for pragma, valor in (perfil or perfil_sqlite()).items():
+            cursor.execute(f"PRAGMA {pragma} = {valor}")
+    finally:
+        cursor.close()
+
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
 
+
+@event.listens_for(engine, "connect")
+def _configurar_conexion(conexion_dbapi, registro):
+    aplicar_perfil(conexion_dbapi)
+
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
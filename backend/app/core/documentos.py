@@ -0,0 +1,98 @@
+"""
+Renderizado de documentos (PDF y Excel) a partir de datos planos.
+
+Cada funcion recibe la ruta de salida y un dict con lo que se imprime, sin
+sesiones ni modelos, para poder ejecutarse en un proceso aparte del servidor
+(ver core/render_pool). Las rutas arman esos dicts; aqui no se consulta la base.
+Las plantillas PDF viven en core/pdf.
+"""
+
+import json
+import os
+
+from openpyxl import Workbook
+
+from backend.app.core import pdf
+
+
+# ======================================================
+# REPORTES
+# ======================================================
+
+def renderizar_reporte_ordenes(ruta, datos):
+    """
+    datos: rango, generado y filas [id, fecha, estado, cliente, placa, total]
+    con la fecha ya formateada.
+    """
+    filas = []
+    total_acumulado = 0.0
+    for orden_id, fecha, estado, cliente, vehiculo, total in datos["filas"]:
+        total = total or 0.0
+        total_acumulado += total
+        filas.append([
+            f"#{orden_id}",
+            fecha,
+            (estado or "-").capitalize(),
+            cliente or "-",
+            vehiculo or "-",
+            pdf.formatear_moneda(total)
+        ])
+
+    if not filas:
+        filas.append(["-", "-", "-", "-", "-", pdf.formatear_moneda(0)])
+
+    return pdf.reporte_tabular(
+        ruta,
+        titulo="Reporte de ordenes finalizadas",
+        info=[
+            ["Rango:", datos["rango"]],
+            ["Generado:", datos["generado"]]
+        ],
+        columnas=["Orden", "Fecha", "Estado", "Cliente", "Vehiculo", "Total"],
+        filas=filas,
+        anchos=[60, 130, 80, 160, 85, 90],
+        resumen=[
+            ["Total ordenes:", str(len(datos["filas"]))],
+            ["Total generado:", pdf.formatear_moneda(total_acumulado)]
+        ],
+        columnas_derecha=(5,)
+    )
+
+
+def _leer_filas(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            for linea in archivo:
+                yield json.loads(linea)
+    finally:
+        os.remove(ruta)
+
+
+def renderizar_ingresos_excel(destino, datos):
+    """
+    datos: filas [id, fecha, estado, total] con la fecha ya formateada, o
+    archivo_filas: ruta de un archivo JSON lines con esas filas, para que un
+    rango grande no viaje entero al proceso del pool (el archivo se borra al
+    terminar). El libro se escribe en modo solo escritura: cada fila se
+    vuelca al archivo al agregarla y la memoria no crece con el rango.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Ingresos")
+    filas = _leer_filas(datos["archivo_filas"]) if "archivo_filas" in datos else datos["filas"]
+
+    # Encabezados
+    ws.append(["ID Orden", "Fecha", "Estado", "Total"])
+    for fila in filas:
+        ws.append(list(fila))
+
+    wb.save(destino)
+    return destino
+
+
+# Tipos de documento que acepta el pool de renderizado.
+RENDERIZADORES = {
+    "orden": pdf.documento_orden,
+    "nomina": pdf.recibo_nomina,
+    "reporte_ordenes": renderizar_reporte_ordenes,
+    "ingresos_excel": renderizar_ingresos_excel,
+}
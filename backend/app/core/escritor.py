@@ -0,0 +1,168 @@
+"""
+Escritor unico (opcional) para SQLite.
+
+SQLite admite un solo escritor a la vez; con varias rutas escribiendo en
+paralelo, cada una espera el bloqueo por su cuenta y en rafagas alguna se
+queda sin tiempo. En modo escritor unico las rutas entregan su trabajo como
+una funcion unidad(db) a una cola, y un solo hilo, con su propia conexion,
+las ejecuta en orden:
+
+- toma todas las unidades que esperan en la cola (hasta MAX_LOTE) y las
+  confirma con un solo COMMIT (group commit);
+- cada unidad corre en un SAVEPOINT: si lanza una excepcion (p. ej.
+  HTTPException) solo se deshace esa unidad y la excepcion le llega a la
+  ruta que la envio. Las invalidaciones de cache y los avisos SSE que
+  dependen de los eventos de la sesion esperan al COMMIT del lote.
+
+Las lecturas siguen usando el pool normal (get_db). Una unidad no hace
+commit ni rollback. Devuelve solo valores simples (ids, numeros), porque sus
+objetos pertenecen a la sesion del escritor. Sin el hilo activo,
+ejecutar_escritura corre la unidad en la sesion de la ruta y hace commit,
+como antes.
+
+Se activa con la variable de entorno MEDINAUTOS_ESCRITOR_UNICO=1.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FuturoTimeout
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from backend.app.core.database import DATABASE_URL, SessionLocal, aplicar_perfil
+
+
+MODO_ESCRITOR_UNICO = os.environ.get("MEDINAUTOS_ESCRITOR_UNICO", "0") == "1"
+MAX_LOTE = 64
+TIEMPO_MAXIMO = 30
+
+_cola: queue.Queue = queue.Queue()
+_hilo = None
+_motor = None
+
+
+def _motor_escritor():
+    global _motor
+    if _motor is None:
+        _motor = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            pool_size=1,
+            max_overflow=0
+        )
+
+        @event.listens_for(_motor, "connect")
+        def _configurar(conexion_dbapi, registro):
+            aplicar_perfil(conexion_dbapi)
+            # El driver abre transacciones por su cuenta y eso rompe los
+            # SAVEPOINT; se desactiva y se emite BEGIN IMMEDIATE abajo.
+            conexion_dbapi.isolation_level = None
+
+        @event.listens_for(_motor, "begin")
+        def _begin(conexion):
+            conexion.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return _motor
+
+
+def _aplicar_lote(lote):
+    db = SessionLocal(bind=_motor_escritor())
+    resultados = []
+    try:
+        for unidad, futuro in lote:
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                with db.begin_nested():
+                    resultados.append((futuro, unidad(db), None))
+            except Exception as exc:
+                resultados.append((futuro, None, exc))
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        for futuro, _, error in resultados:
+            futuro.set_exception(error or exc)
+        return
+    finally:
+        db.close()
+
+    for futuro, resultado, error in resultados:
+        if error is not None:
+            futuro.set_exception(error)
+        else:
+            futuro.set_result(resultado)
+
+
+def _escribir():
+    while True:
+        primero = _cola.get()
+        if primero is None:
+            return
+        lote = [primero]
+        detener = False
+        while len(lote) < MAX_LOTE:
+            try:
+                siguiente = _cola.get_nowait()
+            except queue.Empty:
+                break
+            if siguiente is None:
+                detener = True
+                break
+            lote.append(siguiente)
+        _aplicar_lote(lote)
+        if detener:
+            return
+
+
+def escritor_activo() -> bool:
+    return _hilo is not None and _hilo.is_alive()
+
+
+def iniciar_escritor():
+    global _hilo
+    if escritor_activo():
+        return
+    _hilo = threading.Thread(target=_escribir, name="escritor-sqlite", daemon=True)
+    _hilo.start()
+
+
+def detener_escritor():
+    """Procesa lo que queda en la cola y detiene el hilo."""
+    global _motor
+    if not escritor_activo():
+        return
+    _cola.put(None)
+    _hilo.join()
+    if _motor is not None:
+        _motor.dispose()
+        _motor = None
+
+
+def ejecutar_escritura(unidad, db: Session):
+    """
+    Ejecuta unidad(sesion) y confirma. Con el escritor activo la corre el
+    hilo escritor; si no, usa db (la sesion de la ruta). Devuelve lo que
+    devuelva la unidad y propaga sus excepciones.
+    """
+    if not escritor_activo():
+        try:
+            resultado = unidad(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return resultado
+
+    futuro = Future()
+    _cola.put((unidad, futuro))
+    try:
+        return futuro.result(timeout=TIEMPO_MAXIMO)
+    except FuturoTimeout:
+        # Solo se invita a reintentar si la unidad no llego a correr; si ya
+        # esta en un lote se espera su resultado para no aplicarla dos veces.
+        if futuro.cancel():
+            raise HTTPException(status_code=503, detail="La base de datos esta ocupada, intente de nuevo")
+        return futuro.result()
@@ -0,0 +1,50 @@
+"""
+Respuestas JSON con ETag y validacion condicional (If-None-Match).
+"""
+
+import hashlib
+import json
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+def calcular_etag(contenido: bytes) -> str:
+    return '"' + hashlib.sha1(contenido).hexdigest() + '"'
+
+
+def etag_coincide(request: Request, etag: str) -> bool:
+    encabezado = request.headers.get("if-none-match")
+    if not encabezado:
+        return False
+    candidatos = {valor.strip().removeprefix("W/") for valor in encabezado.split(",")}
+    return etag in candidatos or "*" in candidatos
+
+
+def serializar_json(datos) -> bytes:
+    """
+    JSON estable (claves ordenadas, sin espacios): el mismo contenido produce
+    siempre los mismos bytes y por lo tanto el mismo ETag.
+    """
+    return json.dumps(
+        jsonable_encoder(datos),
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True
+    ).encode("utf-8")
+
+
+def respuesta_json_precalculada(request: Request, contenido: bytes, etag: str) -> Response:
+    encabezados = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_coincide(request, etag):
+        return Response(status_code=304, headers=encabezados)
+    return Response(content=contenido, media_type="application/json", headers=encabezados)
+
+
+def respuesta_json_con_etag(request: Request, datos) -> Response:
+    """
+    Serializa datos de forma estable y responde 304 si el cliente ya tiene
+    la misma version.
+    """
+    contenido = serializar_json(datos)
+    return respuesta_json_precalculada(request, contenido, calcular_etag(contenido))
@@ -0,0 +1,148 @@
+"""
+Bus de eventos en proceso para notificar cambios al navegador (SSE).
+
+Las escrituras no publican a mano: los eventos de la sesion anotan que temas
+toco cada transaccion y se publican al confirmarla. Si la transaccion se
+revierte no se publica nada.
+
+Temas: ordenes, caja, inventario, novedades, vehiculos y dashboard (este
+ultimo lo publica core/dashboard cuando invalida su snapshot).
+"""
+
+import asyncio
+import threading
+import time
+from itertools import chain, count
+
+from sqlalchemy import event
+
+from backend.app.core.database import SessionLocal
+from backend.app.models.alerta_mantenimiento import AlertaMantenimiento
+from backend.app.models.almacen_item import AlmacenItem
+from backend.app.models.caja import Caja
+from backend.app.models.detalle_almacen import DetalleAlmacen
+from backend.app.models.detalle_orden import DetalleOrden
+from backend.app.models.movimiento_almacen import MovimientoAlmacen
+from backend.app.models.movimiento_caja import MovimientoCaja
+from backend.app.models.orden_mecanico import OrdenMecanico
+from backend.app.models.orden_trabajo import OrdenTrabajo
+from backend.app.models.recomendacion_regla import RecomendacionRegla
+from backend.app.models.vehiculo import Vehiculo
+from backend.app.models.vehiculo_recomendacion import VehiculoRecomendacion
+
+
+TEMAS = ("ordenes", "caja", "inventario", "novedades", "vehiculos", "dashboard")
+
+TEMAS_POR_MODELO = {
+    OrdenTrabajo: ("ordenes",),
+    DetalleOrden: ("ordenes",),
+    DetalleAlmacen: ("ordenes", "inventario"),
+    OrdenMecanico: ("ordenes",),
+    Caja: ("caja",),
+    MovimientoCaja: ("caja",),
+    AlmacenItem: ("inventario",),
+    MovimientoAlmacen: ("inventario",),
+    RecomendacionRegla: ("novedades",),
+    VehiculoRecomendacion: ("novedades",),
+    AlertaMantenimiento: ("novedades",),
+    Vehiculo: ("vehiculos",),
+}
+
+# Eventos pendientes por suscriptor; si un navegador no los consume se
+# descartan y se le pide que recargue todo (evento "resync").
+MAX_COLA = 100
+
+_bloqueo = threading.Lock()
+_suscripciones = {}
+_secuencia = count(1)
+
+
+# ======================================================
+# SUSCRIPCIONES Y PUBLICACION
+# ======================================================
+
+def suscribir(temas) -> dict:
+    """
+    Registra una suscripcion para el event loop actual. Debe llamarse desde
+    una ruta async.
+    """
+    suscripcion = {
+        "id": next(_secuencia),
+        "temas": set(temas),
+        "loop": asyncio.get_running_loop(),
+        "cola": asyncio.Queue(maxsize=MAX_COLA),
+        "desbordada": False,
+    }
+    with _bloqueo:
+        _suscripciones[suscripcion["id"]] = suscripcion
+    return suscripcion
+
+
+def cancelar(suscripcion: dict):
+    with _bloqueo:
+        _suscripciones.pop(suscripcion["id"], None)
+
+
+def _entregar(suscripcion: dict, evento: dict):
+    try:
+        suscripcion["cola"].put_nowait(evento)
+    except asyncio.QueueFull:
+        suscripcion["desbordada"] = True
+
+
+def publicar(tema: str, datos: dict | None = None):
+    """
+    Publica un evento a los suscriptores del tema. Se puede llamar desde
+    cualquier hilo: la entrega se agenda en el loop de cada suscriptor.
+    """
+    evento = {"tema": tema, "momento": time.time(), **(datos or {})}
+    with _bloqueo:
+        destinos = [s for s in _suscripciones.values() if tema in s["temas"]]
+    for suscripcion in destinos:
+        try:
+            suscripcion["loop"].call_soon_threadsafe(_entregar, suscripcion, evento)
+        except RuntimeError:
+            # El loop ya se cerro (apagado del servidor).
+            cancelar(suscripcion)
+
+
+# ======================================================
+# PUBLICACION DESDE LA SESION
+# ======================================================
+
+def _temas_de(objetos):
+    temas = set()
+    for objeto in objetos:
+        temas.update(TEMAS_POR_MODELO.get(type(objeto), ()))
+    return temas
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _anotar_cambios(session, contexto):
+    temas = _temas_de(chain(session.new, session.dirty, session.deleted))
+    if temas:
+        session.info.setdefault("eventos_temas", set()).update(temas)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _anotar_cambios_masivos(estado):
+    if (estado.is_insert or estado.is_update or estado.is_delete) and estado.bind_mapper is not None:
+        temas = TEMAS_POR_MODELO.get(estado.bind_mapper.class_, ())
+        if temas:
+            estado.session.info.setdefault("eventos_temas", set()).update(temas)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publicar_al_confirmar(session):
+    # Tambien se dispara al liberar un SAVEPOINT: solo cuenta el COMMIT real.
+    if session.in_nested_transaction():
+        return
+    for tema in sorted(session.info.pop("eventos_temas", ())):
+        publicar(tema)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_cambios(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop("eventos_temas", None)
@@ -0,0 +1,91 @@
+"""
+Historial de kilometraje y estimacion de km por dia.
+
+Cada lectura (alta del vehiculo, edicion o ingreso a taller) se guarda en
+lecturas_kilometraje y actualiza km_actual, fecha_km y km_dia del vehiculo.
+Con km_dia, core/novedades proyecta cuando vence cada regla por kilometraje.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from backend.app.models.lectura_kilometraje import LecturaKilometraje
+from backend.app.models.vehiculo import Vehiculo
+
+
+# La estimacion usa como base la lectura de hace un ano (o la mas antigua),
+# y necesita al menos una semana entre lecturas para no disparar valores.
+VENTANA_DIAS = 365
+MIN_DIAS_ESTIMACION = 7
+
+
+def estimar_km_dia(db: Session, vehiculo_id: int, km: int, fecha: datetime):
+    """
+    km recorridos por dia entre una lectura base y (km, fecha). None si no
+    hay historial suficiente.
+    """
+    lecturas = db.query(LecturaKilometraje.km, LecturaKilometraje.fecha).filter(
+        LecturaKilometraje.vehiculo_id == vehiculo_id
+    )
+    base = lecturas.filter(
+        LecturaKilometraje.fecha <= fecha - timedelta(days=VENTANA_DIAS)
+    ).order_by(LecturaKilometraje.fecha.desc()).first()
+    if base is None:
+        base = lecturas.order_by(LecturaKilometraje.fecha.asc()).first()
+    if base is None:
+        return None
+
+    dias = (fecha - base.fecha).total_seconds() / 86400
+    if dias < MIN_DIAS_ESTIMACION:
+        return None
+    return round(max(km - base.km, 0) / dias, 2)
+
+
+def registrar_lectura(
+    db: Session,
+    vehiculo: Vehiculo,
+    km: int | None,
+    origen: str,
+    orden_id: int | None = None,
+    fecha: datetime | None = None
+):
+    """
+    Guarda la lectura y actualiza el vehiculo. No hace commit. Lanza
+    ValueError si el km es negativo o menor al ultimo registrado.
+    """
+    if km is None:
+        return None
+    if km < 0 or (vehiculo.km_actual is not None and km < vehiculo.km_actual):
+        raise ValueError("El kilometraje no puede ser menor al ultimo registrado")
+
+    fecha = fecha or datetime.now()
+    if vehiculo.id is not None:
+        vehiculo.km_dia = estimar_km_dia(db, vehiculo.id, km, fecha)
+    vehiculo.km_actual = km
+    vehiculo.fecha_km = fecha.date()
+
+    lectura = LecturaKilometraje(
+        vehiculo=vehiculo,
+        km=km,
+        fecha=fecha,
+        origen=origen,
+        orden_id=orden_id
+    )
+    db.add(lectura)
+    return lectura
+
+
+def registrar_ingreso_orden(db: Session, orden):
+    """
+    Lectura del odometro tomada al recibir el vehiculo en una orden (si la
+    orden trae km_ingreso). Lanza ValueError como registrar_lectura.
+    """
+    if orden.km_ingreso is None:
+        return None
+    vehiculo = db.query(Vehiculo).filter(Vehiculo.id == orden.vehiculo_id).first()
+    if not vehiculo:
+        return None
+    if orden.id is None:
+        db.flush()
+    return registrar_lectura(db, vehiculo, orden.km_ingreso, "orden", orden_id=orden.id)
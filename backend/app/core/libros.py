@@ -0,0 +1,110 @@
+"""
+Libros de movimientos (caja, almacen y proveedores): listado paginado con
+cursor sobre (fecha, id), filtros de fecha y tipo, y totales por tipo de la
+ventana filtrada.
+
+Los totales salen de una consulta agrupada con los mismos filtros y sin el
+cursor, en la misma transaccion de lectura que la pagina (BEGIN explicito:
+pysqlite no abre transaccion para un SELECT y cada consulta veria su propia
+instantanea del WAL). Los indices de cada libro incluyen tipo y monto, asi
+que esa consulta no lee la tabla.
+"""
+
+from contextlib import contextmanager
+from datetime import date, datetime, time
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.app.core.ordenes import (
+    LIMITE_MAXIMO,
+    LIMITE_POR_DEFECTO,
+    paginar_por_fecha,
+)
+
+
+def filtrar_libro(
+    query,
+    modelo,
+    desde: date | None = None,
+    hasta: date | None = None,
+    tipo: str | None = None,
+    **iguales
+):
+    """
+    Aplica rango de fechas (ambos extremos inclusive), tipo y filtros de
+    igualdad (p. ej. caja_id=3); los valores None se ignoran.
+    """
+    for campo, valor in iguales.items():
+        if valor is not None:
+            query = query.filter(getattr(modelo, campo) == valor)
+    if desde:
+        query = query.filter(modelo.fecha >= datetime.combine(desde, time.min))
+    if hasta:
+        query = query.filter(modelo.fecha <= datetime.combine(hasta, time.max))
+    if tipo:
+        query = query.filter(modelo.tipo == tipo)
+    return query
+
+
+def totales_por_tipo(db: Session, modelo, columna, **filtros) -> dict:
+    """
+    {tipo: {"movimientos": n, "total": suma de columna}} de la ventana
+    filtrada.
+    """
+    filas = filtrar_libro(
+        db.query(modelo.tipo, func.count(), func.coalesce(func.sum(columna), 0.0)),
+        modelo,
+        **filtros
+    ).group_by(modelo.tipo)
+    return {
+        tipo: {"movimientos": cantidad, "total": float(total)}
+        for tipo, cantidad, total in filas
+    }
+
+
+@contextmanager
+def _lectura_consistente(db: Session):
+    """
+    Abre una transaccion de lectura si la sesion no tiene una, para que
+    todas las consultas del bloque lean la misma instantanea.
+    """
+    conexion = db.connection()
+    propia = not conexion.connection.dbapi_connection.in_transaction
+    if propia:
+        conexion.exec_driver_sql("BEGIN")
+    try:
+        yield
+    finally:
+        if propia:
+            conexion.exec_driver_sql("COMMIT")
+
+
+def paginar_libro(
+    db: Session,
+    modelo,
+    columna,
+    limite: int = LIMITE_POR_DEFECTO,
+    cursor: str | None = None,
+    **filtros
+):
+    """
+    Pagina los movimientos del mas reciente al mas antiguo. Devuelve
+    (filas, siguiente_cursor, por_tipo). Lanza ValueError si el cursor no
+    es valido.
+    """
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    query = filtrar_libro(db.query(modelo), modelo, **filtros)
+
+    with _lectura_consistente(db):
+        filas, siguiente = paginar_por_fecha(query, modelo, limite, cursor)
+        por_tipo = totales_por_tipo(db, modelo, columna, **filtros)
+    return filas, siguiente, por_tipo
+
+
+def sumar_tipos(por_tipo: dict, tipos) -> float:
+    return sum(por_tipo[tipo]["total"] for tipo in tipos if tipo in por_tipo)
+
+
+def contar_movimientos(por_tipo: dict) -> int:
+    return sum(fila["movimientos"] for fila in por_tipo.values())
@@ -0,0 +1,358 @@
+"""
+Lineas de una orden (servicios e insumos): altas, ediciones y bajas.
+Las funciones no hacen commit; el llamador decide cuando cerrar la transaccion.
+"""
+
+from collections import defaultdict
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from backend.app.core.almacen import ajustar_stock, descontar_stock, sumar_stock
+from backend.app.core.proveedores import registrar_movimiento_proveedor
+from backend.app.models.almacen_item import AlmacenItem
+from backend.app.models.detalle_almacen import DetalleAlmacen
+from backend.app.models.detalle_orden import DetalleOrden
+from backend.app.models.movimiento_almacen import MovimientoAlmacen
+from backend.app.models.orden_trabajo import OrdenTrabajo
+from backend.app.models.servicio import Servicio
+
+
+def validar_orden_editable(orden: OrdenTrabajo | None, detalle: str):
+    if not orden:
+        raise HTTPException(status_code=404, detail="Orden no existe")
+    if orden.estado == "cerrada":
+        raise HTTPException(status_code=400, detail=detalle)
+
+
+def _registrar_movimiento_proveedor(
+    db: Session,
+    item: AlmacenItem,
+    orden_id: int,
+    tipo: str,
+    subtotal: float,
+    cantidad: float | None,
+    valor_unitario: float | None,
+    motivo: str,
+    usuario: str | None
+):
+    if not item.proveedor_id or subtotal <= 0:
+        return
+
+    registrar_movimiento_proveedor(
+        db,
+        item.proveedor_id,
+        tipo,
+        subtotal,
+        orden_id=orden_id,
+        item_id=item.id,
+        cantidad=cantidad,
+        valor_unitario=valor_unitario,
+        motivo=motivo,
+        usuario=usuario
+    )
+
+
+# ======================================================
+# SERVICIOS
+# ======================================================
+
+def agregar_servicio(db: Session, orden: OrdenTrabajo, servicio: Servicio, cantidad: int):
+    subtotal = servicio.precio * cantidad
+    detalle = DetalleOrden(
+        orden_id=orden.id,
+        servicio_id=servicio.id,
+        cantidad=cantidad,
+        precio_unitario=servicio.precio,
+        subtotal=subtotal
+    )
+    db.add(detalle)
+    orden.total = (orden.total or 0.0) + subtotal
+    return detalle
+
+
+def editar_servicio(orden: OrdenTrabajo, detalle: DetalleOrden, cantidad: int):
+    orden.total = (orden.total or 0.0) - detalle.subtotal
+    detalle.cantidad = cantidad
+    detalle.subtotal = detalle.precio_unitario * cantidad
+    orden.total += detalle.subtotal
+    return detalle
+
+
+def eliminar_servicio(db: Session, orden: OrdenTrabajo, detalle: DetalleOrden):
+    orden.total = (orden.total or 0.0) - detalle.subtotal
+    db.delete(detalle)
+
+
+# ======================================================
+# INSUMOS
+# ======================================================
+
+def agregar_insumo(
+    db: Session,
+    orden: OrdenTrabajo,
+    item: AlmacenItem,
+    cantidad: float,
+    usuario: str | None,
+    mover_stock: bool = True
+):
+    if mover_stock:
+        ajustar_stock(db, item, cantidad)
+
+    subtotal = item.valor_taller * cantidad
+    costo_proveedor_unitario = item.valor_proveedor or 0.0
+    subtotal_proveedor = costo_proveedor_unitario * cantidad
+
+    detalle = DetalleAlmacen(
+        orden_id=orden.id,
+        item_id=item.id,
+        proveedor_id=item.proveedor_id,
+        cantidad=cantidad,
+        precio_unitario=item.valor_taller,
+        subtotal=subtotal,
+        costo_proveedor_unitario=costo_proveedor_unitario,
+        subtotal_proveedor=subtotal_proveedor,
+        margen_subtotal=subtotal - subtotal_proveedor,
+    )
+
+    orden.total = (orden.total or 0.0) + subtotal
+
+    db.add(MovimientoAlmacen(
+        tipo="salida",
+        cantidad=cantidad,
+        valor_unitario=item.valor_taller,
+        observaciones="Consumo en orden",
+        item_id=item.id,
+        orden_id=orden.id,
+    ))
+
+    _registrar_movimiento_proveedor(
+        db=db,
+        item=item,
+        orden_id=orden.id,
+        tipo="cargo",
+        subtotal=subtotal_proveedor,
+        cantidad=cantidad,
+        valor_unitario=costo_proveedor_unitario,
+        motivo="Consumo en orden",
+        usuario=usuario
+    )
+
+    db.add(detalle)
+    return detalle
+
+
+def editar_insumo(
+    db: Session,
+    orden: OrdenTrabajo,
+    detalle: DetalleAlmacen,
+    item: AlmacenItem,
+    cantidad: float,
+    usuario: str | None,
+    mover_stock: bool = True
+):
+    if cantidad <= 0:
+        raise HTTPException(status_code=400, detail="Cantidad invalida")
+
+    diferencia = cantidad - detalle.cantidad
+    if mover_stock:
+        ajustar_stock(db, item, diferencia)
+
+    orden.total = (orden.total or 0.0) - detalle.subtotal
+
+    detalle.cantidad = cantidad
+    detalle.subtotal = detalle.precio_unitario * cantidad
+    orden.total += detalle.subtotal
+
+    nuevo_subtotal_proveedor = (item.valor_proveedor or 0.0) * cantidad
+    delta_proveedor = nuevo_subtotal_proveedor - detalle.subtotal_proveedor
+
+    detalle.costo_proveedor_unitario = item.valor_proveedor or 0.0
+    detalle.subtotal_proveedor = nuevo_subtotal_proveedor
+    detalle.margen_subtotal = detalle.subtotal - nuevo_subtotal_proveedor
+    detalle.proveedor_id = item.proveedor_id
+
+    if diferencia != 0:
+        db.add(MovimientoAlmacen(
+            tipo="ajuste_salida" if diferencia > 0 else "ajuste_devolucion",
+            cantidad=abs(diferencia),
+            valor_unitario=item.valor_taller,
+            observaciones="Ajuste por edicion en orden",
+            item_id=item.id,
+            orden_id=orden.id,
+        ))
+
+    if item.proveedor_id and delta_proveedor != 0:
+        tipo = "ajuste_cargo" if delta_proveedor > 0 else "ajuste_abono"
+        _registrar_movimiento_proveedor(
+            db=db,
+            item=item,
+            orden_id=orden.id,
+            tipo=tipo,
+            subtotal=abs(delta_proveedor),
+            cantidad=abs(diferencia) if diferencia != 0 else None,
+            valor_unitario=item.valor_proveedor,
+            motivo="Ajuste por edicion en orden",
+            usuario=usuario
+        )
+    return detalle
+
+
+def eliminar_insumo(
+    db: Session,
+    orden: OrdenTrabajo,
+    detalle: DetalleAlmacen,
+    item: AlmacenItem,
+    usuario: str | None,
+    mover_stock: bool = True
+):
+    orden.total = (orden.total or 0.0) - detalle.subtotal
+    if mover_stock:
+        sumar_stock(db, item, detalle.cantidad)
+
+    db.add(MovimientoAlmacen(
+        tipo="devolucion",
+        cantidad=detalle.cantidad,
+        valor_unitario=detalle.precio_unitario,
+        observaciones="Devolucion por eliminar de orden",
+        item_id=item.id,
+        orden_id=orden.id,
+    ))
+
+    if detalle.proveedor_id and detalle.subtotal_proveedor > 0:
+        _registrar_movimiento_proveedor(
+            db=db,
+            item=item,
+            orden_id=orden.id,
+            tipo="abono",
+            subtotal=detalle.subtotal_proveedor,
+            cantidad=detalle.cantidad,
+            valor_unitario=detalle.costo_proveedor_unitario,
+            motivo="Reversion por eliminar insumo",
+            usuario=usuario
+        )
+
+    db.delete(detalle)
+
+
+# ======================================================
+# LOTE
+# ======================================================
+
+def _error_operacion(indice: int, exc: HTTPException):
+    return HTTPException(status_code=exc.status_code, detail=f"Operacion {indice + 1}: {exc.detail}")
+
+
+def aplicar_lote_lineas(db: Session, orden: OrdenTrabajo, operaciones, usuario: str | None):
+    """
+    Aplica un lote de operaciones sobre las lineas de la orden. Servicios,
+    items y detalles se cargan con una consulta por tabla; el stock se mueve
+    una vez por item con la demanda neta de todo el lote (UPDATE condicional)
+    antes de aplicar las lineas. Si falta stock el llamador debe deshacer.
+    """
+    servicio_ids = {op.servicio_id for op in operaciones if op.tipo == "servicio" and op.accion == "agregar"}
+    item_ids = {op.item_id for op in operaciones if op.tipo == "insumo" and op.accion == "agregar"}
+    detalle_servicio_ids = {op.detalle_id for op in operaciones if op.tipo == "servicio" and op.accion != "agregar"}
+    detalle_insumo_ids = {op.detalle_id for op in operaciones if op.tipo == "insumo" and op.accion != "agregar"}
+
+    servicios = {}
+    if servicio_ids:
+        servicios = {s.id: s for s in db.query(Servicio).filter(Servicio.id.in_(servicio_ids))}
+
+    detalles_servicio = {}
+    if detalle_servicio_ids:
+        detalles_servicio = {
+            d.id: d for d in db.query(DetalleOrden).filter(
+                DetalleOrden.id.in_(detalle_servicio_ids),
+                DetalleOrden.orden_id == orden.id
+            )
+        }
+
+    detalles_insumo = {}
+    if detalle_insumo_ids:
+        detalles_insumo = {
+            d.id: d for d in db.query(DetalleAlmacen).filter(
+                DetalleAlmacen.id.in_(detalle_insumo_ids),
+                DetalleAlmacen.orden_id == orden.id
+            )
+        }
+        item_ids |= {d.item_id for d in detalles_insumo.values()}
+
+    items = {}
+    if item_ids:
+        items = {i.id: i for i in db.query(AlmacenItem).filter(AlmacenItem.id.in_(item_ids))}
+
+    # Validacion completa antes de aplicar: referencias y cantidades.
+    vistos = set()
+    demanda = defaultdict(float)
+    for indice, op in enumerate(operaciones):
+        try:
+            if op.accion in ("agregar", "editar") and (op.cantidad is None or op.cantidad <= 0):
+                raise HTTPException(status_code=400, detail="Cantidad invalida")
+            if op.tipo == "servicio" and op.cantidad is not None and op.cantidad != int(op.cantidad):
+                raise HTTPException(status_code=400, detail="La cantidad de un servicio debe ser entera")
+
+            if op.accion == "agregar":
+                if op.tipo == "servicio":
+                    if op.servicio_id not in servicios:
+                        raise HTTPException(status_code=404, detail="Servicio no existe")
+                else:
+                    if op.item_id not in items:
+                        raise HTTPException(status_code=404, detail="Insumo no existe")
+                    demanda[op.item_id] += op.cantidad
+                continue
+
+            clave = (op.tipo, op.detalle_id)
+            if clave in vistos:
+                raise HTTPException(status_code=400, detail="Detalle repetido en el lote")
+            vistos.add(clave)
+
+            if op.tipo == "servicio":
+                if op.detalle_id not in detalles_servicio:
+                    raise HTTPException(status_code=404, detail="Detalle no encontrado")
+                continue
+
+            detalle = detalles_insumo.get(op.detalle_id)
+            if not detalle:
+                raise HTTPException(status_code=404, detail="Detalle no encontrado")
+            if detalle.item_id not in items:
+                raise HTTPException(status_code=404, detail="Insumo no existe")
+            nueva = op.cantidad if op.accion == "editar" else 0.0
+            demanda[detalle.item_id] += nueva - detalle.cantidad
+        except HTTPException as exc:
+            raise _error_operacion(indice, exc)
+
+    faltantes = [
+        items[item_id].nombre
+        for item_id, neto in demanda.items()
+        if neto > 0 and not descontar_stock(db, items[item_id], neto)
+    ]
+    if faltantes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Stock insuficiente para: {', '.join(sorted(faltantes))}"
+        )
+    for item_id, neto in demanda.items():
+        if neto < 0:
+            sumar_stock(db, items[item_id], -neto)
+
+    for op in operaciones:
+        if op.tipo == "servicio":
+            if op.accion == "agregar":
+                agregar_servicio(db, orden, servicios[op.servicio_id], int(op.cantidad))
+            elif op.accion == "editar":
+                editar_servicio(orden, detalles_servicio[op.detalle_id], int(op.cantidad))
+            else:
+                eliminar_servicio(db, orden, detalles_servicio[op.detalle_id])
+        else:
+            if op.accion == "agregar":
+                agregar_insumo(db, orden, items[op.item_id], op.cantidad, usuario, mover_stock=False)
+            else:
+                detalle = detalles_insumo[op.detalle_id]
+                item = items[detalle.item_id]
+                if op.accion == "editar":
+                    editar_insumo(db, orden, detalle, item, op.cantidad, usuario, mover_stock=False)
+                else:
+                    eliminar_insumo(db, orden, detalle, item, usuario, mover_stock=False)
+
+    return len(operaciones)
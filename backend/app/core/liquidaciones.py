@@ -0,0 +1,310 @@
+"""
+Liquidacion de ordenes canceladas: provisiones de caja y nomina de tecnicos.
+"""
+
+import calendar
+from datetime import datetime
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from backend.app.core.caja import registrar_movimiento_caja
+from backend.app.models.detalle_almacen import DetalleAlmacen
+from backend.app.models.detalle_orden import DetalleOrden
+from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
+from backend.app.models.liquidacion_mecanico_detalle import LiquidacionMecanicoDetalle
+from backend.app.models.mecanico import Mecanico
+from backend.app.models.movimiento_caja import CategoriaMovimiento
+from backend.app.models.orden_mecanico import OrdenMecanico
+from backend.app.models.orden_trabajo import OrdenTrabajo
+from backend.app.models.proveedor import Proveedor
+
+
+def calcular_periodo(fecha):
+    inicio = fecha.replace(day=1)
+    if fecha.day <= 15:
+        fin = fecha.replace(day=15)
+        frecuencia = "quincenal"
+    else:
+        ultimo_dia = calendar.monthrange(fecha.year, fecha.month)[1]
+        fin = fecha.replace(day=ultimo_dia)
+        frecuencia = "quincenal"
+    return inicio, fin, frecuencia
+
+
+def recalcular_liquidaciones(db: Session, liquidacion_ids):
+    """
+    Actualiza total_base y total_pagado de varias liquidaciones con una sola
+    lectura agrupada de sus detalles.
+    """
+    ids = set(liquidacion_ids)
+    if not ids:
+        return
+
+    totales = {
+        row.liquidacion_id: row
+        for row in db.query(
+            LiquidacionMecanicoDetalle.liquidacion_id,
+            func.sum(LiquidacionMecanicoDetalle.base_calculo).label("base"),
+            func.sum(LiquidacionMecanicoDetalle.monto).label("monto")
+        ).filter(
+            LiquidacionMecanicoDetalle.liquidacion_id.in_(ids)
+        ).group_by(LiquidacionMecanicoDetalle.liquidacion_id)
+    }
+
+    liquidaciones = db.query(LiquidacionMecanico).filter(
+        LiquidacionMecanico.id.in_(ids)
+    ).all()
+    for liquidacion in liquidaciones:
+        fila = totales.get(liquidacion.id)
+        liquidacion.total_base = (fila.base if fila else None) or 0.0
+        liquidacion.total_pagado = (fila.monto if fila else None) or 0.0
+
+
+def bases_por_mecanico(db: Session, mecanico_ids, fecha_inicio, fecha_fin):
+    """
+    Devuelve {mecanico_id: [(orden_id, porcentaje_asignado, base)]} de las
+    ordenes cerradas del periodo, con la base de servicios de cada orden
+    sumada en la misma consulta agrupada.
+    """
+    filas = db.query(
+        OrdenMecanico.mecanico_id,
+        OrdenMecanico.orden_id,
+        OrdenMecanico.porcentaje,
+        func.coalesce(func.sum(DetalleOrden.subtotal), 0.0).label("base")
+    ).join(
+        OrdenTrabajo, OrdenTrabajo.id == OrdenMecanico.orden_id
+    ).outerjoin(
+        DetalleOrden, DetalleOrden.orden_id == OrdenMecanico.orden_id
+    ).filter(
+        OrdenMecanico.mecanico_id.in_(mecanico_ids),
+        OrdenTrabajo.estado == "cerrada",
+        OrdenTrabajo.fecha >= fecha_inicio,
+        OrdenTrabajo.fecha <= fecha_fin
+    ).group_by(
+        OrdenMecanico.id
+    ).order_by(OrdenMecanico.mecanico_id, OrdenMecanico.orden_id)
+
+    bases = {}
+    for fila in filas:
+        bases.setdefault(fila.mecanico_id, []).append(
+            (fila.orden_id, fila.porcentaje or 0.0, fila.base or 0.0)
+        )
+    return bases
+
+
+def liquidar_mecanicos(
+    db: Session,
+    mecanicos,
+    fecha_inicio,
+    fecha_fin,
+    frecuencia: str,
+    usuario: str | None = None,
+    observaciones: str | None = None,
+    incluir_sin_ordenes: bool = True
+):
+    """
+    Crea la liquidacion del periodo de cada mecanico con una sola lectura
+    de bases y un solo INSERT de detalles. Devuelve [(liquidacion, ordenes)]
+    en el orden de mecanicos. No hace commit.
+    """
+    bases = bases_por_mecanico(db, [mecanico.id for mecanico in mecanicos], fecha_inicio, fecha_fin)
+
+    pendientes = []
+    for mecanico in mecanicos:
+        if mecanico.id not in bases and not incluir_sin_ordenes:
+            continue
+        detalles = []
+        for orden_id, porcentaje, base in bases.get(mecanico.id, []):
+            if porcentaje <= 0:
+                porcentaje = mecanico.porcentaje_base
+            detalles.append({
+                "orden_id": orden_id,
+                "porcentaje": porcentaje,
+                "base_calculo": base,
+                "monto": base * (porcentaje / 100.0),
+            })
+        liquidacion = LiquidacionMecanico(
+            mecanico_id=mecanico.id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            frecuencia=frecuencia,
+            total_base=sum(detalle["base_calculo"] for detalle in detalles),
+            total_pagado=sum(detalle["monto"] for detalle in detalles),
+            usuario=usuario,
+            observaciones=observaciones
+        )
+        pendientes.append((liquidacion, detalles))
+
+    db.add_all(liquidacion for liquidacion, _ in pendientes)
+    db.flush()
+
+    filas = [
+        dict(detalle, liquidacion_id=liquidacion.id)
+        for liquidacion, detalles in pendientes
+        for detalle in detalles
+    ]
+    if filas:
+        db.execute(insert(LiquidacionMecanicoDetalle), filas)
+    return [(liquidacion, len(detalles)) for liquidacion, detalles in pendientes]
+
+
+def _liquidaciones_pendientes(db: Session, mecanico_ids, fecha_base):
+    """
+    Devuelve {mecanico_id: LiquidacionMecanico} del periodo de fecha_base,
+    creando en un solo flush las que no existan.
+    """
+    fecha_inicio, fecha_fin, frecuencia = calcular_periodo(fecha_base)
+    existentes = db.query(LiquidacionMecanico).filter(
+        LiquidacionMecanico.mecanico_id.in_(mecanico_ids),
+        LiquidacionMecanico.fecha_inicio == fecha_inicio,
+        LiquidacionMecanico.fecha_fin == fecha_fin,
+        LiquidacionMecanico.estado == "pendiente"
+    ).order_by(LiquidacionMecanico.id.asc()).all()
+
+    por_mecanico = {}
+    for liquidacion in existentes:
+        por_mecanico.setdefault(liquidacion.mecanico_id, liquidacion)
+
+    nuevas = [
+        LiquidacionMecanico(
+            mecanico_id=mecanico_id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            frecuencia=frecuencia,
+            total_base=0.0,
+            total_pagado=0.0,
+            estado="pendiente"
+        )
+        for mecanico_id in mecanico_ids
+        if mecanico_id not in por_mecanico
+    ]
+    if nuevas:
+        db.add_all(nuevas)
+        db.flush()
+        for liquidacion in nuevas:
+            por_mecanico[liquidacion.mecanico_id] = liquidacion
+    return por_mecanico
+
+
+def liquidar_orden_cancelada(db: Session, orden, caja, usuario: str | None, motivo: str):
+    """
+    Registra el ingreso de la orden, las provisiones de proveedores y tecnicos
+    y los detalles de nomina pendientes. No hace commit: todo queda en la
+    transaccion del llamador.
+    """
+    registrar_movimiento_caja(
+        db,
+        caja,
+        tipo="ingreso",
+        monto=orden.total or 0.0,
+        categoria=CategoriaMovimiento.INGRESO_ORDEN,
+        concepto=f"Ingreso por orden {orden.id}",
+        motivo=motivo,
+        orden_id=orden.id,
+        usuario=usuario
+    )
+
+    proveedores = db.query(
+        Proveedor.nombre,
+        func.sum(DetalleAlmacen.subtotal_proveedor).label("total")
+    ).select_from(DetalleAlmacen).outerjoin(
+        Proveedor, Proveedor.id == DetalleAlmacen.proveedor_id
+    ).filter(
+        DetalleAlmacen.orden_id == orden.id
+    ).group_by(Proveedor.nombre).all()
+
+    total_proveedor = sum(fila.total or 0.0 for fila in proveedores)
+    proveedores_texto = ", ".join(sorted({fila.nombre for fila in proveedores if fila.nombre})) or "Proveedor"
+
+    if total_proveedor > 0:
+        registrar_movimiento_caja(
+            db,
+            caja,
+            tipo="egreso",
+            monto=total_proveedor,
+            categoria=CategoriaMovimiento.PROVISION_PROVEEDORES,
+            concepto=f"Pago pendiente proveedor {proveedores_texto} orden {orden.id}",
+            motivo=motivo,
+            orden_id=orden.id,
+            usuario=usuario
+        )
+
+    total_servicios = db.query(func.sum(DetalleOrden.subtotal)).filter(
+        DetalleOrden.orden_id == orden.id
+    ).scalar() or 0.0
+
+    asignaciones = db.query(OrdenMecanico, Mecanico).join(
+        Mecanico, Mecanico.id == OrdenMecanico.mecanico_id
+    ).filter(OrdenMecanico.orden_id == orden.id).all()
+
+    total_mecanicos = 0.0
+    nombres_mecanicos = []
+    montos = {}
+    for asignacion, mecanico in asignaciones:
+        porcentaje = asignacion.porcentaje or mecanico.porcentaje_base or 0.0
+        monto = total_servicios * (porcentaje / 100.0)
+        asignacion.porcentaje = porcentaje
+        asignacion.monto = monto
+        total_mecanicos += monto
+        nombres_mecanicos.append(f"{mecanico.nombres} {mecanico.apellidos}".strip())
+        if monto > 0:
+            montos[asignacion.mecanico_id] = (porcentaje, monto)
+
+    liquidaciones_actualizadas = set()
+    if montos:
+        fecha_base = (orden.fecha or datetime.utcnow()).date()
+        liquidaciones = _liquidaciones_pendientes(db, list(montos), fecha_base)
+        ids_por_mecanico = {mid: liq.id for mid, liq in liquidaciones.items()}
+
+        detalles_existentes = {
+            detalle.liquidacion_id: detalle
+            for detalle in db.query(LiquidacionMecanicoDetalle).filter(
+                LiquidacionMecanicoDetalle.liquidacion_id.in_(ids_por_mecanico.values()),
+                LiquidacionMecanicoDetalle.orden_id == orden.id
+            )
+        }
+
+        nuevos = []
+        for mecanico_id, (porcentaje, monto) in montos.items():
+            liquidacion_id = ids_por_mecanico[mecanico_id]
+            detalle = detalles_existentes.get(liquidacion_id)
+            if detalle:
+                detalle.porcentaje = porcentaje
+                detalle.base_calculo = total_servicios
+                detalle.monto = monto
+            else:
+                nuevos.append(LiquidacionMecanicoDetalle(
+                    liquidacion_id=liquidacion_id,
+                    orden_id=orden.id,
+                    porcentaje=porcentaje,
+                    base_calculo=total_servicios,
+                    monto=monto
+                ))
+            liquidaciones_actualizadas.add(liquidacion_id)
+
+        if nuevos:
+            db.add_all(nuevos)
+        db.flush()
+        recalcular_liquidaciones(db, liquidaciones_actualizadas)
+
+    if total_mecanicos > 0:
+        nombres_unicos = ", ".join(sorted(set(nombres_mecanicos))) or "Tecnico"
+        registrar_movimiento_caja(
+            db,
+            caja,
+            tipo="egreso",
+            monto=total_mecanicos,
+            categoria=CategoriaMovimiento.PROVISION_TECNICOS,
+            concepto=f"Pago pendiente tecnico {nombres_unicos} orden {orden.id}",
+            motivo=motivo,
+            orden_id=orden.id,
+            usuario=usuario
+        )
+
+    return {
+        "total_proveedores": total_proveedor,
+        "total_servicios": total_servicios,
+        "total_mecanicos": total_mecanicos,
+        "liquidaciones": sorted(liquidaciones_actualizadas),
+    }
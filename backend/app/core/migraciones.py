@@ -0,0 +1,143 @@
+"""
+Control de version del esquema.
+
+La tabla esquema_version guarda la ultima migracion aplicada y una huella
+del esquema declarado en los modelos. Si ambas coinciden con las del codigo
+al iniciar, no se hace ningun trabajo de esquema. Si no:
+
+- base nueva: create_all y queda en la ultima version;
+- base anterior: se aplican en orden las migraciones pendientes
+  (backend/app/migraciones);
+- al final se crean tablas, columnas nulas e indices declarados que falten,
+  y se guarda la huella nueva.
+"""
+
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from backend.app import models  # registra todos los modelos en Base.metadata
+from backend.app.core.database import Base, engine
+
+
+metadata_version = MetaData()
+
+esquema_version = Table(
+    "esquema_version",
+    metadata_version,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("huella", String(64), nullable=False),
+    Column("fecha", DateTime, nullable=False),
+)
+
+
+def columnas_de(conn, tabla: str) -> set[str]:
+    return {row[1] for row in conn.execute(text(f"PRAGMA table_info({tabla})"))}
+
+
+def huella_esquema(dialecto=None) -> str:
+    """
+    sha256 del DDL de todas las tablas e indices declarados en los modelos.
+    """
+    dialecto = dialecto or engine.dialect
+    sha = hashlib.sha256()
+    for tabla in Base.metadata.sorted_tables:
+        sha.update(str(CreateTable(tabla).compile(dialect=dialecto)).encode())
+        for indice in sorted(tabla.indexes, key=lambda i: i.name):
+            sha.update(str(CreateIndex(indice).compile(dialect=dialecto)).encode())
+    return sha.hexdigest()
+
+
+def _estado(conn):
+    """
+    (version, huella) guardadas. Version None si la base esta vacia y 0 si
+    tiene tablas pero es anterior al control de versiones.
+    """
+    tablas = {
+        row[0] for row in conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ))
+    }
+    if esquema_version.name in tablas:
+        fila = conn.execute(
+            select(esquema_version.c.version, esquema_version.c.huella)
+            .where(esquema_version.c.id == 1)
+        ).first()
+        if fila:
+            return fila.version, fila.huella
+    if tablas & set(Base.metadata.tables):
+        return 0, None
+    return None, None
+
+
+def _guardar(conn, version: int, huella: str):
+    valores = {"version": version, "huella": huella, "fecha": datetime.now()}
+    actualizadas = conn.execute(
+        esquema_version.update().where(esquema_version.c.id == 1).values(**valores)
+    ).rowcount
+    if not actualizadas:
+        conn.execute(esquema_version.insert().values(id=1, **valores))
+
+
+def sincronizar_esquema(conn):
+    """
+    Agrega lo que los modelos declaran y la base no tiene: tablas, columnas
+    nulas e indices. Una columna NOT NULL necesita su propia migracion.
+    """
+    Base.metadata.create_all(bind=conn)
+    for tabla in Base.metadata.sorted_tables:
+        existentes = columnas_de(conn, tabla.name)
+        for columna in tabla.columns:
+            if columna.name in existentes:
+                continue
+            if not columna.nullable:
+                raise RuntimeError(
+                    f"La columna {tabla.name}.{columna.name} no admite nulos: "
+                    "agregue una migracion en backend/app/migraciones"
+                )
+            tipo = columna.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}"))
+        for indice in tabla.indexes:
+            indice.create(conn, checkfirst=True)
+
+
+def migrar(motor=None) -> list[str]:
+    """
+    Deja la base en la ultima version. Devuelve los pasos aplicados (vacio
+    si ya estaba al dia).
+    """
+    from backend.app.migraciones import MIGRACIONES
+
+    motor = motor or engine
+    ultima = MIGRACIONES[-1].VERSION
+    huella = huella_esquema(motor.dialect)
+
+    with motor.connect() as conn:
+        version, huella_guardada = _estado(conn)
+    if version == ultima and huella_guardada == huella:
+        return []
+
+    pasos = []
+    with motor.begin() as conn:
+        metadata_version.create_all(bind=conn)
+        if version is None:
+            Base.metadata.create_all(bind=conn)
+            version, huella_guardada = ultima, huella
+            pasos.append("esquema inicial")
+
+        for migracion in MIGRACIONES:
+            if migracion.VERSION <= version:
+                continue
+            migracion.aplicar(conn)
+            version = migracion.VERSION
+            _guardar(conn, version, huella_guardada or "")
+            pasos.append(migracion.__name__.rsplit(".", 1)[-1])
+
+        if huella_guardada != huella:
+            sincronizar_esquema(conn)
+            pasos.append("sincronizar esquema")
+        _guardar(conn, version, huella)
+    return pasos
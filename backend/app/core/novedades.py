@@ -1,8 +1,33 @@
 """
 Utilidades para calcular alertas de mantenimiento.
+
+El estado de cada par vehiculo-regla se guarda en alertas_mantenimiento. Se
+recalcula solo lo afectado al confirmar una transaccion que cambie el
+kilometraje de un vehiculo, una regla o su seguimiento, y todo una vez al
+dia. Las vistas leen la tabla sin escribir.
 """
 
-from datetime import date
+import threading
+from datetime import date, datetime, time, timedelta
+from itertools import chain, repeat
+from math import ceil
+
+from sqlalchemy import Date, delete, event, func, insert, inspect, literal, or_, select, true, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload
+
+from backend.app.core.database import SessionLocal
+from backend.app.models.alerta_mantenimiento import AlertaMantenimiento
+from backend.app.models.recomendacion_regla import RecomendacionRegla
+from backend.app.models.vehiculo import Vehiculo
+from backend.app.models.vehiculo_recomendacion import VehiculoRecomendacion
+
+
+# Si el recalculo diario falla, se reintenta tras esta espera (segundos).
+REINTENTO_DIARIO = 60
+
+_parar_diario = threading.Event()
+_hilo_diario = None
 
 
 def calcular_estado_regla(vehiculo, regla, rec, hoy=None):
@@ -51,8 +76,12 @@ def calcular_estado_regla(vehiculo, regla, rec, hoy=None):
     }
 
 
-def construir_alerta_vehiculo(vehiculo, regla, rec):
-    estado = calcular_estado_regla(vehiculo, regla, rec)
+def construir_alerta_vehiculo(vehiculo, regla, estado):
+    """
+    estado: fila de AlertaMantenimiento o el dict de calcular_estado_regla.
+    """
+    if isinstance(estado, AlertaMantenimiento):
+        estado = {campo: getattr(estado, campo) for campo in CAMPOS_ESTADO}
     return {
         "vehiculo_id": vehiculo.id,
         "placa": vehiculo.placa,
@@ -68,3 +97,419 @@ def construir_alerta_vehiculo(vehiculo, regla, rec):
         "km_trans": estado["km_trans"],
         "dias_trans": estado["dias_trans"],
     }
+
+
+def alertas_por_vencer(db, dias: int = 30, hoy=None):
+    """
+    Alertas que aun no vencen y cuya fecha proyectada cae dentro de los
+    proximos 'dias'. Es un rango sobre el indice de fecha_proyectada.
+    """
+    hoy = hoy or date.today()
+    filas = db.query(AlertaMantenimiento, Vehiculo, RecomendacionRegla).join(
+        Vehiculo, Vehiculo.id == AlertaMantenimiento.vehiculo_id
+    ).join(
+        RecomendacionRegla, RecomendacionRegla.id == AlertaMantenimiento.regla_id
+    ).options(
+        joinedload(Vehiculo.cliente)
+    ).filter(
+        AlertaMantenimiento.fecha_proyectada >= hoy,
+        AlertaMantenimiento.fecha_proyectada <= hoy + timedelta(days=dias),
+        AlertaMantenimiento.estado != "vencido"
+    ).order_by(
+        AlertaMantenimiento.fecha_proyectada.asc(), Vehiculo.placa.asc()
+    ).all()
+
+    alertas = []
+    for estado, vehiculo, regla in filas:
+        cliente = vehiculo.cliente
+        alerta = construir_alerta_vehiculo(vehiculo, regla, estado)
+        alerta.update({
+            "cliente": cliente.nombre if cliente else "-",
+            "telefono": cliente.telefono if cliente and cliente.telefono else "-",
+            "km_actual": vehiculo.km_actual,
+            "km_dia": vehiculo.km_dia,
+            "fecha_proyectada": estado.fecha_proyectada,
+        })
+        alertas.append(alerta)
+    return alertas
+
+
+# ======================================================
+# EVALUACION POR LOTES
+# ======================================================
+
+def evaluar_lote(km_actual, km_base, fecha_base, intervalo_km, intervalo_dias,
+                 tolerancia_km, tolerancia_dias, hoy=None) -> dict:
+    """
+    calcular_estado_regla para muchos pares a la vez. Recibe columnas con una
+    posicion por par vehiculo-regla (None donde falte el dato) y devuelve
+    columnas con los campos de CAMPOS_ESTADO. Mismas reglas, sin objetos ni
+    dicts por par: cada par es una tupla y las columnas salen con zip.
+    """
+    hoy = (hoy or date.today()).toordinal()
+    filas = []
+    agregar = filas.append
+    for km, base, fecha, int_km, int_dias, tol_km, tol_dias in zip(
+        km_actual, km_base, fecha_base, intervalo_km, intervalo_dias,
+        tolerancia_km, tolerancia_dias
+    ):
+        if base is None:
+            base = km or 0
+        dias = hoy - fecha.toordinal() if fecha else 0
+        km_trans = km - base if km is not None and km > base else 0
+
+        if int_km:
+            avance = km_trans / int_km
+            km_restante = int_km - km_trans
+        else:
+            avance = 0
+            km_restante = None
+        if int_dias:
+            avance = max(avance, dias / int_dias)
+            dias_restante = int_dias - dias
+        else:
+            dias_restante = None
+
+        if (int_km and km_trans >= int_km) or (int_dias and dias >= int_dias):
+            estado = "vencido"
+        elif (int_km and km_trans >= max(int_km - (tol_km or 0), 0)) or (
+            int_dias and dias >= max(int_dias - (tol_dias or 0), 0)
+        ):
+            estado = "proximo"
+        else:
+            estado = "ok"
+
+        progreso = int(min(max(avance, 0), 1) * 100)
+        agregar((estado, progreso, km_restante, dias_restante, km_trans, dias))
+
+    columnas = list(zip(*filas)) or [()] * len(CAMPOS_ESTADO)
+    return dict(zip(CAMPOS_ESTADO, columnas))
+
+
+# ======================================================
+# ESTADO MATERIALIZADO
+# ======================================================
+
+CAMPOS_ESTADO = ("estado", "progreso", "km_restante", "dias_restante", "km_trans", "dias_trans")
+CAMPOS_GUARDADOS = CAMPOS_ESTADO + (
+    "km_vencimiento", "fecha_vencimiento", "fecha_proyectada", "fecha_calculo"
+)
+
+# Tope de la proyeccion por km (dias): evita fechas absurdas con km/dia minimos.
+MAX_DIAS_PROYECCION = 100 * 365
+
+
+def proyectar_vencimiento(km_actual, km_dia, fecha_km, km_vencimiento, fecha_vencimiento, hoy):
+    """
+    Fecha mas cercana entre el vencimiento por dias y el dia en que, al ritmo
+    de km_dia, el vehiculo alcanza km_vencimiento (contado desde la ultima
+    lectura). None si no hay con que proyectar.
+    """
+    fechas = [fecha_vencimiento] if fecha_vencimiento else []
+    if km_vencimiento is not None and km_dia:
+        dias = ceil((km_vencimiento - (km_actual or 0)) / km_dia)
+        dias = max(min(dias, MAX_DIAS_PROYECCION), -MAX_DIAS_PROYECCION)
+        fechas.append((fecha_km or hoy) + timedelta(days=dias))
+    return min(fechas) if fechas else None
+
+
+def provisionar_seguimiento(db, vehiculo_ids=None, regla_ids=None, hoy=None) -> int:
+    """
+    Crea en una sola sentencia (INSERT ... SELECT ... WHERE NOT EXISTS) el
+    seguimiento que falte para cada vehiculo y regla activa del alcance. El
+    indice unico del par lo hace idempotente aunque dos escrituras coincidan.
+    """
+    hoy = hoy or date.today()
+    faltantes = select(
+        Vehiculo.id,
+        RecomendacionRegla.id,
+        func.coalesce(Vehiculo.km_actual, 0),
+        literal(hoy, Date)
+    ).select_from(Vehiculo).join(RecomendacionRegla, true()).where(
+        RecomendacionRegla.activo == True,
+        ~select(VehiculoRecomendacion.id).where(
+            VehiculoRecomendacion.vehiculo_id == Vehiculo.id,
+            VehiculoRecomendacion.regla_id == RecomendacionRegla.id
+        ).exists()
+    )
+    if vehiculo_ids is not None or regla_ids is not None:
+        faltantes = faltantes.where(or_(
+            Vehiculo.id.in_(vehiculo_ids or ()),
+            RecomendacionRegla.id.in_(regla_ids or ())
+        ))
+
+    resultado = db.execute(
+        sqlite_insert(VehiculoRecomendacion).from_select(
+            ["vehiculo_id", "regla_id", "km_base", "fecha_base"], faltantes
+        ).on_conflict_do_nothing()
+    )
+    return resultado.rowcount
+
+
+def recalcular_alertas(db, vehiculo_ids=None, regla_ids=None, hoy=None) -> int:
+    """
+    Recalcula las alertas de los vehiculos y reglas indicados (todas si no se
+    indica ninguno), provisiona el seguimiento que falte y borra las alertas de
+    reglas inactivas o vehiculos eliminados. Lee columnas, evalua por lotes
+    y escribe solo las filas que cambian. No confirma la transaccion.
+    """
+    hoy = hoy or date.today()
+    todo = vehiculo_ids is None and regla_ids is None
+    vehiculo_ids = set(vehiculo_ids or ())
+    regla_ids = set(regla_ids or ())
+
+    def alcance(modelo):
+        if todo:
+            return []
+        return [or_(modelo.vehiculo_id.in_(vehiculo_ids), modelo.regla_id.in_(regla_ids))]
+
+    vehiculos = select(Vehiculo.id, Vehiculo.km_actual, Vehiculo.km_dia, Vehiculo.fecha_km)
+    reglas = select(
+        RecomendacionRegla.id,
+        RecomendacionRegla.intervalo_km,
+        RecomendacionRegla.intervalo_dias,
+        RecomendacionRegla.tolerancia_km,
+        RecomendacionRegla.tolerancia_dias
+    ).where(RecomendacionRegla.activo == True)
+    if not todo and not regla_ids:
+        vehiculos = vehiculos.where(Vehiculo.id.in_(vehiculo_ids))
+    if not todo and not vehiculo_ids:
+        reglas = reglas.where(RecomendacionRegla.id.in_(regla_ids))
+    # Tuplas simples: en flotas grandes el acceso por atributo de Row pesa.
+    vehiculos = [tuple(fila) for fila in db.execute(vehiculos)]
+    reglas = [tuple(fila) for fila in db.execute(reglas)]
+
+    pares = [
+        (vehiculo, regla)
+        for vehiculo in vehiculos
+        for regla in reglas
+        if todo or vehiculo[0] in vehiculo_ids or regla[0] in regla_ids
+    ]
+    claves = [(vehiculo[0], regla[0]) for vehiculo, regla in pares]
+
+    provisionar_seguimiento(
+        db, None if todo else vehiculo_ids, None if todo else regla_ids, hoy
+    )
+    bases = {
+        (fila[0], fila[1]): (fila[2], fila[3])
+        for fila in db.execute(
+            select(
+                VehiculoRecomendacion.vehiculo_id,
+                VehiculoRecomendacion.regla_id,
+                VehiculoRecomendacion.km_base,
+                VehiculoRecomendacion.fecha_base
+            ).where(*alcance(VehiculoRecomendacion)).order_by(VehiculoRecomendacion.id.asc())
+        )
+    }
+
+    km_base = []
+    fecha_base = []
+    for clave, (vehiculo, _) in zip(claves, pares):
+        km, fecha = bases[clave]
+        km_base.append((vehiculo[1] or 0) if km is None else km)
+        fecha_base.append(fecha or hoy)
+
+    # Posiciones de las tuplas: vehiculo (id, km_actual, km_dia, fecha_km);
+    # regla (id, intervalo_km, intervalo_dias, tolerancia_km, tolerancia_dias).
+    intervalo_km = [regla[1] for _, regla in pares]
+    intervalo_dias = [regla[2] for _, regla in pares]
+    lote = evaluar_lote(
+        [vehiculo[1] for vehiculo, _ in pares],
+        km_base,
+        fecha_base,
+        intervalo_km,
+        intervalo_dias,
+        [regla[3] for _, regla in pares],
+        [regla[4] for _, regla in pares],
+        hoy=hoy
+    )
+
+    km_vencimiento = [
+        base + intervalo if intervalo else None for base, intervalo in zip(km_base, intervalo_km)
+    ]
+    fecha_vencimiento = [
+        fecha + timedelta(days=intervalo) if intervalo else None
+        for fecha, intervalo in zip(fecha_base, intervalo_dias)
+    ]
+    fecha_proyectada = [
+        proyectar_vencimiento(vehiculo[1], vehiculo[2], vehiculo[3], km, fecha, hoy)
+        for (vehiculo, _), km, fecha in zip(pares, km_vencimiento, fecha_vencimiento)
+    ]
+    calculadas = zip(
+        *(lote[campo] for campo in CAMPOS_ESTADO),
+        km_vencimiento,
+        fecha_vencimiento,
+        fecha_proyectada,
+        repeat(hoy)
+    )
+
+    # Se comparan tuplas con el orden de CAMPOS_GUARDADOS.
+    existentes = {
+        (fila[1], fila[2]): fila
+        for fila in db.execute(
+            select(
+                AlertaMantenimiento.id,
+                AlertaMantenimiento.vehiculo_id,
+                AlertaMantenimiento.regla_id,
+                *(getattr(AlertaMantenimiento, campo) for campo in CAMPOS_GUARDADOS)
+            ).where(*alcance(AlertaMantenimiento))
+        )
+    }
+
+    nuevas = []
+    cambiadas = []
+    for clave, valores in zip(claves, calculadas):
+        actual = existentes.pop(clave, None)
+        if actual is None:
+            fila = dict(zip(CAMPOS_GUARDADOS, valores))
+            fila["vehiculo_id"], fila["regla_id"] = clave
+            nuevas.append(fila)
+        elif tuple(actual[3:]) != valores:
+            fila = dict(zip(CAMPOS_GUARDADOS, valores))
+            fila["id"] = actual[0]
+            cambiadas.append(fila)
+
+    if nuevas:
+        db.execute(insert(AlertaMantenimiento), nuevas)
+    if cambiadas:
+        db.execute(update(AlertaMantenimiento), cambiadas)
+    if existentes:
+        # Lo que queda no corresponde a ningun par vigente.
+        db.execute(
+            delete(AlertaMantenimiento).where(
+                AlertaMantenimiento.id.in_([fila[0] for fila in existentes.values()])
+            ),
+            execution_options={"synchronize_session": False}
+        )
+    return len(pares)
+
+
+def recalcular_todas_las_alertas():
+    db = SessionLocal()
+    try:
+        recalcular_alertas(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def recalcular_alertas_vencidas() -> bool:
+    """
+    Al iniciar: recalcula todo solo si la tabla esta vacia o alguna alerta se
+    calculo antes de hoy (el servidor estuvo apagado al cambiar el dia). Si no,
+    ya esta al dia y lo siguiente lo hacen las escrituras y el hilo diario.
+    """
+    db = SessionLocal()
+    try:
+        calculo_mas_antiguo = db.query(func.min(AlertaMantenimiento.fecha_calculo)).scalar()
+    finally:
+        db.close()
+    if calculo_mas_antiguo is not None and calculo_mas_antiguo >= date.today():
+        return False
+    recalcular_todas_las_alertas()
+    return True
+
+
+# ======================================================
+# RECALCULO POR ESCRITURAS
+# ======================================================
+
+def _pendientes(session) -> dict:
+    return session.info.setdefault(
+        "alertas_pendientes", {"todo": False, "vehiculos": set(), "reglas": set()}
+    )
+
+
+def _km_cambio(vehiculo) -> bool:
+    atributos = inspect(vehiculo).attrs
+    return any(
+        getattr(atributos, campo).history.has_changes()
+        for campo in ("km_actual", "km_dia", "fecha_km")
+    )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _anotar_cambios(session, contexto):
+    vehiculos = set()
+    reglas = set()
+    for objeto in chain(session.new, session.deleted):
+        if isinstance(objeto, Vehiculo):
+            vehiculos.add(objeto.id)
+        elif isinstance(objeto, RecomendacionRegla):
+            reglas.add(objeto.id)
+        elif isinstance(objeto, VehiculoRecomendacion):
+            vehiculos.add(objeto.vehiculo_id)
+    for objeto in session.dirty:
+        if isinstance(objeto, Vehiculo) and _km_cambio(objeto):
+            vehiculos.add(objeto.id)
+        elif isinstance(objeto, RecomendacionRegla):
+            reglas.add(objeto.id)
+        elif isinstance(objeto, VehiculoRecomendacion):
+            vehiculos.add(objeto.vehiculo_id)
+
+    if vehiculos or reglas:
+        pendientes = _pendientes(session)
+        pendientes["vehiculos"].update(vehiculos)
+        pendientes["reglas"].update(reglas)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _anotar_cambios_masivos(estado):
+    # update()/delete() masivos no dicen que filas tocaron: se recalcula todo.
+    if (estado.is_update or estado.is_delete) and estado.bind_mapper is not None:
+        if issubclass(estado.bind_mapper.class_, (Vehiculo, RecomendacionRegla, VehiculoRecomendacion)):
+            _pendientes(estado.session)["todo"] = True
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _recalcular_al_confirmar(session):
+    # Con autoflush apagado los cambios aun no se han enviado.
+    session.flush()
+    pendientes = session.info.pop("alertas_pendientes", None)
+    if not pendientes:
+        return
+    if pendientes["todo"]:
+        recalcular_alertas(session)
+    else:
+        recalcular_alertas(session, pendientes["vehiculos"], pendientes["reglas"])
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_cambios(session):
+    session.info.pop("alertas_pendientes", None)
+
+
+# ======================================================
+# RECALCULO DIARIO
+# ======================================================
+
+def _segundos_hasta_manana() -> float:
+    manana = datetime.combine(date.today() + timedelta(days=1), time.min)
+    return max((manana - datetime.now()).total_seconds(), 0) + 1
+
+
+def _recalculo_diario():
+    espera = _segundos_hasta_manana()
+    while not _parar_diario.wait(espera):
+        try:
+            recalcular_todas_las_alertas()
+            espera = _segundos_hasta_manana()
+        except Exception:
+            espera = REINTENTO_DIARIO
+
+
+def iniciar_recalculo_diario():
+    """
+    Los dias transcurridos avanzan sin que nadie escriba: un hilo recalcula
+    todas las alertas al empezar cada dia.
+    """
+    global _hilo_diario
+    if _hilo_diario is not None and _hilo_diario.is_alive():
+        return
+    _parar_diario.clear()
+    _hilo_diario = threading.Thread(target=_recalculo_diario, name="alertas-diarias", daemon=True)
+    _hilo_diario.start()
+
+
+def detener_recalculo_diario():
+    _parar_diario.set()
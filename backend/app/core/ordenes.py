@@ -0,0 +1,190 @@
+"""
+Consultas de ordenes de trabajo: listado paginado (cursor sobre fecha, id)
+y espacio de trabajo de una orden.
+"""
+
+import base64
+from datetime import date, datetime, time
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, joinedload
+
+from backend.app.models.detalle_almacen import DetalleAlmacen
+from backend.app.models.detalle_orden import DetalleOrden
+from backend.app.models.orden_mecanico import OrdenMecanico
+from backend.app.models.orden_trabajo import OrdenTrabajo
+
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
+
+
+def codificar_cursor(orden: OrdenTrabajo) -> str:
+    fecha = orden.fecha.isoformat() if orden.fecha else ""
+    valor = f"{fecha}|{orden.id}"
+    return base64.urlsafe_b64encode(valor.encode()).decode()
+
+
+def decodificar_cursor(cursor: str):
+    """
+    Devuelve (fecha, id), con fecha None si la fila no tenia fecha, o lanza
+    ValueError si el cursor no es valido.
+    """
+    try:
+        valor = base64.urlsafe_b64decode(cursor.encode()).decode()
+        fecha, orden_id = valor.split("|", 1)
+        return (datetime.fromisoformat(fecha) if fecha else None), int(orden_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Cursor invalido") from exc
+
+
+def paginar_por_fecha(query, modelo, limite: int, cursor: str | None = None):
+    """
+    Pagina query en orden (fecha DESC, id DESC) con cursor. SQLite deja las
+    filas sin fecha al final de ese orden: se piden aparte cuando se acaban
+    las fechadas, para que el cursor de una fila fechada siga usando el
+    rango del indice. Devuelve (filas, siguiente_cursor); lanza ValueError
+    si el cursor no es valido.
+    """
+    orden = (modelo.fecha.desc(), modelo.id.desc())
+    fecha, fila_id = decodificar_cursor(cursor) if cursor else (None, None)
+    sin_fecha = query.filter(modelo.fecha.is_(None))
+
+    if not cursor:
+        filas = query.order_by(*orden).limit(limite + 1).all()
+    elif fecha is None:
+        filas = sin_fecha.filter(modelo.id < fila_id).order_by(modelo.id.desc()).limit(limite + 1).all()
+    else:
+        filas = query.filter(or_(
+            modelo.fecha < fecha,
+            and_(modelo.fecha == fecha, modelo.id < fila_id)
+        )).order_by(*orden).limit(limite + 1).all()
+        if len(filas) <= limite:
+            filas += sin_fecha.order_by(modelo.id.desc()).limit(limite + 1 - len(filas)).all()
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(filas[-1])
+    return filas, siguiente
+
+
+def filtrar_ordenes(
+    query,
+    estado: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    cliente_id: int | None = None,
+    vehiculo_id: int | None = None,
+    forma_pago: str | None = None
+):
+    if estado:
+        query = query.filter(OrdenTrabajo.estado == estado)
+    if desde:
+        query = query.filter(OrdenTrabajo.fecha >= datetime.combine(desde, time.min))
+    if hasta:
+        query = query.filter(OrdenTrabajo.fecha <= datetime.combine(hasta, time.max))
+    if cliente_id:
+        query = query.filter(OrdenTrabajo.cliente_id == cliente_id)
+    if vehiculo_id:
+        query = query.filter(OrdenTrabajo.vehiculo_id == vehiculo_id)
+    if forma_pago:
+        query = query.filter(OrdenTrabajo.forma_pago == forma_pago)
+    return query
+
+
+def paginar_ordenes(
+    db: Session,
+    limite: int = LIMITE_POR_DEFECTO,
+    cursor: str | None = None,
+    **filtros
+):
+    """
+    Pagina las ordenes de la mas reciente a la mas antigua. Cliente y
+    vehiculo se cargan en la misma consulta. Devuelve (ordenes, siguiente_cursor).
+    """
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    query = filtrar_ordenes(db.query(OrdenTrabajo), **filtros).options(
+        joinedload(OrdenTrabajo.cliente),
+        joinedload(OrdenTrabajo.vehiculo)
+    )
+
+    return paginar_por_fecha(query, OrdenTrabajo, limite, cursor)
+
+
+def resumen_estados(db: Session, **filtros):
+    """
+    Conteo por estado con los mismos filtros del listado.
+    """
+    filas = filtrar_ordenes(
+        db.query(OrdenTrabajo.estado, func.count(OrdenTrabajo.id)),
+        **filtros
+    ).group_by(OrdenTrabajo.estado).all()
+
+    resumen = {"abierta": 0, "en_proceso": 0, "cerrada": 0, "cancelada": 0, "total": 0}
+    for estado, cantidad in filas:
+        clave = estado if estado in resumen else "abierta"
+        resumen[clave] += cantidad
+        resumen["total"] += cantidad
+    return resumen
+
+
+def cargar_workspace_orden(db: Session, orden_id: int):
+    """
+    Orden con servicios, insumos, tecnicos y totales en cuatro consultas
+    fijas, sin importar cuantas lineas tenga. Devuelve None si no existe.
+    """
+    orden = db.query(OrdenTrabajo).options(
+        joinedload(OrdenTrabajo.cliente),
+        joinedload(OrdenTrabajo.vehiculo)
+    ).filter(OrdenTrabajo.id == orden_id).first()
+    if not orden:
+        return None
+
+    servicios = db.query(DetalleOrden).options(
+        joinedload(DetalleOrden.servicio)
+    ).filter(DetalleOrden.orden_id == orden_id).order_by(DetalleOrden.id.asc()).all()
+
+    insumos = db.query(DetalleAlmacen).options(
+        joinedload(DetalleAlmacen.item)
+    ).filter(DetalleAlmacen.orden_id == orden_id).order_by(DetalleAlmacen.id.asc()).all()
+
+    asignaciones = db.query(OrdenMecanico).options(
+        joinedload(OrdenMecanico.mecanico)
+    ).filter(OrdenMecanico.orden_id == orden_id).order_by(OrdenMecanico.id.asc()).all()
+
+    total_servicios = sum(detalle.subtotal or 0.0 for detalle in servicios)
+    total_insumos = sum(detalle.subtotal or 0.0 for detalle in insumos)
+
+    return {
+        "orden": orden,
+        "servicios": [
+            {
+                "id": detalle.id,
+                "servicio_id": detalle.servicio_id,
+                "servicio_nombre": detalle.servicio.nombre if detalle.servicio else None,
+                "cantidad": detalle.cantidad,
+                "precio_unitario": detalle.precio_unitario,
+                "subtotal": detalle.subtotal,
+            }
+            for detalle in servicios
+        ],
+        "insumos": [
+            {
+                "id": detalle.id,
+                "item_id": detalle.item_id,
+                "item_nombre": detalle.item.nombre if detalle.item else None,
+                "unidad": detalle.item.unidad if detalle.item else None,
+                "cantidad": detalle.cantidad,
+                "precio_unitario": detalle.precio_unitario,
+                "subtotal": detalle.subtotal,
+            }
+            for detalle in insumos
+        ],
+        "mecanicos": asignaciones,
+        "totales": {
+            "servicios": total_servicios,
+            "insumos": total_insumos,
+            "total": orden.total or 0.0,
+        },
+    }
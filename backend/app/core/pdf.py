@@ -0,0 +1,337 @@
+"""
+Motor de PDFs del taller.
+
+Estilos de parrafo, estilos de tabla y el logo se preparan una sola vez por
+proceso y se reutilizan en cada documento. El logo original es mucho mas
+grande de lo que se imprime; se reduce a la resolucion de impresion al
+cargarlo y se guarda en memoria ya codificado.
+
+Plantillas: orden de trabajo, recibo de nomina y reporte tabular.
+"""
+
+import io
+import os
+from functools import lru_cache
+
+from PIL import Image as ImagenPIL
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from backend.app.core.templates import _base_app_dir
+
+
+# Flujos binarios en lugar de ASCII85: el codificador de ReportLab en Python
+# puro era la mayor parte del tiempo de cada documento.
+rl_config.useA85 = 0
+
+TALLER = "<b>MEDINAUTOS</b><br/>Telefono: 3166191371"
+LOGO_ANCHO = 90
+LOGO_ALTO = 60
+# Pixeles por punto del logo impreso (3 = ~216 dpi).
+LOGO_ESCALA = 3
+
+
+# ======================================================
+# RECURSOS COMPARTIDOS
+# ======================================================
+
+ESTILO_ENCABEZADO = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+])
+
+ESTILO_FICHA = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
+    ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+])
+
+ESTILO_FICHA_ORDEN = TableStyle([
+    ("BACKGROUND", (0, 4), (-1, 4), colors.whitesmoke),
+    ("BACKGROUND", (0, 11), (-1, 11), colors.whitesmoke),
+], parent=ESTILO_FICHA)
+
+ESTILO_DETALLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+])
+
+ESTILO_TOTALES = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
+    ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+    ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+])
+
+ESTILO_TOTAL = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
+    ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+    ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+])
+
+ESTILO_RESUMEN_REPORTE = TableStyle([
+    ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+], parent=ESTILO_FICHA)
+
+ESTILO_FIRMAS = TableStyle([
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+])
+
+
+@lru_cache(maxsize=1)
+def estilos():
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=8)
+def _estilo_tabla(columnas_derecha: tuple):
+    comandos = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]
+    for columna in columnas_derecha:
+        comandos.append(("ALIGN", (columna, 1), (columna, -1), "RIGHT"))
+    comandos.append(("ALIGN", (0, 0), (-1, 0), "CENTER"))
+    return TableStyle(comandos)
+
+
+@lru_cache(maxsize=1)
+def _logo_png() -> bytes | None:
+    ruta = os.path.join(_base_app_dir(), "static", "img", "logo_medinautos.png")
+    if not os.path.exists(ruta):
+        return None
+    with ImagenPIL.open(ruta) as imagen:
+        reducida = imagen.resize(
+            (LOGO_ANCHO * LOGO_ESCALA, LOGO_ALTO * LOGO_ESCALA),
+            ImagenPIL.LANCZOS
+        )
+    salida = io.BytesIO()
+    reducida.save(salida, format="PNG", optimize=True)
+    return salida.getvalue()
+
+
+def logo():
+    contenido = _logo_png()
+    if contenido is None:
+        return Paragraph("MEDINAUTOS", estilos()["Heading2"])
+    return Image(io.BytesIO(contenido), width=LOGO_ANCHO, height=LOGO_ALTO)
+
+
+def formatear_moneda(valor):
+    return f"${(valor or 0):,.0f}".replace(",", ".")
+
+
+def _formatear_fecha(valor):
+    return valor.strftime("%Y-%m-%d %I:%M %p") if valor else "-"
+
+
+def _documento(ruta, pagesize):
+    return SimpleDocTemplate(ruta, pagesize=pagesize, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
+
+
+def encabezado(segunda_fila, anchos):
+    """
+    Logo y datos del taller, mas una fila propia de cada documento.
+    """
+    tabla = Table([
+        [logo(), Paragraph(TALLER, estilos()["Normal"])],
+        segunda_fila,
+    ], colWidths=anchos)
+    tabla.setStyle(ESTILO_ENCABEZADO)
+    return tabla
+
+
+def _tabla(filas, anchos, estilo):
+    tabla = Table(filas, colWidths=anchos)
+    tabla.setStyle(estilo)
+    return tabla
+
+
+def _etiqueta_pago(valor, vacio):
+    if valor == "efectivo":
+        return "Efectivo"
+    if valor == "transferencia":
+        return "Transferencia"
+    return valor or vacio
+
+
+# ======================================================
+# PLANTILLA: ORDEN DE TRABAJO
+# ======================================================
+
+def documento_orden(ruta, datos):
+    """
+    datos: orden, cliente, vehiculo (dicts o None), servicios e insumos
+    (listas de dicts con nombre, cantidad, precio y subtotal).
+    """
+    styles = estilos()
+    orden = datos["orden"]
+    cliente = datos["cliente"] or {}
+    vehiculo = datos["vehiculo"] or {}
+    servicios = datos["servicios"]
+    insumos = datos["insumos"]
+
+    def campo(origen, clave):
+        valor = origen.get(clave)
+        return valor if valor not in (None, "") else "-"
+
+    story = [
+        encabezado([
+            Paragraph(f"<b>Orden:</b> #{orden['id']}", styles["Normal"]),
+            Paragraph(f"<b>Fecha:</b> {_formatear_fecha(orden['fecha'])}", styles["Normal"])
+        ], [120, 380]),
+        Spacer(1, 12),
+        _tabla([
+            [Paragraph("<b>Cliente</b>", styles["Normal"]), ""],
+            [f"{campo(cliente, 'nombre')}", f"Documento: {campo(cliente, 'documento')}"],
+            [f"Telefono: {campo(cliente, 'telefono')}", f"Email: {campo(cliente, 'email')}"],
+            ["", ""],
+            [Paragraph("<b>Vehiculo</b>", styles["Normal"]), ""],
+            [f"Placa: {campo(vehiculo, 'placa')}", f"Marca: {campo(vehiculo, 'marca')}"],
+            [f"Linea: {campo(vehiculo, 'modelo')}", f"Modelo: {campo(vehiculo, 'anio')}"],
+            [f"Cilindraje: {campo(vehiculo, 'cilindraje')}", f"Clase: {campo(vehiculo, 'clase')}"],
+            [f"Km actual: {campo(vehiculo, 'km_actual')}", f"Color: {campo(vehiculo, 'color')}"],
+            [f"Ingreso: {_formatear_fecha(orden['fecha'])}", f"Salida: {_formatear_fecha(orden['fecha_salida'])}"],
+            ["", ""],
+            [Paragraph("<b>Forma de pago</b>", styles["Normal"]), _etiqueta_pago(orden["forma_pago"], "No definida")],
+        ], [260, 260], ESTILO_FICHA_ORDEN),
+        Spacer(1, 14),
+    ]
+
+    for titulo, lineas in (("Servicios", servicios), ("Insumos", insumos)):
+        if not lineas:
+            continue
+        filas = [["Descripcion", "Cantidad", "Precio", "Subtotal"]]
+        filas += [
+            [linea["nombre"], linea["cantidad"], formatear_moneda(linea["precio"]), formatear_moneda(linea["subtotal"])]
+            for linea in lineas
+        ]
+        story += [
+            Paragraph(f"<b>{titulo}</b>", styles["Heading4"]),
+            _tabla(filas, [260, 80, 90, 90], ESTILO_DETALLE),
+            Spacer(1, 10),
+        ]
+
+    total_servicios = sum(linea["subtotal"] or 0.0 for linea in servicios)
+    total_insumos = sum(linea["subtotal"] or 0.0 for linea in insumos)
+    story += [
+        _tabla([
+            ["Total servicios", formatear_moneda(total_servicios)],
+            ["Total insumos", formatear_moneda(total_insumos)]
+        ], [200, 120], ESTILO_TOTALES),
+        Spacer(1, 8),
+        _tabla(
+            [[Paragraph("<b>Total</b>", styles["Normal"]), formatear_moneda(orden["total"] or 0.0)]],
+            [400, 120],
+            ESTILO_TOTAL
+        ),
+    ]
+
+    if orden["descripcion"]:
+        story += [
+            Spacer(1, 12),
+            Paragraph("<b>Observaciones</b>", styles["Heading4"]),
+            Paragraph(orden["descripcion"].replace("\n", "<br/>"), styles["Normal"]),
+        ]
+
+    story += [
+        Spacer(1, 20),
+        _tabla([
+            ["Firma cliente", "Firma tecnico", "Firma taller"],
+            ["____________________", "____________________", "____________________"],
+            ["", "", ""],
+            ["Nombre: ____________________", "Nombre: ____________________", "Nombre: ____________________"]
+        ], [180, 180, 180], ESTILO_FIRMAS),
+    ]
+
+    _documento(ruta, A4).build(story)
+    return ruta
+
+
+# ======================================================
+# PLANTILLA: RECIBO DE NOMINA
+# ======================================================
+
+def recibo_nomina(ruta, datos):
+    """
+    datos: liquidacion, mecanico (o None), detalles [orden_id, porcentaje,
+    base, monto] y metodo_pago.
+    """
+    styles = estilos()
+    liquidacion = datos["liquidacion"]
+    mecanico = datos["mecanico"]
+
+    nombre_mecanico = "Tecnico"
+    documento = "-"
+    if mecanico:
+        nombre_mecanico = f"{mecanico['nombres']} {mecanico['apellidos']}".strip()
+        documento = mecanico["documento"] or "-"
+
+    filas = [["Orden", "%", "Base", "Monto"]]
+    filas += [
+        [f"#{orden_id}", f"{porcentaje}%", formatear_moneda(base_calculo), formatear_moneda(monto)]
+        for orden_id, porcentaje, base_calculo, monto in datos["detalles"]
+    ]
+    if len(filas) == 1:
+        filas.append(["-", "-", formatear_moneda(0), formatear_moneda(0)])
+
+    story = [
+        encabezado([
+            Paragraph(f"<b>Liquidacion:</b> #{liquidacion['id']}", styles["Normal"]),
+            Paragraph(f"<b>Fecha:</b> {_formatear_fecha(liquidacion['fecha_creacion'])}", styles["Normal"])
+        ], [120, 380]),
+        Spacer(1, 12),
+        _tabla([
+            [Paragraph("<b>Recibo de pago de nomina</b>", styles["Normal"]), ""],
+            [f"Tecnico: {nombre_mecanico}", f"Documento: {documento}"],
+            [f"Periodo: {liquidacion['fecha_inicio']} - {liquidacion['fecha_fin']}", f"Frecuencia: {liquidacion['frecuencia']}"],
+            [f"Estado: {liquidacion['estado']}", f"Metodo de pago: {_etiqueta_pago(datos['metodo_pago'], 'No definido')}"],
+        ], [260, 260], ESTILO_FICHA),
+        Spacer(1, 14),
+        Paragraph("<b>Detalle por orden</b>", styles["Heading4"]),
+        _tabla(filas, [100, 80, 160, 160], ESTILO_DETALLE),
+        Spacer(1, 12),
+        _tabla([
+            [Paragraph("<b>Total base</b>", styles["Normal"]), formatear_moneda(liquidacion["total_base"])],
+            [Paragraph("<b>Total a pagar</b>", styles["Normal"]), formatear_moneda(liquidacion["total_pagado"])]
+        ], [400, 120], ESTILO_TOTALES),
+        Spacer(1, 20),
+        Paragraph("Firma tecnico: ____________________", styles["Normal"]),
+        Paragraph("Firma y sello taller: ____________________", styles["Normal"]),
+    ]
+
+    _documento(ruta, A4).build(story)
+    return ruta
+
+
+# ======================================================
+# PLANTILLA: REPORTE TABULAR
+# ======================================================
+
+def reporte_tabular(ruta, titulo, info, columnas, filas, anchos, resumen, columnas_derecha=()):
+    """
+    Reporte de una tabla: info y resumen son listas de pares [etiqueta, valor].
+    columnas_derecha indica que columnas se alinean a la derecha.
+    """
+    styles = estilos()
+    story = [
+        encabezado([Paragraph(f"<b>{titulo}</b>", styles["Heading3"]), ""], [120, 420]),
+        Spacer(1, 10),
+        _tabla(info, [90, 450], ESTILO_FICHA),
+        Spacer(1, 12),
+        _tabla([columnas] + filas, anchos, _estilo_tabla(tuple(columnas_derecha))),
+        Spacer(1, 12),
+        _tabla(resumen, [140, 150], ESTILO_RESUMEN_REPORTE),
+    ]
+
+    _documento(ruta, letter).build(story)
+    return ruta
@@ -0,0 +1,149 @@
+"""
+Cache de PDFs generados, direccionada por el contenido del documento.
+
+Cada archivo se nombra <documento>-<hash>.pdf, donde el hash sale de los
+datos que se imprimen. Si la orden o liquidacion cambia, cambia el hash:
+la version anterior se borra al guardar la nueva y nunca se sirve vieja.
+El tamano total de la carpeta se limita expulsando los menos usados.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse
+
+from backend.app.core.etag import etag_coincide
+
+
+CARPETA_CACHE = os.path.join("backend", "app", "cache", "pdfs")
+LIMITE_BYTES = 200 * 1024 * 1024
+
+# Se incrementa cuando cambia el diseno de las plantillas, para no servir
+# documentos generados con el formato anterior.
+VERSION_PLANTILLAS = "2"
+
+_bloqueo_expulsion = threading.Lock()
+
+
+def huella_documento(datos) -> str:
+    contenido = json.dumps(
+        {"version": VERSION_PLANTILLAS, "datos": jsonable_encoder(datos)},
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True
+    ).encode("utf-8")
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def _carpeta():
+    os.makedirs(CARPETA_CACHE, exist_ok=True)
+    return CARPETA_CACHE
+
+
+def _ruta(documento: str, huella: str) -> str:
+    if not re.fullmatch(r"[A-Za-z0-9_]+", documento):
+        raise ValueError(f"Nombre de documento invalido: {documento}")
+    return os.path.join(_carpeta(), f"{documento}-{huella}.pdf")
+
+
+def obtener_pdf(documento: str, huella: str, generar) -> str:
+    """
+    Devuelve la ruta del PDF en cache, generandolo con generar(ruta) si no
+    existe. La escritura va a un temporal y se publica con os.replace, asi
+    dos solicitudes simultaneas nunca ven un archivo a medio escribir.
+    """
+    ruta = _ruta(documento, huella)
+    if os.path.exists(ruta):
+        # El mtime marca el ultimo uso para la expulsion LRU.
+        try:
+            os.utime(ruta, None)
+            return ruta
+        except FileNotFoundError:
+            pass
+
+    descriptor, temporal = tempfile.mkstemp(suffix=".tmp", dir=_carpeta())
+    os.close(descriptor)
+    try:
+        generar(temporal)
+        os.replace(temporal, ruta)
+    except Exception:
+        # Tras un 504 el pool tambien lo borra cuando termina.
+        try:
+            os.remove(temporal)
+        except FileNotFoundError:
+            pass
+        raise
+
+    invalidar_documento(documento, conservar=huella)
+    _expulsar_excedente(proteger=ruta)
+    return ruta
+
+
+def invalidar_documento(documento: str, conservar: str | None = None):
+    """
+    Borra las versiones en cache de un documento (todas, o todas menos la
+    huella indicada).
+    """
+    for ruta in glob.glob(os.path.join(_carpeta(), f"{glob.escape(documento)}-*.pdf")):
+        if conservar and ruta.endswith(f"-{conservar}.pdf"):
+            continue
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+def _expulsar_excedente(proteger: str | None = None):
+    with _bloqueo_expulsion:
+        archivos = []
+        total = 0
+        for entrada in os.scandir(_carpeta()):
+            if not entrada.is_file() or not entrada.name.endswith(".pdf"):
+                continue
+            if proteger and entrada.path == proteger:
+                continue
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            archivos.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+
+        if total <= LIMITE_BYTES:
+            return
+
+        for _, tamano, ruta in sorted(archivos):
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                continue
+            total -= tamano
+            if total <= LIMITE_BYTES:
+                break
+
+
+def respuesta_pdf(request: Request, documento: str, datos, generar, nombre_archivo: str):
+    """
+    Responde el PDF desde la cache con ETag. Si el cliente ya tiene esta
+    version (If-None-Match) responde 304 sin tocar el disco.
+    """
+    huella = huella_documento(datos)
+    etag = f'"{huella}"'
+    encabezados = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_coincide(request, etag):
+        return Response(status_code=304, headers=encabezados)
+
+    ruta = obtener_pdf(documento, huella, generar)
+    return FileResponse(
+        path=ruta,
+        filename=nombre_archivo,
+        media_type="application/pdf",
+        headers=encabezados
+    )
@@ -0,0 +1,84 @@
+"""
+Cuenta corriente de proveedores: registro de movimientos y saldo incremental.
+"""
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from backend.app.models.movimiento_proveedor import MovimientoProveedor
+from backend.app.models.proveedor import Proveedor
+
+
+TIPOS_CARGO = ("cargo", "ajuste_cargo")
+TIPOS_PAGO = ("pago", "abono", "ajuste_abono")
+TIPOS_MOVIMIENTO_PROVEEDOR = TIPOS_CARGO + TIPOS_PAGO
+
+
+def registrar_movimiento_proveedor(db: Session, proveedor_id: int, tipo: str, subtotal: float, **campos):
+    """
+    Crea un MovimientoProveedor y aplica su subtotal a los acumulados del
+    proveedor dentro de la misma transaccion de la sesion.
+    """
+    if tipo not in TIPOS_MOVIMIENTO_PROVEEDOR:
+        raise ValueError(f"Tipo de movimiento de proveedor invalido: {tipo}")
+
+    movimiento = MovimientoProveedor(
+        proveedor_id=proveedor_id,
+        tipo=tipo,
+        subtotal=subtotal,
+        **campos
+    )
+    db.add(movimiento)
+    _aplicar_a_proveedor(db, proveedor_id, tipo, subtotal or 0.0)
+    return movimiento
+
+
+def _aplicar_a_proveedor(db: Session, proveedor_id: int, tipo: str, subtotal: float):
+    # Igual que en las cajas: UPDATE relativo, sin leer antes el saldo.
+    if tipo in TIPOS_CARGO:
+        valores = {
+            Proveedor.total_cargos: func.coalesce(Proveedor.total_cargos, 0.0) + subtotal,
+            Proveedor.saldo: func.coalesce(Proveedor.saldo, 0.0) + subtotal,
+        }
+    else:
+        valores = {
+            Proveedor.total_pagos: func.coalesce(Proveedor.total_pagos, 0.0) + subtotal,
+            Proveedor.saldo: func.coalesce(Proveedor.saldo, 0.0) - subtotal,
+        }
+    db.query(Proveedor).filter(Proveedor.id == proveedor_id).update(
+        valores, synchronize_session="fetch"
+    )
+
+
+def saldo_de(proveedor: Proveedor | None) -> dict:
+    if proveedor is None:
+        return {"cargos": 0.0, "pagos": 0.0, "saldo": 0.0}
+    return {
+        "cargos": proveedor.total_cargos or 0.0,
+        "pagos": proveedor.total_pagos or 0.0,
+        "saldo": proveedor.saldo or 0.0,
+    }
+
+
+def recalcular_saldos_proveedores(db: Session):
+    """
+    Recalcula desde cero los acumulados de todos los proveedores con una
+    sola lectura agrupada sobre movimientos_proveedor.
+    """
+    totales = {
+        fila.proveedor_id: fila
+        for fila in db.query(
+            MovimientoProveedor.proveedor_id,
+            func.coalesce(func.sum(case(
+                (MovimientoProveedor.tipo.in_(TIPOS_CARGO), MovimientoProveedor.subtotal), else_=0.0
+            )), 0.0).label("cargos"),
+            func.coalesce(func.sum(case(
+                (MovimientoProveedor.tipo.in_(TIPOS_PAGO), MovimientoProveedor.subtotal), else_=0.0
+            )), 0.0).label("pagos")
+        ).group_by(MovimientoProveedor.proveedor_id)
+    }
+    for proveedor in db.query(Proveedor).all():
+        fila = totales.get(proveedor.id)
+        proveedor.total_cargos = float(fila.cargos) if fila else 0.0
+        proveedor.total_pagos = float(fila.pagos) if fila else 0.0
+        proveedor.saldo = proveedor.total_cargos - proveedor.total_pagos
@@ -0,0 +1,244 @@
+"""
+Sugerencias de reabastecimiento del almacen.
+
+Con una sola consulta agrupada sobre movimientos_almacen se calcula el
+consumo de cada insumo en una ventana movil (salidas y ajustes de salida
+menos devoluciones y ajustes de devolucion), el consumo diario y los dias de
+stock que quedan. Se sugiere pedir cuando el stock esta en o bajo el minimo,
+o cuando no alcanza para el plazo de entrega; la cantidad sugerida lleva el
+stock hasta cubrir plazo + cobertura por encima del minimo. Las sugerencias
+se agrupan por proveedor.
+
+Como el snapshot del dashboard, el resultado se guarda en memoria hasta el
+siguiente movimiento de stock (o cambio de insumos/proveedores), o hasta que
+cambie el dia, que mueve la ventana.
+"""
+
+import math
+import threading
+from datetime import date, datetime, timedelta
+from itertools import chain
+
+from sqlalchemy import and_, case, event, func
+from sqlalchemy.orm import Session
+
+from backend.app.core.database import SessionLocal
+from backend.app.core.etag import calcular_etag, serializar_json
+from backend.app.models.almacen_item import AlmacenItem
+from backend.app.models.movimiento_almacen import MovimientoAlmacen
+from backend.app.models.proveedor import Proveedor
+
+
+VENTANA_POR_DEFECTO = 30
+PLAZO_POR_DEFECTO = 7
+COBERTURA_POR_DEFECTO = 30
+
+# Los movimientos "ajuste" anteriores no guardaban el sentido y no se cuentan.
+TIPOS_CONSUMO = ("salida", "ajuste_salida")
+TIPOS_REINTEGRO = ("devolucion", "ajuste_devolucion")
+
+MODELOS_REABASTECIMIENTO = (AlmacenItem, MovimientoAlmacen, Proveedor)
+
+_bloqueo = threading.Lock()
+_generacion = 0
+_snapshots = {}
+
+
+# ======================================================
+# CALCULO
+# ======================================================
+
+def consumo_por_item(db: Session, desde: datetime):
+    """
+    Insumos activos con su consumo neto desde la fecha dada, en una consulta
+    agrupada (ix_movimientos_almacen_item_fecha_tipo la cubre).
+    """
+    consumo = func.coalesce(func.sum(case(
+        (MovimientoAlmacen.tipo.in_(TIPOS_CONSUMO), MovimientoAlmacen.cantidad),
+        else_=-MovimientoAlmacen.cantidad
+    )), 0.0)
+    return db.query(
+        AlmacenItem.id,
+        AlmacenItem.nombre,
+        AlmacenItem.unidad,
+        AlmacenItem.stock_actual,
+        AlmacenItem.stock_minimo,
+        AlmacenItem.valor_proveedor,
+        AlmacenItem.proveedor_id,
+        Proveedor.nombre.label("proveedor"),
+        consumo.label("consumo")
+    ).outerjoin(
+        MovimientoAlmacen,
+        and_(
+            MovimientoAlmacen.item_id == AlmacenItem.id,
+            MovimientoAlmacen.fecha >= desde,
+            MovimientoAlmacen.tipo.in_(TIPOS_CONSUMO + TIPOS_REINTEGRO)
+        )
+    ).outerjoin(
+        Proveedor, Proveedor.id == AlmacenItem.proveedor_id
+    ).filter(
+        AlmacenItem.activo == True
+    ).group_by(AlmacenItem.id).all()
+
+
+def _sugerencia(fila, ventana_dias: int, plazo_dias: int, cobertura_dias: int):
+    stock = fila.stock_actual or 0.0
+    minimo = fila.stock_minimo or 0.0
+    consumo = max(float(fila.consumo), 0.0)
+    diario = consumo / ventana_dias
+    dias_restantes = round(stock / diario, 1) if diario > 0 else None
+
+    bajo_minimo = minimo > 0 and stock <= minimo
+    se_agota = dias_restantes is not None and dias_restantes <= plazo_dias
+    if not (bajo_minimo or se_agota):
+        return None
+
+    objetivo = minimo + diario * (plazo_dias + cobertura_dias)
+    # El redondeo evita pedir una unidad de mas por error de punto flotante.
+    cantidad = math.ceil(round(max(objetivo - stock, 0.0), 6))
+    valor = fila.valor_proveedor or 0.0
+    return {
+        "item_id": fila.id,
+        "nombre": fila.nombre,
+        "unidad": fila.unidad,
+        "stock_actual": stock,
+        "stock_minimo": minimo,
+        "consumo_ventana": consumo,
+        "consumo_diario": round(diario, 3),
+        "dias_restantes": dias_restantes,
+        "motivo": "bajo_minimo" if bajo_minimo else "agotamiento",
+        "cantidad_sugerida": cantidad,
+        "valor_unitario": valor,
+        "costo_estimado": cantidad * valor,
+    }
+
+
+def calcular_reabastecimiento(
+    db: Session,
+    ventana_dias: int = VENTANA_POR_DEFECTO,
+    plazo_dias: int = PLAZO_POR_DEFECTO,
+    cobertura_dias: int = COBERTURA_POR_DEFECTO,
+    hoy: date | None = None
+):
+    hoy = hoy or date.today()
+    desde = datetime.combine(hoy - timedelta(days=ventana_dias), datetime.min.time())
+
+    grupos = {}
+    for fila in consumo_por_item(db, desde):
+        sugerencia = _sugerencia(fila, ventana_dias, plazo_dias, cobertura_dias)
+        if sugerencia is None:
+            continue
+        grupo = grupos.setdefault(fila.proveedor_id, {
+            "proveedor_id": fila.proveedor_id,
+            "proveedor": fila.proveedor or "Sin proveedor",
+            "items": [],
+            "costo_estimado": 0.0,
+        })
+        grupo["items"].append(sugerencia)
+        grupo["costo_estimado"] += sugerencia["costo_estimado"]
+
+    # Lo mas urgente primero; sin consumo (solo bajo el minimo) al final.
+    for grupo in grupos.values():
+        grupo["items"].sort(key=lambda item: (
+            item["dias_restantes"] is None,
+            item["dias_restantes"] or 0.0,
+            item["nombre"]
+        ))
+    proveedores = sorted(grupos.values(), key=lambda grupo: (
+        grupo["proveedor_id"] is None,
+        grupo["proveedor"]
+    ))
+
+    items = [item for grupo in proveedores for item in grupo["items"]]
+    return {
+        "fecha": hoy,
+        "ventana_dias": ventana_dias,
+        "plazo_dias": plazo_dias,
+        "cobertura_dias": cobertura_dias,
+        "items_total": len(items),
+        "items_bajo_minimo": sum(1 for item in items if item["motivo"] == "bajo_minimo"),
+        "costo_estimado": sum(grupo["costo_estimado"] for grupo in proveedores),
+        "proveedores": proveedores,
+    }
+
+
+# ======================================================
+# SNAPSHOT
+# ======================================================
+
+def obtener_reabastecimiento(
+    db: Session,
+    ventana_dias: int = VENTANA_POR_DEFECTO,
+    plazo_dias: int = PLAZO_POR_DEFECTO,
+    cobertura_dias: int = COBERTURA_POR_DEFECTO
+):
+    """
+    Devuelve (contenido_json, etag) de las sugerencias, recalculando solo si
+    hubo movimientos de stock desde el ultimo calculo o si cambio el dia.
+    """
+    clave = (ventana_dias, plazo_dias, cobertura_dias)
+    hoy = date.today()
+    snapshot = _snapshots.get(clave)
+    if snapshot and snapshot["generacion"] == _generacion and snapshot["fecha"] == hoy:
+        return snapshot["contenido"], snapshot["etag"]
+
+    with _bloqueo:
+        snapshot = _snapshots.get(clave)
+        if snapshot and snapshot["generacion"] == _generacion and snapshot["fecha"] == hoy:
+            return snapshot["contenido"], snapshot["etag"]
+
+        generacion = _generacion
+        contenido = serializar_json(calcular_reabastecimiento(db, *clave, hoy=hoy))
+        # Los snapshots de otros parametros ya vencidos no se vuelven a usar.
+        for otra in [c for c, s in _snapshots.items() if s["generacion"] != generacion]:
+            del _snapshots[otra]
+        _snapshots[clave] = {
+            "generacion": generacion,
+            "fecha": hoy,
+            "contenido": contenido,
+            "etag": calcular_etag(contenido),
+        }
+        return contenido, _snapshots[clave]["etag"]
+
+
+def invalidar_reabastecimiento():
+    global _generacion
+    _generacion += 1
+
+
+# ======================================================
+# INVALIDACION POR ESCRITURAS
+# ======================================================
+
+def _afecta_reabastecimiento(objetos) -> bool:
+    return any(isinstance(objeto, MODELOS_REABASTECIMIENTO) for objeto in objetos)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _marcar_cambios(session, contexto):
+    if _afecta_reabastecimiento(chain(session.new, session.dirty, session.deleted)):
+        session.info["reabastecimiento_cambio"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _marcar_cambios_masivos(estado):
+    # Los cambios de stock de core/almacen son UPDATE directos, sin flush.
+    if (estado.is_insert or estado.is_update or estado.is_delete) and estado.bind_mapper is not None:
+        if issubclass(estado.bind_mapper.class_, MODELOS_REABASTECIMIENTO):
+            estado.session.info["reabastecimiento_cambio"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_al_confirmar(session):
+    # Con el escritor unico cada unidad es un SAVEPOINT; se espera al COMMIT.
+    if session.in_nested_transaction():
+        return
+    if session.info.pop("reabastecimiento_cambio", False):
+        invalidar_reabastecimiento()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_cambios(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop("reabastecimiento_cambio", None)
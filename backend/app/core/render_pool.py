@@ -0,0 +1,228 @@
+"""
+Pool de procesos para renderizar PDFs y Excel fuera del servidor.
+
+ReportLab y openpyxl usan CPU y retienen el GIL; en un proceso aparte un
+reporte grande no congela al resto de usuarios. El pool es acotado: si hay
+demasiados documentos pendientes se responde 429 en lugar de encolar sin fin.
+Si un proceso del pool muere (memoria, fallo) el pool queda roto; se descarta
+y el siguiente documento crea uno nuevo.
+
+Dos formas de uso:
+- renderizar(): espera el resultado (documentos pequenos, camino rapido).
+- encolar_trabajo(): devuelve un trabajo que se consulta y se descarga luego.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturoTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+from backend.app.core import documentos
+
+
+CARPETA_TRABAJOS = os.path.join("backend", "app", "cache", "render")
+MAX_PROCESOS = max(1, min(2, os.cpu_count() or 1))
+MAX_PENDIENTES = 8
+TTL_TRABAJOS = 15 * 60
+ESPERA_SINCRONA = 60
+REINTENTAR_EN = 5
+
+_bloqueo = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_en_vuelo = []
+_trabajos = {}
+
+
+def _ejecutar(tipo: str, ruta: str, datos):
+    # Corre en el proceso hijo: escribe a un temporal y lo publica al final,
+    # asi nunca se descarga un archivo a medio escribir.
+    temporal = f"{ruta}.tmp"
+    try:
+        documentos.RENDERIZADORES[tipo](temporal, datos)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return ruta
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn tambien en Linux: el hijo no hereda sesiones ni hilos del servidor.
+        _pool = ProcessPoolExecutor(
+            max_workers=MAX_PROCESOS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _descartar_pool(pool: ProcessPoolExecutor):
+    # Se llama con _bloqueo tomado.
+    global _pool
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _vigilar(pool: ProcessPoolExecutor):
+    def al_terminar(futuro):
+        if not futuro.cancelled() and isinstance(futuro.exception(), BrokenProcessPool):
+            with _bloqueo:
+                _descartar_pool(pool)
+    return al_terminar
+
+
+def _borrar(ruta: str):
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def _carpeta():
+    os.makedirs(CARPETA_TRABAJOS, exist_ok=True)
+    return CARPETA_TRABAJOS
+
+
+def _enviar(tipo: str, ruta: str, datos):
+    if tipo not in documentos.RENDERIZADORES:
+        raise ValueError(f"Tipo de documento invalido: {tipo}")
+
+    with _bloqueo:
+        _en_vuelo[:] = [futuro for futuro in _en_vuelo if not futuro.done()]
+        if len(_en_vuelo) >= MAX_PENDIENTES:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Hay {len(_en_vuelo)} documentos en cola, intente de nuevo en unos segundos",
+                headers={"Retry-After": str(REINTENTAR_EN)}
+            )
+        pool = _obtener_pool()
+        try:
+            futuro = pool.submit(_ejecutar, tipo, os.path.abspath(ruta), datos)
+        except BrokenProcessPool:
+            # Se rompio con un documento anterior: se reemplaza y se reintenta.
+            _descartar_pool(pool)
+            pool = _obtener_pool()
+            futuro = pool.submit(_ejecutar, tipo, os.path.abspath(ruta), datos)
+        _en_vuelo.append(futuro)
+    futuro.add_done_callback(_vigilar(pool))
+    return futuro
+
+
+def _posicion(futuro) -> int:
+    """
+    0 si ya se esta procesando; si no, cuantos documentos van antes + 1.
+    """
+    with _bloqueo:
+        pendientes = [f for f in _en_vuelo if not f.done() and not f.running()]
+    if futuro not in pendientes:
+        return 0
+    return pendientes.index(futuro) + 1
+
+
+def renderizar(tipo: str, ruta: str, datos) -> str:
+    """
+    Renderiza en el pool y espera el resultado. Bloquea solo el hilo de la
+    solicitud, no el GIL del servidor.
+    """
+    futuro = _enviar(tipo, ruta, datos)
+    try:
+        return futuro.result(timeout=ESPERA_SINCRONA)
+    except FuturoTimeout:
+        # Si ya se esta generando no se puede detener: el archivo que publique
+        # se borra al terminar, porque quien lo pidio ya no lo va a servir.
+        if not futuro.cancel():
+            futuro.add_done_callback(lambda _: _borrar(ruta))
+        raise HTTPException(status_code=504, detail="El documento tardo demasiado en generarse")
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=503,
+            detail="El generador de documentos se reinicio, intente de nuevo",
+            headers={"Retry-After": str(REINTENTAR_EN)}
+        )
+
+
+def ruta_temporal(extension: str) -> str:
+    descriptor, ruta = tempfile.mkstemp(suffix=extension, dir=_carpeta())
+    os.close(descriptor)
+    return ruta
+
+
+# ======================================================
+# TRABAJOS
+# ======================================================
+
+def _limpiar_vencidos():
+    limite = time.time() - TTL_TRABAJOS
+    with _bloqueo:
+        vencidos = [
+            trabajo for trabajo in _trabajos.values()
+            if trabajo["futuro"].done() and trabajo["creado"] < limite
+        ]
+        for trabajo in vencidos:
+            _trabajos.pop(trabajo["id"], None)
+    for trabajo in vencidos:
+        _borrar(trabajo["ruta"])
+
+
+def encolar_trabajo(tipo: str, datos, nombre_archivo: str, media_type: str):
+    _limpiar_vencidos()
+    trabajo_id = uuid.uuid4().hex
+    extension = os.path.splitext(nombre_archivo)[1]
+    ruta = os.path.join(_carpeta(), f"{trabajo_id}{extension}")
+    futuro = _enviar(tipo, ruta, datos)
+
+    trabajo = {
+        "id": trabajo_id,
+        "tipo": tipo,
+        "ruta": os.path.abspath(ruta),
+        "nombre_archivo": nombre_archivo,
+        "media_type": media_type,
+        "creado": time.time(),
+        "futuro": futuro,
+    }
+    with _bloqueo:
+        _trabajos[trabajo_id] = trabajo
+    return trabajo
+
+
+def obtener_trabajo(trabajo_id: str):
+    _limpiar_vencidos()
+    with _bloqueo:
+        return _trabajos.get(trabajo_id)
+
+
+def estado_trabajo(trabajo) -> dict:
+    futuro = trabajo["futuro"]
+    if futuro.done():
+        error = futuro.exception()
+        estado = "error" if error else "listo"
+    elif futuro.running():
+        estado, error = "procesando", None
+    else:
+        estado, error = "en_cola", None
+
+    return {
+        "trabajo_id": trabajo["id"],
+        "tipo": trabajo["tipo"],
+        "estado": estado,
+        "posicion": _posicion(futuro) if estado == "en_cola" else 0,
+        "error": str(error) if error else None,
+        "nombre_archivo": trabajo["nombre_archivo"],
+        "url_estado": f"/api/documentos/trabajos/{trabajo['id']}",
+        "url_descarga": f"/api/documentos/trabajos/{trabajo['id']}/descarga",
+    }
+
+
+def cerrar_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -14,36 +14,23 @@ from fastapi.staticfiles import StaticFiles
 from backend.app.core.templates import templates
 
 # Base de datos
-from backend.app.core.database import engine
-from sqlalchemy import text
+from backend.app.core.migraciones import migrar
 
-# Modelos (IMPORTANTE para crear tablas)
+# Modelos
 from backend.app.models.usuario import Usuario
-from backend.app.models.cliente import Cliente
-from backend.app.models.vehiculo import Vehiculo
-from backend.app.models.servicio import Servicio
-from backend.app.models.categoria_servicio import CategoriaServicio
-from backend.app.models.orden_trabajo import OrdenTrabajo
-from backend.app.models.detalle_orden import DetalleOrden
-from backend.app.models.mecanico import Mecanico
-from backend.app.models.orden_mecanico import OrdenMecanico
-from backend.app.models.proveedor import Proveedor
-from backend.app.models.almacen_item import AlmacenItem
-from backend.app.models.movimiento_almacen import MovimientoAlmacen
-from backend.app.models.detalle_almacen import DetalleAlmacen
-from backend.app.models.herramienta import Herramienta
-from backend.app.models.prestamo_herramienta import PrestamoHerramienta
-from backend.app.models.caja import Caja
-from backend.app.models.movimiento_caja import MovimientoCaja
-from backend.app.models.movimiento_proveedor import MovimientoProveedor
-from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
-from backend.app.models.liquidacion_mecanico_detalle import LiquidacionMecanicoDetalle
 from backend.app.models.recomendacion_regla import RecomendacionRegla
-from backend.app.models.vehiculo_recomendacion import VehiculoRecomendacion
 
 from sqlalchemy.orm import Session
 from backend.app.core.database import SessionLocal
 from backend.app.core.security import encriptar_password
+from backend.app.core.render_pool import cerrar_pool
+from backend.app.core.checkpoints import detener_checkpoints, iniciar_checkpoints
+from backend.app.core.escritor import MODO_ESCRITOR_UNICO, detener_escritor, iniciar_escritor
+from backend.app.core.novedades import (
+    detener_recalculo_diario,
+    iniciar_recalculo_diario,
+    recalcular_alertas_vencidas,
+)
 
 # Rutas
 from backend.app.routes import clientes
@@ -62,6 +49,8 @@ from backend.app.routes import contabilidad
 from backend.app.routes import reportes
 from backend.app.routes import reportes_export
 from backend.app.routes import novedades
+from backend.app.routes import documentos
+from backend.app.routes import eventos
 
 
 def crear_admin_si_no_existe():
@@ -87,16 +76,6 @@ def crear_admin_si_no_existe():
     finally:
         db.close()
 
-def asegurar_columnas():
-    with engine.begin() as conn:
-        resultado = conn.execute(text("PRAGMA table_info(ordenes_trabajo)"))
-        columnas = {row[1] for row in resultado}
-        if "forma_pago" not in columnas:
-            conn.execute(text("ALTER TABLE ordenes_trabajo ADD COLUMN forma_pago VARCHAR(30)"))
-        if "fecha_salida" not in columnas:
-            conn.execute(text("ALTER TABLE ordenes_trabajo ADD COLUMN fecha_salida DATETIME"))
-
-
 def asegurar_reglas_novedades():
     reglas_base = [
         {"nombre": "Cambio de aceite", "descripcion": "Aceite de motor y filtro", "km": 5000, "dias": 180},
@@ -158,35 +137,13 @@ app = FastAPI(
 )
 
 # ============================================
-# Crear tablas si no existen
+# Esquema de la base (migraciones)
 # ============================================
 
-Usuario.metadata.create_all(bind=engine)
-Cliente.metadata.create_all(bind=engine)
-Vehiculo.metadata.create_all(bind=engine)
-Servicio.metadata.create_all(bind=engine)
-CategoriaServicio.metadata.create_all(bind=engine)
-OrdenTrabajo.metadata.create_all(bind=engine)
-DetalleOrden.metadata.create_all(bind=engine)
-Mecanico.metadata.create_all(bind=engine)
-OrdenMecanico.metadata.create_all(bind=engine)
-Proveedor.metadata.create_all(bind=engine)
-AlmacenItem.metadata.create_all(bind=engine)
-MovimientoAlmacen.metadata.create_all(bind=engine)
-DetalleAlmacen.metadata.create_all(bind=engine)
-Herramienta.metadata.create_all(bind=engine)
-PrestamoHerramienta.metadata.create_all(bind=engine)
-Caja.metadata.create_all(bind=engine)
-MovimientoCaja.metadata.create_all(bind=engine)
-MovimientoProveedor.metadata.create_all(bind=engine)
-LiquidacionMecanico.metadata.create_all(bind=engine)
-LiquidacionMecanicoDetalle.metadata.create_all(bind=engine)
-RecomendacionRegla.metadata.create_all(bind=engine)
-VehiculoRecomendacion.metadata.create_all(bind=engine)
-
-asegurar_columnas()
+migrar()
 crear_admin_si_no_existe()
 asegurar_reglas_novedades()
+recalcular_alertas_vencidas()
 
 
 # ============================================
@@ -235,7 +192,29 @@ app.include_router(herramientas.router, prefix="/api")
 app.include_router(contabilidad.router, prefix="/api")
 app.include_router(reportes.router, prefix="/api")
 app.include_router(reportes_export.router, prefix="/api")
+app.include_router(documentos.router, prefix="/api")
 app.include_router(novedades.router)
+app.include_router(eventos.router)    # EVENTOS EN VIVO (SSE)
+
+
+# ============================================
+# INICIO / CIERRE
+# ============================================
+
+@app.on_event("startup")
+def iniciar_tareas():
+    iniciar_recalculo_diario()
+    iniciar_checkpoints()
+    if MODO_ESCRITOR_UNICO:
+        iniciar_escritor()
+
+
+@app.on_event("shutdown")
+def cerrar_procesos_renderizado():
+    cerrar_pool()
+    detener_escritor()
+    detener_recalculo_diario()
+    detener_checkpoints()
 
 
 # ============================================
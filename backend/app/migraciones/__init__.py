@@ -0,0 +1,33 @@
+"""
+Migraciones de esquema, en orden.
+
+Cada modulo tiene VERSION y aplicar(conn). Se importan explicitamente (y no
+buscando archivos) para que PyInstaller las incluya en el ejecutable. Una
+base nueva se crea con create_all y queda en la ultima version; estas solo
+se ejecutan sobre bases anteriores. Cada una escribe su propio DDL, sin leer
+los modelos, para que lo que aplica no cambie cuando cambien ellos.
+"""
+
+from backend.app.migraciones import (
+    v001_tablas,
+    v002_columnas_ordenes,
+    v003_totales_cajas,
+    v004_categoria_movimientos,
+    v005_kilometraje,
+    v006_seguimiento_unico,
+    v007_indices_filtros,
+    v008_saldos_proveedores,
+    v009_indices_libros,
+)
+
+MIGRACIONES = [
+    v001_tablas,
+    v002_columnas_ordenes,
+    v003_totales_cajas,
+    v004_categoria_movimientos,
+    v005_kilometraje,
+    v006_seguimiento_unico,
+    v007_indices_filtros,
+    v008_saldos_proveedores,
+    v009_indices_libros,
+]
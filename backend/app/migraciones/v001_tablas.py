@@ -0,0 +1,430 @@
+"""
+Crea las tablas que no existan en bases anteriores al control de versiones,
+y sus indices por id. El DDL es el del esquema al introducir las migraciones,
+asi que ya trae las columnas que agregan v002-v005 (totales de cajas,
+categoria, kilometraje, forma de pago); sobre una tabla recien creada, y por
+lo tanto vacia, esas migraciones no tienen nada que hacer.
+"""
+
+from sqlalchemy import text
+
+VERSION = 1
+
+TABLAS = (
+    """
+    CREATE TABLE IF NOT EXISTS cajas (
+        id INTEGER NOT NULL,
+        fecha_apertura DATETIME NOT NULL,
+        fecha_cierre DATETIME,
+        saldo_inicial FLOAT,
+        saldo_final FLOAT,
+        total_ingresos FLOAT,
+        total_egresos FLOAT,
+        estado VARCHAR(20),
+        observaciones VARCHAR(255),
+        usuario_apertura VARCHAR(100),
+        usuario_cierre VARCHAR(100),
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS categorias_servicio (
+        id INTEGER NOT NULL,
+        nombre VARCHAR(80) NOT NULL,
+        descripcion VARCHAR(255),
+        activo BOOLEAN,
+        fecha_creacion DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (nombre)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clientes (
+        id INTEGER NOT NULL,
+        nombre VARCHAR NOT NULL,
+        documento VARCHAR NOT NULL,
+        telefono VARCHAR,
+        email VARCHAR,
+        PRIMARY KEY (id),
+        UNIQUE (documento)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS herramientas (
+        id INTEGER NOT NULL,
+        nombre VARCHAR(120) NOT NULL,
+        codigo VARCHAR(80) NOT NULL,
+        descripcion VARCHAR(255),
+        ubicacion VARCHAR(120),
+        valor FLOAT,
+        estado VARCHAR(30),
+        activo BOOLEAN,
+        fecha_creacion DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (codigo)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS mecanicos (
+        id INTEGER NOT NULL,
+        nombres VARCHAR(100) NOT NULL,
+        apellidos VARCHAR(100) NOT NULL,
+        documento VARCHAR(50) NOT NULL,
+        telefono VARCHAR(20),
+        email VARCHAR(100),
+        especialidad VARCHAR(80),
+        eps VARCHAR(100),
+        tipo_sangre VARCHAR(10),
+        fecha_nacimiento DATE,
+        contacto_emergencia_nombre VARCHAR(120),
+        contacto_emergencia_parentesco VARCHAR(60),
+        contacto_emergencia_telefono VARCHAR(20),
+        fecha_ingreso DATE,
+        activo BOOLEAN,
+        porcentaje_base FLOAT,
+        fecha_creacion DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (documento)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS proveedores (
+        id INTEGER NOT NULL,
+        nombre VARCHAR(120) NOT NULL,
+        nit VARCHAR(50),
+        telefono VARCHAR(30),
+        email VARCHAR(120),
+        direccion VARCHAR(150),
+        activo BOOLEAN,
+        fecha_creacion DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (nombre)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recomendaciones_reglas (
+        id INTEGER NOT NULL,
+        nombre VARCHAR NOT NULL,
+        descripcion VARCHAR,
+        intervalo_km INTEGER,
+        intervalo_dias INTEGER,
+        tolerancia_km INTEGER NOT NULL,
+        tolerancia_dias INTEGER NOT NULL,
+        activo BOOLEAN NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (nombre)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS servicios (
+        id INTEGER NOT NULL,
+        nombre VARCHAR(100) NOT NULL,
+        descripcion VARCHAR(255),
+        precio FLOAT NOT NULL,
+        categoria VARCHAR(50),
+        activo BOOLEAN,
+        fecha_creacion DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (nombre)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id INTEGER NOT NULL,
+        username VARCHAR NOT NULL,
+        password VARCHAR NOT NULL,
+        rol VARCHAR,
+        PRIMARY KEY (id),
+        UNIQUE (username)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS almacen_items (
+        id INTEGER NOT NULL,
+        nombre VARCHAR(120) NOT NULL,
+        descripcion VARCHAR(255),
+        categoria VARCHAR(80),
+        unidad VARCHAR(20) NOT NULL,
+        stock_actual FLOAT,
+        stock_minimo FLOAT,
+        valor_proveedor FLOAT,
+        valor_taller FLOAT,
+        proveedor_id INTEGER,
+        activo BOOLEAN,
+        fecha_creacion DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (nombre),
+        FOREIGN KEY(proveedor_id) REFERENCES proveedores (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS liquidaciones_mecanicos (
+        id INTEGER NOT NULL,
+        mecanico_id INTEGER NOT NULL,
+        fecha_inicio DATE NOT NULL,
+        fecha_fin DATE NOT NULL,
+        frecuencia VARCHAR(20) NOT NULL,
+        total_base FLOAT,
+        total_pagado FLOAT,
+        estado VARCHAR(20),
+        fecha_creacion DATETIME,
+        usuario VARCHAR(100),
+        observaciones VARCHAR(255),
+        PRIMARY KEY (id),
+        FOREIGN KEY(mecanico_id) REFERENCES mecanicos (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS prestamos_herramienta (
+        id INTEGER NOT NULL,
+        herramienta_id INTEGER NOT NULL,
+        mecanico_id INTEGER NOT NULL,
+        fecha_prestamo DATETIME,
+        fecha_devolucion DATETIME,
+        observaciones VARCHAR(255),
+        PRIMARY KEY (id),
+        FOREIGN KEY(herramienta_id) REFERENCES herramientas (id),
+        FOREIGN KEY(mecanico_id) REFERENCES mecanicos (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS vehiculos (
+        id INTEGER NOT NULL,
+        placa VARCHAR NOT NULL,
+        marca VARCHAR NOT NULL,
+        modelo VARCHAR NOT NULL,
+        color VARCHAR,
+        anio INTEGER,
+        cilindraje INTEGER,
+        clase VARCHAR,
+        km_actual INTEGER,
+        fecha_km DATE,
+        km_dia FLOAT,
+        cliente_id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(cliente_id) REFERENCES clientes (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alertas_mantenimiento (
+        id INTEGER NOT NULL,
+        vehiculo_id INTEGER NOT NULL,
+        regla_id INTEGER NOT NULL,
+        estado VARCHAR NOT NULL,
+        progreso INTEGER NOT NULL,
+        km_trans INTEGER NOT NULL,
+        dias_trans INTEGER NOT NULL,
+        km_restante INTEGER,
+        dias_restante INTEGER,
+        km_vencimiento INTEGER,
+        fecha_vencimiento DATE,
+        fecha_proyectada DATE,
+        fecha_calculo DATE NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_alertas_mantenimiento_vehiculo_regla UNIQUE (vehiculo_id, regla_id),
+        FOREIGN KEY(vehiculo_id) REFERENCES vehiculos (id),
+        FOREIGN KEY(regla_id) REFERENCES recomendaciones_reglas (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ordenes_trabajo (
+        id INTEGER NOT NULL,
+        fecha DATETIME,
+        fecha_reapertura DATETIME,
+        fecha_salida DATETIME,
+        descripcion VARCHAR(255) NOT NULL,
+        estado VARCHAR(20),
+        total FLOAT,
+        forma_pago VARCHAR(30),
+        km_ingreso INTEGER,
+        cliente_id INTEGER NOT NULL,
+        vehiculo_id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(cliente_id) REFERENCES clientes (id),
+        FOREIGN KEY(vehiculo_id) REFERENCES vehiculos (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS vehiculos_recomendaciones (
+        id INTEGER NOT NULL,
+        vehiculo_id INTEGER NOT NULL,
+        regla_id INTEGER NOT NULL,
+        km_base INTEGER,
+        fecha_base DATE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(vehiculo_id) REFERENCES vehiculos (id),
+        FOREIGN KEY(regla_id) REFERENCES recomendaciones_reglas (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS detalle_almacen (
+        id INTEGER NOT NULL,
+        orden_id INTEGER NOT NULL,
+        item_id INTEGER NOT NULL,
+        proveedor_id INTEGER,
+        cantidad FLOAT NOT NULL,
+        precio_unitario FLOAT NOT NULL,
+        subtotal FLOAT NOT NULL,
+        costo_proveedor_unitario FLOAT NOT NULL,
+        subtotal_proveedor FLOAT NOT NULL,
+        margen_subtotal FLOAT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id),
+        FOREIGN KEY(item_id) REFERENCES almacen_items (id),
+        FOREIGN KEY(proveedor_id) REFERENCES proveedores (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS detalle_orden (
+        id INTEGER NOT NULL,
+        orden_id INTEGER NOT NULL,
+        servicio_id INTEGER NOT NULL,
+        cantidad INTEGER NOT NULL,
+        precio_unitario FLOAT NOT NULL,
+        subtotal FLOAT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id),
+        FOREIGN KEY(servicio_id) REFERENCES servicios (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lecturas_kilometraje (
+        id INTEGER NOT NULL,
+        vehiculo_id INTEGER NOT NULL,
+        km INTEGER NOT NULL,
+        fecha DATETIME NOT NULL,
+        origen VARCHAR(20) NOT NULL,
+        orden_id INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(vehiculo_id) REFERENCES vehiculos (id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS liquidaciones_mecanicos_detalle (
+        id INTEGER NOT NULL,
+        liquidacion_id INTEGER NOT NULL,
+        orden_id INTEGER NOT NULL,
+        porcentaje FLOAT NOT NULL,
+        base_calculo FLOAT NOT NULL,
+        monto FLOAT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(liquidacion_id) REFERENCES liquidaciones_mecanicos (id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS movimientos_almacen (
+        id INTEGER NOT NULL,
+        tipo VARCHAR(20) NOT NULL,
+        cantidad FLOAT NOT NULL,
+        valor_unitario FLOAT,
+        observaciones VARCHAR(255),
+        fecha DATETIME,
+        item_id INTEGER NOT NULL,
+        proveedor_id INTEGER,
+        orden_id INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(item_id) REFERENCES almacen_items (id),
+        FOREIGN KEY(proveedor_id) REFERENCES proveedores (id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS movimientos_caja (
+        id INTEGER NOT NULL,
+        caja_id INTEGER NOT NULL,
+        tipo VARCHAR(20) NOT NULL,
+        categoria VARCHAR(30),
+        concepto VARCHAR(120) NOT NULL,
+        monto FLOAT NOT NULL,
+        fecha DATETIME,
+        motivo VARCHAR(255),
+        usuario VARCHAR(100),
+        orden_id INTEGER,
+        proveedor_id INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(caja_id) REFERENCES cajas (id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id),
+        FOREIGN KEY(proveedor_id) REFERENCES proveedores (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS movimientos_proveedor (
+        id INTEGER NOT NULL,
+        proveedor_id INTEGER NOT NULL,
+        orden_id INTEGER,
+        item_id INTEGER,
+        tipo VARCHAR(20) NOT NULL,
+        cantidad FLOAT,
+        valor_unitario FLOAT,
+        subtotal FLOAT NOT NULL,
+        motivo VARCHAR(255),
+        fecha DATETIME,
+        usuario VARCHAR(100),
+        PRIMARY KEY (id),
+        FOREIGN KEY(proveedor_id) REFERENCES proveedores (id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id),
+        FOREIGN KEY(item_id) REFERENCES almacen_items (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ordenes_mecanicos (
+        id INTEGER NOT NULL,
+        orden_id INTEGER NOT NULL,
+        mecanico_id INTEGER NOT NULL,
+        porcentaje FLOAT,
+        monto FLOAT,
+        fecha_asignacion DATETIME,
+        observaciones VARCHAR(255),
+        PRIMARY KEY (id),
+        CONSTRAINT uq_orden_mecanico UNIQUE (orden_id, mecanico_id),
+        FOREIGN KEY(orden_id) REFERENCES ordenes_trabajo (id),
+        FOREIGN KEY(mecanico_id) REFERENCES mecanicos (id)
+    )
+    """,
+)
+
+# (nombre, tabla, columnas)
+INDICES = (
+    ("ix_cajas_id", "cajas", "id"),
+    ("ix_categorias_servicio_id", "categorias_servicio", "id"),
+    ("ix_clientes_id", "clientes", "id"),
+    ("ix_herramientas_id", "herramientas", "id"),
+    ("ix_mecanicos_id", "mecanicos", "id"),
+    ("ix_proveedores_id", "proveedores", "id"),
+    ("ix_recomendaciones_reglas_id", "recomendaciones_reglas", "id"),
+    ("ix_servicios_id", "servicios", "id"),
+    ("ix_usuarios_id", "usuarios", "id"),
+    ("ix_almacen_items_id", "almacen_items", "id"),
+    ("ix_liquidaciones_mecanicos_id", "liquidaciones_mecanicos", "id"),
+    ("ix_prestamos_herramienta_id", "prestamos_herramienta", "id"),
+    ("ix_vehiculos_id", "vehiculos", "id"),
+    ("ix_alertas_mantenimiento_id", "alertas_mantenimiento", "id"),
+    ("ix_ordenes_trabajo_id", "ordenes_trabajo", "id"),
+    ("ix_vehiculos_recomendaciones_id", "vehiculos_recomendaciones", "id"),
+    ("ix_detalle_almacen_id", "detalle_almacen", "id"),
+    ("ix_detalle_orden_id", "detalle_orden", "id"),
+    ("ix_lecturas_kilometraje_id", "lecturas_kilometraje", "id"),
+    ("ix_liquidaciones_mecanicos_detalle_id", "liquidaciones_mecanicos_detalle", "id"),
+    ("ix_movimientos_almacen_id", "movimientos_almacen", "id"),
+    ("ix_movimientos_caja_id", "movimientos_caja", "id"),
+    ("ix_movimientos_proveedor_id", "movimientos_proveedor", "id"),
+    ("ix_ordenes_mecanicos_id", "ordenes_mecanicos", "id"),
+)
+
+INDICES_UNICOS = (
+    ("ix_vehiculos_placa", "vehiculos", "placa"),
+)
+
+
+def aplicar(conn):
+    for sentencia in TABLAS:
+        conn.execute(text(sentencia))
+    for unico, indices in ((False, INDICES), (True, INDICES_UNICOS)):
+        for nombre, tabla, columnas in indices:
+            conn.execute(text(
+                f"CREATE {'UNIQUE ' if unico else ''}INDEX IF NOT EXISTS {nombre} "
+                f"ON {tabla} ({columnas})"
+            ))
@@ -0,0 +1,24 @@
+"""
+Forma de pago, fecha de salida y km de ingreso en ordenes_trabajo, e indice
+del listado paginado (fecha, id).
+"""
+
+from sqlalchemy import text
+
+from backend.app.core.migraciones import columnas_de
+
+VERSION = 2
+
+
+def aplicar(conn):
+    columnas = columnas_de(conn, "ordenes_trabajo")
+    if "forma_pago" not in columnas:
+        conn.execute(text("ALTER TABLE ordenes_trabajo ADD COLUMN forma_pago VARCHAR(30)"))
+    if "fecha_salida" not in columnas:
+        conn.execute(text("ALTER TABLE ordenes_trabajo ADD COLUMN fecha_salida DATETIME"))
+    if "km_ingreso" not in columnas:
+        conn.execute(text("ALTER TABLE ordenes_trabajo ADD COLUMN km_ingreso INTEGER"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_ordenes_trabajo_fecha_id "
+        "ON ordenes_trabajo (fecha, id)"
+    ))
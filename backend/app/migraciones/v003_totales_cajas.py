@@ -0,0 +1,33 @@
+"""
+Totales de ingresos y egresos guardados en cajas, calculados desde sus
+movimientos.
+"""
+
+from sqlalchemy import text
+
+from backend.app.core.migraciones import columnas_de
+
+VERSION = 3
+
+
+def aplicar(conn):
+    if "total_ingresos" in columnas_de(conn, "cajas"):
+        return
+    conn.execute(text("ALTER TABLE cajas ADD COLUMN total_ingresos FLOAT DEFAULT 0"))
+    conn.execute(text("ALTER TABLE cajas ADD COLUMN total_egresos FLOAT DEFAULT 0"))
+    conn.execute(text("""
+        UPDATE cajas SET
+            total_ingresos = COALESCE((
+                SELECT SUM(m.monto) FROM movimientos_caja m
+                WHERE m.caja_id = cajas.id AND m.tipo = 'ingreso'
+            ), 0),
+            total_egresos = COALESCE((
+                SELECT SUM(m.monto) FROM movimientos_caja m
+                WHERE m.caja_id = cajas.id AND m.tipo = 'egreso'
+            ), 0)
+    """))
+    conn.execute(text("""
+        UPDATE cajas
+        SET saldo_final = saldo_inicial + total_ingresos - total_egresos
+        WHERE estado = 'abierta'
+    """))
@@ -0,0 +1,46 @@
+"""
+Categoria de los movimientos de caja. Los antiguos se clasifican por el
+concepto.
+"""
+
+from sqlalchemy import text
+
+from backend.app.core.migraciones import columnas_de
+
+VERSION = 4
+
+PATRONES = [
+    ("reversion_ingreso", "Reversion ingreso orden %"),
+    ("reversion_proveedores", "Reversion provision proveedores orden %"),
+    ("reversion_tecnicos", "Reversion provision tecnicos orden %"),
+    ("ingreso_orden", "Ingreso por orden %"),
+    ("provision_proveedores", "Pago pendiente proveedor %"),
+    ("provision_proveedores", "Provision proveedores orden %"),
+    ("provision_tecnicos", "Pago pendiente tecnico %"),
+    ("provision_tecnicos", "Provision tecnicos orden %"),
+    ("pago_nomina", "Pago nomina tecnico %"),
+]
+
+
+def aplicar(conn):
+    if "categoria" not in columnas_de(conn, "movimientos_caja"):
+        conn.execute(text("ALTER TABLE movimientos_caja ADD COLUMN categoria VARCHAR(30)"))
+        for categoria, patron in PATRONES:
+            conn.execute(
+                text(
+                    "UPDATE movimientos_caja SET categoria = :categoria "
+                    "WHERE categoria IS NULL AND concepto LIKE :patron"
+                ),
+                {"categoria": categoria, "patron": patron}
+            )
+        conn.execute(text(
+            "UPDATE movimientos_caja SET categoria = 'pago_proveedor' "
+            "WHERE categoria IS NULL AND proveedor_id IS NOT NULL"
+        ))
+        conn.execute(text(
+            "UPDATE movimientos_caja SET categoria = 'manual' WHERE categoria IS NULL"
+        ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_movimientos_caja_orden_categoria "
+        "ON movimientos_caja (orden_id, categoria)"
+    ))
@@ -0,0 +1,25 @@
+"""
+Fecha de la ultima lectura y km por dia en vehiculos; fecha proyectada de
+vencimiento en alertas_mantenimiento.
+"""
+
+from sqlalchemy import text
+
+from backend.app.core.migraciones import columnas_de
+
+VERSION = 5
+
+
+def aplicar(conn):
+    columnas = columnas_de(conn, "vehiculos")
+    if "fecha_km" not in columnas:
+        conn.execute(text("ALTER TABLE vehiculos ADD COLUMN fecha_km DATE"))
+    if "km_dia" not in columnas:
+        conn.execute(text("ALTER TABLE vehiculos ADD COLUMN km_dia FLOAT"))
+
+    if "fecha_proyectada" not in columnas_de(conn, "alertas_mantenimiento"):
+        conn.execute(text("ALTER TABLE alertas_mantenimiento ADD COLUMN fecha_proyectada DATE"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_alertas_mantenimiento_fecha_proyectada "
+        "ON alertas_mantenimiento (fecha_proyectada)"
+    ))
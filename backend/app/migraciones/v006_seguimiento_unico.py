@@ -0,0 +1,25 @@
+"""
+Un seguimiento por vehiculo y regla en vehiculos_recomendaciones.
+"""
+
+from sqlalchemy import text
+
+VERSION = 6
+
+
+def aplicar(conn):
+    resultado = conn.execute(text("PRAGMA index_list(vehiculos_recomendaciones)"))
+    if "uq_vehiculos_recomendaciones_vehiculo_regla" in {row[1] for row in resultado}:
+        return
+    # De los repetidos queda el ultimo, que es el que ya se usaba para
+    # calcular las alertas.
+    conn.execute(text("""
+        DELETE FROM vehiculos_recomendaciones WHERE id NOT IN (
+            SELECT MAX(id) FROM vehiculos_recomendaciones
+            GROUP BY vehiculo_id, regla_id
+        )
+    """))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX uq_vehiculos_recomendaciones_vehiculo_regla "
+        "ON vehiculos_recomendaciones (vehiculo_id, regla_id)"
+    ))
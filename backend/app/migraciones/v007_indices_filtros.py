@@ -0,0 +1,39 @@
+"""
+Indices de los filtros frecuentes (ver scripts/verificar_planes.py).
+"""
+
+from sqlalchemy import text
+
+VERSION = 7
+
+# (nombre, tabla, columnas)
+INDICES = (
+    ("ix_cajas_estado", "cajas", "estado"),
+    ("ix_liquidaciones_mecanicos_periodo", "liquidaciones_mecanicos",
+     "mecanico_id, fecha_inicio, fecha_fin, estado"),
+    ("ix_prestamos_herramienta_devolucion", "prestamos_herramienta",
+     "fecha_devolucion, herramienta_id"),
+    ("ix_alertas_mantenimiento_estado", "alertas_mantenimiento", "estado"),
+    ("ix_alertas_mantenimiento_fecha_vencimiento", "alertas_mantenimiento", "fecha_vencimiento"),
+    ("ix_alertas_mantenimiento_regla_id", "alertas_mantenimiento", "regla_id"),
+    ("ix_alertas_mantenimiento_vehiculo_id", "alertas_mantenimiento", "vehiculo_id"),
+    ("ix_ordenes_trabajo_cliente_fecha", "ordenes_trabajo", "cliente_id, fecha"),
+    ("ix_ordenes_trabajo_estado_fecha", "ordenes_trabajo", "estado, fecha"),
+    ("ix_ordenes_trabajo_vehiculo_fecha", "ordenes_trabajo", "vehiculo_id, fecha"),
+    ("ix_detalle_almacen_orden_id", "detalle_almacen", "orden_id"),
+    ("ix_detalle_orden_orden_id", "detalle_orden", "orden_id"),
+    ("ix_lecturas_kilometraje_vehiculo_fecha", "lecturas_kilometraje", "vehiculo_id, fecha"),
+    ("ix_liquidaciones_mecanicos_detalle_liquidacion_id", "liquidaciones_mecanicos_detalle",
+     "liquidacion_id"),
+    ("ix_liquidaciones_mecanicos_detalle_orden_id", "liquidaciones_mecanicos_detalle", "orden_id"),
+    ("ix_movimientos_almacen_item_fecha", "movimientos_almacen", "item_id, fecha"),
+    ("ix_movimientos_caja_caja_tipo", "movimientos_caja", "caja_id, tipo"),
+    ("ix_movimientos_caja_tipo_fecha", "movimientos_caja", "tipo, fecha"),
+    ("ix_movimientos_proveedor_proveedor_tipo", "movimientos_proveedor", "proveedor_id, tipo"),
+    ("ix_ordenes_mecanicos_mecanico_id", "ordenes_mecanicos", "mecanico_id"),
+)
+
+
+def aplicar(conn):
+    for nombre, tabla, columnas in INDICES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})"))
@@ -0,0 +1,32 @@
+"""
+Cargos, pagos y saldo guardados en proveedores, calculados desde sus
+movimientos.
+"""
+
+from sqlalchemy import text
+
+from backend.app.core.migraciones import columnas_de
+
+VERSION = 8
+
+
+def aplicar(conn):
+    if "saldo" in columnas_de(conn, "proveedores"):
+        return
+    conn.execute(text("ALTER TABLE proveedores ADD COLUMN total_cargos FLOAT DEFAULT 0"))
+    conn.execute(text("ALTER TABLE proveedores ADD COLUMN total_pagos FLOAT DEFAULT 0"))
+    conn.execute(text("ALTER TABLE proveedores ADD COLUMN saldo FLOAT DEFAULT 0"))
+    conn.execute(text("""
+        UPDATE proveedores SET
+            total_cargos = COALESCE((
+                SELECT SUM(m.subtotal) FROM movimientos_proveedor m
+                WHERE m.proveedor_id = proveedores.id
+                  AND m.tipo IN ('cargo', 'ajuste_cargo')
+            ), 0),
+            total_pagos = COALESCE((
+                SELECT SUM(m.subtotal) FROM movimientos_proveedor m
+                WHERE m.proveedor_id = proveedores.id
+                  AND m.tipo IN ('pago', 'abono', 'ajuste_abono')
+            ), 0)
+    """))
+    conn.execute(text("UPDATE proveedores SET saldo = total_cargos - total_pagos"))
@@ -0,0 +1,32 @@
+"""
+Indices cubrientes de los libros de movimientos (core/libros). Reemplazan a
+los de almacen (item_id, fecha), que es prefijo del nuevo, y de proveedores
+(proveedor_id, tipo), que sin las sumas de saldo ya no se usa.
+"""
+
+from sqlalchemy import text
+
+VERSION = 9
+
+REEMPLAZADOS = (
+    "ix_movimientos_almacen_item_fecha",
+    "ix_movimientos_proveedor_proveedor_tipo",
+)
+
+# (nombre, tabla, columnas)
+INDICES = (
+    ("ix_movimientos_caja_caja_fecha", "movimientos_caja", "caja_id, fecha, tipo, monto"),
+    ("ix_movimientos_caja_fecha", "movimientos_caja", "fecha, tipo, monto"),
+    ("ix_movimientos_almacen_item_fecha_tipo", "movimientos_almacen",
+     "item_id, fecha, tipo, cantidad"),
+    ("ix_movimientos_almacen_fecha", "movimientos_almacen", "fecha, tipo, cantidad"),
+    ("ix_movimientos_proveedor_proveedor_fecha", "movimientos_proveedor",
+     "proveedor_id, fecha, tipo, subtotal"),
+)
+
+
+def aplicar(conn):
+    for nombre in REEMPLAZADOS:
+        conn.execute(text(f"DROP INDEX IF EXISTS {nombre}"))
+    for nombre, tabla, columnas in INDICES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})"))
@@ -4,6 +4,7 @@ Inicializacion del paquete models.
 Importa todos los modelos ORM para que SQLAlchemy
 pueda registrarlos correctamente al iniciar la aplicacion.
 """
+from backend.app.models.usuario import Usuario
 from backend.app.models.cliente import Cliente
 from backend.app.models.vehiculo import Vehiculo
 from backend.app.models.servicio import Servicio
@@ -25,3 +26,5 @@ from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
 from backend.app.models.liquidacion_mecanico_detalle import LiquidacionMecanicoDetalle
 from backend.app.models.recomendacion_regla import RecomendacionRegla
 from backend.app.models.vehiculo_recomendacion import VehiculoRecomendacion
+from backend.app.models.alerta_mantenimiento import AlertaMantenimiento
+from backend.app.models.lectura_kilometraje import LecturaKilometraje
@@ -0,0 +1,33 @@
+"""
+Modelo AlertaMantenimiento - MedinAutos
+Estado calculado de cada regla de mantenimiento por vehiculo.
+
+Se recalcula al cambiar el kilometraje, una regla o su seguimiento, y una vez
+al dia (los dias transcurridos cambian solos). Las vistas solo lo leen.
+"""
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, UniqueConstraint
+from backend.app.core.database import Base
+
+
+class AlertaMantenimiento(Base):
+    __tablename__ = "alertas_mantenimiento"
+    __table_args__ = (
+        UniqueConstraint("vehiculo_id", "regla_id", name="uq_alertas_mantenimiento_vehiculo_regla"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehiculo_id = Column(Integer, ForeignKey("vehiculos.id"), nullable=False, index=True)
+    regla_id = Column(Integer, ForeignKey("recomendaciones_reglas.id"), nullable=False, index=True)
+    estado = Column(String, nullable=False, index=True)  # ok | proximo | vencido
+    progreso = Column(Integer, nullable=False, default=0)
+    km_trans = Column(Integer, nullable=False, default=0)
+    dias_trans = Column(Integer, nullable=False, default=0)
+    km_restante = Column(Integer, nullable=True)
+    dias_restante = Column(Integer, nullable=True)
+    km_vencimiento = Column(Integer, nullable=True)
+    fecha_vencimiento = Column(Date, nullable=True, index=True)
+    # La fecha mas cercana entre vencimiento por dias y por km proyectado
+    # con el km/dia del vehiculo.
+    fecha_proyectada = Column(Date, nullable=True, index=True)
+    fecha_calculo = Column(Date, nullable=False)
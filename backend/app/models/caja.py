@@ -14,7 +14,9 @@ class Caja(Base):
     fecha_cierre = Column(DateTime, nullable=True)
     saldo_inicial = Column(Float, default=0.0)
     saldo_final = Column(Float, default=0.0)
-    estado = Column(String(20), default="abierta")
+    total_ingresos = Column(Float, default=0.0)
+    total_egresos = Column(Float, default=0.0)
+    estado = Column(String(20), default="abierta", index=True)
     observaciones = Column(String(255), nullable=True)
     usuario_apertura = Column(String(100), nullable=True)
     usuario_cierre = Column(String(100), nullable=True)
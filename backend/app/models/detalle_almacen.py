@@ -8,7 +8,7 @@ class DetalleAlmacen(Base):
     __tablename__ = "detalle_almacen"
 
     id = Column(Integer, primary_key=True, index=True)
-    orden_id = Column(Integer, ForeignKey("ordenes_trabajo.id"), nullable=False)
+    orden_id = Column(Integer, ForeignKey("ordenes_trabajo.id"), nullable=False, index=True)
     item_id = Column(Integer, ForeignKey("almacen_items.id"), nullable=False)
     proveedor_id = Column(Integer, ForeignKey("proveedores.id"), nullable=True)
 
@@ -12,7 +12,7 @@ class DetalleOrden(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    orden_id = Column(Integer, ForeignKey("ordenes_trabajo.id"), nullable=False)
+    orden_id = Column(Integer, ForeignKey("ordenes_trabajo.id"), nullable=False, index=True)
     servicio_id = Column(Integer, ForeignKey("servicios.id"), nullable=False)
 
     cantidad = Column(Integer, nullable=False, default=1)
@@ -0,0 +1,26 @@
+"""
+Modelo LecturaKilometraje - MedinAutos
+Historial del odometro de cada vehiculo (ediciones e ingresos a taller).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from backend.app.core.database import Base
+
+
+class LecturaKilometraje(Base):
+    __tablename__ = "lecturas_kilometraje"
+    __table_args__ = (
+        Index("ix_lecturas_kilometraje_vehiculo_fecha", "vehiculo_id", "fecha"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehiculo_id = Column(Integer, ForeignKey("vehiculos.id"), nullable=False)
+    km = Column(Integer, nullable=False)
+    fecha = Column(DateTime, nullable=False, default=datetime.now)
+    origen = Column(String(20), nullable=False)  # alta | edicion | orden
+    orden_id = Column(Integer, ForeignKey("ordenes_trabajo.id"), nullable=True)
+
+    vehiculo = relationship("Vehiculo", back_populates="lecturas_km")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -8,6 +8,12 @@ from backend.app.core.database import Base
 
 class LiquidacionMecanico(Base):
     __tablename__ = "liquidaciones_mecanicos"
+    __table_args__ = (
+        Index(
+            "ix_liquidaciones_mecanicos_periodo",
+            "mecanico_id", "fecha_inicio", "fecha_fin", "estado"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     mecanico_id = Column(Integer, ForeignKey("mecanicos.id"), nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -8,6 +8,11 @@ from backend.app.core.database import Base
 
 class MovimientoAlmacen(Base):
     __tablename__ = "movimientos_almacen"
+    __table_args__ = (
+        # Listado paginado y totales del libro (core/libros): cubren tipo y cantidad.
+        Index("ix_movimientos_almacen_item_fecha_tipo", "item_id", "fecha", "tipo", "cantidad"),
+        Index("ix_movimientos_almacen_fecha", "fecha", "tipo", "cantidad"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tipo = Column(String(20), nullable=False)
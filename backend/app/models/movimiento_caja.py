@@ -1,17 +1,39 @@
+import enum
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
 
 
+class CategoriaMovimiento(str, enum.Enum):
+    INGRESO_ORDEN = "ingreso_orden"
+    PROVISION_PROVEEDORES = "provision_proveedores"
+    PROVISION_TECNICOS = "provision_tecnicos"
+    REVERSION_INGRESO = "reversion_ingreso"
+    REVERSION_PROVEEDORES = "reversion_proveedores"
+    REVERSION_TECNICOS = "reversion_tecnicos"
+    PAGO_NOMINA = "pago_nomina"
+    PAGO_PROVEEDOR = "pago_proveedor"
+    MANUAL = "manual"
+
+
 class MovimientoCaja(Base):
     __tablename__ = "movimientos_caja"
+    __table_args__ = (
+        Index("ix_movimientos_caja_orden_categoria", "orden_id", "categoria"),
+        Index("ix_movimientos_caja_caja_tipo", "caja_id", "tipo"),
+        Index("ix_movimientos_caja_tipo_fecha", "tipo", "fecha"),
+        # Listado paginado y totales del libro (core/libros): cubren tipo y monto.
+        Index("ix_movimientos_caja_caja_fecha", "caja_id", "fecha", "tipo", "monto"),
+        Index("ix_movimientos_caja_fecha", "fecha", "tipo", "monto"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     caja_id = Column(Integer, ForeignKey("cajas.id"), nullable=False)
     tipo = Column(String(20), nullable=False)
+    categoria = Column(String(30), nullable=True, default=CategoriaMovimiento.MANUAL.value)
     concepto = Column(String(120), nullable=False)
     monto = Column(Float, nullable=False)
     fecha = Column(DateTime, default=datetime.utcnow)
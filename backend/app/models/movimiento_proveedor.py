@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -8,6 +8,10 @@ from backend.app.core.database import Base
 
 class MovimientoProveedor(Base):
     __tablename__ = "movimientos_proveedor"
+    __table_args__ = (
+        # Listado paginado y totales del libro (core/libros): cubre tipo y subtotal.
+        Index("ix_movimientos_proveedor_proveedor_fecha", "proveedor_id", "fecha", "tipo", "subtotal"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proveedor_id = Column(Integer, ForeignKey("proveedores.id"), nullable=False)
@@ -15,7 +15,7 @@ class OrdenMecanico(Base):
     id = Column(Integer, primary_key=True, index=True)
 
     orden_id = Column(Integer, ForeignKey("ordenes_trabajo.id"), nullable=False)
-    mecanico_id = Column(Integer, ForeignKey("mecanicos.id"), nullable=False)
+    mecanico_id = Column(Integer, ForeignKey("mecanicos.id"), nullable=False, index=True)
 
     porcentaje = Column(Float, default=0.0)
     monto = Column(Float, default=0.0)
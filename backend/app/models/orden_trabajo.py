@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -10,6 +10,12 @@ from backend.app.core.database import Base
 
 class OrdenTrabajo(Base):
     __tablename__ = "ordenes_trabajo"
+    __table_args__ = (
+        Index("ix_ordenes_trabajo_fecha_id", "fecha", "id"),
+        Index("ix_ordenes_trabajo_estado_fecha", "estado", "fecha"),
+        Index("ix_ordenes_trabajo_cliente_fecha", "cliente_id", "fecha"),
+        Index("ix_ordenes_trabajo_vehiculo_fecha", "vehiculo_id", "fecha"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     fecha = Column(DateTime, default=datetime.utcnow)
@@ -19,6 +25,7 @@ class OrdenTrabajo(Base):
     estado = Column(String(20), default="abierta")
     total = Column(Float, default=0.0)
     forma_pago = Column(String(30), nullable=True)
+    km_ingreso = Column(Integer, nullable=True)
 
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
     vehiculo_id = Column(Integer, ForeignKey("vehiculos.id"), nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -8,6 +8,10 @@ from backend.app.core.database import Base
 
 class PrestamoHerramienta(Base):
     __tablename__ = "prestamos_herramienta"
+    __table_args__ = (
+        # Prestamos activos (fecha_devolucion IS NULL), en general o por herramienta.
+        Index("ix_prestamos_herramienta_devolucion", "fecha_devolucion", "herramienta_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     herramienta_id = Column(Integer, ForeignKey("herramientas.id"), nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String
 
 from backend.app.core.database import Base
 
@@ -15,6 +15,9 @@ class Proveedor(Base):
     email = Column(String(120), nullable=True)
     direccion = Column(String(150), nullable=True)
     activo = Column(Boolean, default=True)
+    total_cargos = Column(Float, default=0.0)
+    total_pagos = Column(Float, default=0.0)
+    saldo = Column(Float, default=0.0)
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self):
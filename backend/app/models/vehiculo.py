@@ -2,7 +2,7 @@
 Modelo Vehiculo - MedinAutos
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Date
 from sqlalchemy.orm import relationship
 from backend.app.core.database import Base
 
@@ -23,6 +23,8 @@ class Vehiculo(Base):
     cilindraje = Column(Integer, nullable=True)
     clase = Column(String, nullable=True)
     km_actual = Column(Integer, nullable=True)
+    fecha_km = Column(Date, nullable=True)   # fecha de la ultima lectura
+    km_dia = Column(Float, nullable=True)    # estimado (core/kilometraje)
 
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
 
@@ -31,3 +33,16 @@ class Vehiculo(Base):
         "Cliente",
         back_populates="vehiculos"
     )
+
+    # SQLite no aplica las claves foraneas: el historial y el seguimiento se
+    # borran con el vehiculo, o un id reutilizado los heredaria.
+    lecturas_km = relationship(
+        "LecturaKilometraje",
+        back_populates="vehiculo",
+        cascade="all, delete-orphan"
+    )
+    recomendaciones = relationship(
+        "VehiculoRecomendacion",
+        back_populates="vehiculo",
+        cascade="all, delete-orphan"
+    )
@@ -3,13 +3,21 @@ Modelo VehiculoRecomendacion - MedinAutos
 Estado por vehiculo para cada regla de mantenimiento.
 """
 
-from sqlalchemy import Column, Integer, ForeignKey, Date
+from sqlalchemy import Column, Integer, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from backend.app.core.database import Base
 
 
 class VehiculoRecomendacion(Base):
     __tablename__ = "vehiculos_recomendaciones"
+    __table_args__ = (
+        Index(
+            "uq_vehiculos_recomendaciones_vehiculo_regla",
+            "vehiculo_id",
+            "regla_id",
+            unique=True
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vehiculo_id = Column(Integer, ForeignKey("vehiculos.id"), nullable=False)
@@ -17,5 +25,5 @@ class VehiculoRecomendacion(Base):
     km_base = Column(Integer, nullable=True)
     fecha_base = Column(Date, nullable=True)
 
-    vehiculo = relationship("Vehiculo")
+    vehiculo = relationship("Vehiculo", back_populates="recomendaciones")
     regla = relationship("RecomendacionRegla")
@@ -2,10 +2,22 @@
 Rutas del modulo Almacen
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
+from backend.app.core.almacen import sumar_stock
 from backend.app.core.database import get_db
+from backend.app.core.etag import respuesta_json_precalculada
+from backend.app.core.libros import contar_movimientos, paginar_libro
+from backend.app.core.ordenes import LIMITE_POR_DEFECTO
+from backend.app.core.reabastecimiento import (
+    COBERTURA_POR_DEFECTO,
+    PLAZO_POR_DEFECTO,
+    VENTANA_POR_DEFECTO,
+    obtener_reabastecimiento,
+)
 from backend.app.core.security import solo_admin
 from backend.app.models.almacen_item import AlmacenItem
 from backend.app.models.movimiento_almacen import MovimientoAlmacen
@@ -16,7 +28,10 @@ from backend.app.schemas.almacen_item import (
     AlmacenItemResponseSchema,
     MovimientoEntradaSchema,
 )
-from backend.app.schemas.movimiento_almacen import MovimientoAlmacenResponseSchema
+from backend.app.schemas.movimiento_almacen import (
+    MovimientoAlmacenPaginaSchema,
+    MovimientoAlmacenResponseSchema,
+)
 from backend.app.schemas.proveedor import (
     ProveedorCreateSchema,
     ProveedorUpdateSchema,
@@ -104,7 +119,7 @@ def registrar_entrada(item_id: int, data: MovimientoEntradaSchema, db: Session =
         if not proveedor:
             raise HTTPException(status_code=404, detail="Proveedor no encontrado")
 
-    item.stock_actual += data.cantidad
+    sumar_stock(db, item, data.cantidad)
     if data.valor_unitario is not None:
         item.valor_proveedor = data.valor_unitario
 
@@ -123,12 +138,56 @@ def registrar_entrada(item_id: int, data: MovimientoEntradaSchema, db: Session =
     return movimiento
 
 
-@router.get("/movimientos", response_model=list[MovimientoAlmacenResponseSchema])
-def listar_movimientos(item_id: int | None = None, db: Session = Depends(get_db)):
-    query = db.query(MovimientoAlmacen)
-    if item_id:
-        query = query.filter(MovimientoAlmacen.item_id == item_id)
-    return query.order_by(MovimientoAlmacen.fecha.desc()).all()
+@router.get("/movimientos", response_model=MovimientoAlmacenPaginaSchema)
+def listar_movimientos(
+    item_id: int | None = None,
+    tipo: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    limite: int = LIMITE_POR_DEFECTO,
+    cursor: str | None = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        movimientos, siguiente, por_tipo = paginar_libro(
+            db,
+            MovimientoAlmacen,
+            MovimientoAlmacen.cantidad,
+            limite=limite,
+            cursor=cursor,
+            item_id=item_id or None,
+            tipo=tipo,
+            desde=desde,
+            hasta=hasta
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return {
+        "items": movimientos,
+        "siguiente_cursor": siguiente,
+        "totales": {
+            "movimientos": contar_movimientos(por_tipo),
+            "por_tipo": por_tipo
+        }
+    }
+
+
+@router.get("/reabastecimiento")
+def sugerir_reabastecimiento(
+    request: Request,
+    ventana_dias: int = Query(VENTANA_POR_DEFECTO, ge=7, le=365),
+    plazo_dias: int = Query(PLAZO_POR_DEFECTO, ge=0, le=90),
+    cobertura_dias: int = Query(COBERTURA_POR_DEFECTO, ge=1, le=180),
+    db: Session = Depends(get_db)
+):
+    """
+    Insumos a pedir, agrupados por proveedor, segun el consumo de la
+    ventana. Sale de un snapshot en memoria que se renueva con cada
+    movimiento de stock; responde 304 si el cliente ya tiene la version.
+    """
+    contenido, etag = obtener_reabastecimiento(db, ventana_dias, plazo_dias, cobertura_dias)
+    return respuesta_json_precalculada(request, contenido, etag)
 
 
 @router.get("/proveedores", response_model=list[ProveedorResponseSchema])
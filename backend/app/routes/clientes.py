@@ -7,16 +7,13 @@ from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
 
-from backend.app.core.database import SessionLocal, engine
+from backend.app.core.database import SessionLocal
 from backend.app.models.cliente import Cliente
 from backend.app.core.templates import templates
 
 # 🔐 DEPENDENCIA DE SEGURIDAD
 from backend.app.core.security import usuario_autenticado
 
-# Crear tablas si no existen (solo se ejecuta una vez)
-Cliente.metadata.create_all(bind=engine)
-
 # ======================================================
 # ROUTER
 # Se protege TODO el CRUD con usuario_autenticado
@@ -2,44 +2,57 @@
 Rutas del modulo contable
 """
 
-import os
-from datetime import datetime
-
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-from backend.app.core.templates import _base_app_dir
-from sqlalchemy import func
+import re
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
+from backend.app.core.caja import (
+    TIPOS_MOVIMIENTO,
+    posicion_orden,
+    registrar_movimiento_caja,
+    verificar_caja,
+)
 from backend.app.core.database import get_db
+from backend.app.core.libros import contar_movimientos, paginar_libro, sumar_tipos
+from backend.app.core.liquidaciones import liquidar_mecanicos
+from backend.app.core.ordenes import LIMITE_POR_DEFECTO
+from backend.app.core.pdf_cache import respuesta_pdf
+from backend.app.core.proveedores import (
+    TIPOS_CARGO,
+    TIPOS_MOVIMIENTO_PROVEEDOR,
+    TIPOS_PAGO,
+    registrar_movimiento_proveedor,
+    saldo_de,
+)
+from backend.app.core.render_pool import renderizar
 from backend.app.core.security import solo_admin
 from backend.app.models.caja import Caja
 from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
 from backend.app.models.liquidacion_mecanico_detalle import LiquidacionMecanicoDetalle
 from backend.app.models.mecanico import Mecanico
-from backend.app.models.movimiento_caja import MovimientoCaja
+from backend.app.models.movimiento_caja import CategoriaMovimiento, MovimientoCaja
 from backend.app.models.movimiento_proveedor import MovimientoProveedor
-from backend.app.models.orden_mecanico import OrdenMecanico
-from sqlalchemy import func
-
 from backend.app.models.orden_trabajo import OrdenTrabajo
-from backend.app.models.detalle_orden import DetalleOrden
+from backend.app.models.proveedor import Proveedor
 from backend.app.schemas.caja import CajaCloseSchema, CajaCreateSchema, CajaResponseSchema
 from backend.app.schemas.liquidacion_mecanico import (
+    LiquidacionLoteCreateSchema,
+    LiquidacionLoteResponseSchema,
     LiquidacionMecanicoCreateSchema,
     LiquidacionMecanicoResponseSchema,
 )
 from backend.app.schemas.movimiento_caja import (
     MovimientoCajaCreateSchema,
+    MovimientoCajaPaginaSchema,
     MovimientoCajaResponseSchema,
 )
 from backend.app.schemas.movimiento_proveedor import (
     MovimientoProveedorCreateSchema,
+    MovimientoProveedorPaginaSchema,
     MovimientoProveedorResponseSchema,
+    ProveedorSaldoSchema,
 )
 
 
@@ -49,120 +62,6 @@ router = APIRouter(
     dependencies=[Depends(solo_admin)]
 )
 
-def _actualizar_saldo_caja(db: Session, caja: Caja):
-    ingresos = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == "ingreso"
-    ).scalar() or 0.0
-    egresos = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == "egreso"
-    ).scalar() or 0.0
-    caja.saldo_final = caja.saldo_inicial + ingresos - egresos
-
-def _formatear_moneda(valor):
-    return f"${(valor or 0):,.0f}".replace(",", ".")
-
-def _obtener_carpeta_pdf_nomina():
-    ruta = os.path.join("backend", "app", "static", "pdfs", "nomina")
-    os.makedirs(ruta, exist_ok=True)
-    return ruta
-
-def _generar_pdf_nomina(liquidacion, mecanico, detalles, metodo_pago):
-    ruta = os.path.join(_obtener_carpeta_pdf_nomina(), f"nomina_{liquidacion.id}.pdf")
-    doc = SimpleDocTemplate(ruta, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
-    styles = getSampleStyleSheet()
-    story = []
-
-    logo_path = os.path.join(_base_app_dir(), "static", "img", "logo_medinautos.png")
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=90, height=60)
-    else:
-        logo = Paragraph("MEDINAUTOS", styles["Heading2"])
-
-    header = Table([
-        [logo, Paragraph("<b>MEDINAUTOS</b><br/>Telefono: 3166191371", styles["Normal"])],
-        [Paragraph(f"<b>Liquidacion:</b> #{liquidacion.id}", styles["Normal"]),
-         Paragraph(f"<b>Fecha:</b> {liquidacion.fecha_creacion.strftime('%Y-%m-%d %I:%M %p')}", styles["Normal"])]
-    ], colWidths=[120, 380])
-    header.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(header)
-    story.append(Spacer(1, 12))
-
-    nombre_mecanico = "Tecnico"
-    documento = "-"
-    if mecanico:
-        nombre_mecanico = f"{mecanico.nombres} {mecanico.apellidos}".strip()
-        documento = mecanico.documento or "-"
-
-    if metodo_pago == "efectivo":
-        metodo_label = "Efectivo"
-    elif metodo_pago == "transferencia":
-        metodo_label = "Transferencia"
-    elif metodo_pago:
-        metodo_label = metodo_pago
-    else:
-        metodo_label = "No definido"
-
-    info = Table([
-        [Paragraph("<b>Recibo de pago de nomina</b>", styles["Normal"]), ""],
-        [f"Tecnico: {nombre_mecanico}", f"Documento: {documento}"],
-        [f"Periodo: {liquidacion.fecha_inicio} - {liquidacion.fecha_fin}", f"Frecuencia: {liquidacion.frecuencia}"],
-        [f"Estado: {liquidacion.estado}", f"Metodo de pago: {metodo_label}"],
-    ], colWidths=[260, 260])
-    info.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-    ]))
-    story.append(info)
-    story.append(Spacer(1, 14))
-
-    data = [["Orden", "%", "Base", "Monto"]]
-    for det in detalles:
-        data.append([
-            f"#{det.orden_id}",
-            f"{det.porcentaje}%",
-            _formatear_moneda(det.base_calculo),
-            _formatear_moneda(det.monto)
-        ])
-    if len(data) == 1:
-        data.append(["-", "-", _formatear_moneda(0), _formatear_moneda(0)])
-
-    tabla = Table(data, colWidths=[100, 80, 160, 160])
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-    ]))
-    story.append(Paragraph("<b>Detalle por orden</b>", styles["Heading4"]))
-    story.append(tabla)
-    story.append(Spacer(1, 12))
-
-    resumen = Table([
-        [Paragraph("<b>Total base</b>", styles["Normal"]), _formatear_moneda(liquidacion.total_base)],
-        [Paragraph("<b>Total a pagar</b>", styles["Normal"]), _formatear_moneda(liquidacion.total_pagado)]
-    ], colWidths=[400, 120])
-    resumen.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
-        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-    ]))
-    story.append(resumen)
-    story.append(Spacer(1, 20))
-    story.append(Paragraph("Firma tecnico: ____________________", styles["Normal"]))
-    story.append(Paragraph("Firma y sello taller: ____________________", styles["Normal"]))
-
-    doc.build(story)
-    return ruta
-
-
 @router.post("/cajas/abrir", response_model=CajaResponseSchema)
 def abrir_caja(
     data: CajaCreateSchema,
@@ -175,6 +74,9 @@ def abrir_caja(
 
     caja = Caja(
         saldo_inicial=data.saldo_inicial,
+        saldo_final=data.saldo_inicial,
+        total_ingresos=0.0,
+        total_egresos=0.0,
         observaciones=data.observaciones,
         usuario_apertura=usuario.get("sub")
     )
@@ -205,16 +107,7 @@ def cerrar_caja(
     if caja.estado != "abierta":
         raise HTTPException(status_code=400, detail="La caja ya esta cerrada")
 
-    ingresos = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == "ingreso"
-    ).scalar() or 0.0
-    egresos = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == "egreso"
-    ).scalar() or 0.0
-
-    saldo_calculado = caja.saldo_inicial + ingresos - egresos
+    saldo_calculado = (caja.saldo_inicial or 0.0) + (caja.total_ingresos or 0.0) - (caja.total_egresos or 0.0)
     caja.saldo_final = data.saldo_final if data.saldo_final is not None else saldo_calculado
     caja.fecha_cierre = datetime.utcnow()
     caja.estado = "cerrada"
@@ -232,6 +125,44 @@ def listar_cajas(db: Session = Depends(get_db)):
     return db.query(Caja).order_by(Caja.id.desc()).all()
 
 
+@router.get("/cajas/{caja_id}/verificar")
+def verificar_saldo_caja(caja_id: int, db: Session = Depends(get_db)):
+    """
+    Compara los acumulados de la caja con el recalculo. Solo lectura: la
+    correccion se hace con POST.
+    """
+    caja = db.query(Caja).filter(Caja.id == caja_id).first()
+    if not caja:
+        raise HTTPException(status_code=404, detail="Caja no encontrada")
+
+    return verificar_caja(db, caja)
+
+
+@router.post("/cajas/{caja_id}/verificar")
+def corregir_saldo_caja(caja_id: int, db: Session = Depends(get_db)):
+    """
+    Verifica la caja y, si los acumulados no cuadran, los reemplaza por el
+    recalculo.
+    """
+    caja = db.query(Caja).filter(Caja.id == caja_id).first()
+    if not caja:
+        raise HTTPException(status_code=404, detail="Caja no encontrada")
+
+    resultado = verificar_caja(db, caja, corregir=True)
+    if resultado["corregida"]:
+        db.commit()
+    return resultado
+
+
+@router.get("/ordenes/{orden_id}/posicion")
+def posicion_caja_orden(orden_id: int, db: Session = Depends(get_db)):
+    orden = db.query(OrdenTrabajo).filter(OrdenTrabajo.id == orden_id).first()
+    if not orden:
+        raise HTTPException(status_code=404, detail="Orden no encontrada")
+
+    return {"orden_id": orden_id, "categorias": posicion_orden(db, orden_id)}
+
+
 @router.post("/movimientos", response_model=MovimientoCajaResponseSchema)
 def crear_movimiento_caja(
     data: MovimientoCajaCreateSchema,
@@ -247,67 +178,93 @@ def crear_movimiento_caja(
         raise HTTPException(status_code=404, detail="No hay caja disponible")
     if caja.estado != "abierta":
         raise HTTPException(status_code=400, detail="La caja esta cerrada")
+    if data.tipo not in TIPOS_MOVIMIENTO:
+        raise HTTPException(status_code=400, detail=f"Tipo invalido. Use: {list(TIPOS_MOVIMIENTO)}")
 
     if data.proveedor_id:
-        cargos = db.query(func.sum(MovimientoProveedor.subtotal)).filter(
-            MovimientoProveedor.proveedor_id == data.proveedor_id,
-            MovimientoProveedor.tipo.in_(["cargo", "ajuste_cargo"])
-        ).scalar() or 0.0
-        pagos = db.query(func.sum(MovimientoProveedor.subtotal)).filter(
-            MovimientoProveedor.proveedor_id == data.proveedor_id,
-            MovimientoProveedor.tipo.in_(["pago", "abono", "ajuste_abono"])
+        saldo = db.query(Proveedor.saldo).filter(
+            Proveedor.id == data.proveedor_id
         ).scalar() or 0.0
-        saldo = cargos - pagos
         if data.monto > saldo:
             raise HTTPException(
                 status_code=400,
                 detail="El monto excede el saldo pendiente del proveedor"
             )
 
-    movimiento = MovimientoCaja(
-        caja_id=caja.id,
+    movimiento = registrar_movimiento_caja(
+        db,
+        caja,
         tipo=data.tipo,
-        concepto=data.concepto,
         monto=data.monto,
+        categoria=(
+            CategoriaMovimiento.PAGO_PROVEEDOR if data.proveedor_id
+            else CategoriaMovimiento.MANUAL
+        ),
+        concepto=data.concepto,
         motivo=data.motivo,
         orden_id=data.orden_id,
         proveedor_id=data.proveedor_id,
         usuario=usuario.get("sub")
     )
-    db.add(movimiento)
 
     if data.proveedor_id:
         tipo_mov = "pago" if data.tipo == "egreso" else "abono"
-        movimiento_proveedor = MovimientoProveedor(
-            proveedor_id=data.proveedor_id,
+        registrar_movimiento_proveedor(
+            db,
+            data.proveedor_id,
+            tipo_mov,
+            data.monto,
             orden_id=data.orden_id,
             item_id=None,
-            tipo=tipo_mov,
             cantidad=None,
             valor_unitario=None,
-            subtotal=data.monto,
             motivo=data.motivo or data.concepto,
             usuario=usuario.get("sub")
         )
-        db.add(movimiento_proveedor)
-
-    db.flush()
-    _actualizar_saldo_caja(db, caja)
 
     db.commit()
     db.refresh(movimiento)
     return movimiento
 
 
-@router.get("/movimientos", response_model=list[MovimientoCajaResponseSchema])
+@router.get("/movimientos", response_model=MovimientoCajaPaginaSchema)
 def listar_movimientos_caja(
     caja_id: int | None = None,
+    tipo: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    limite: int = LIMITE_POR_DEFECTO,
+    cursor: str | None = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(MovimientoCaja)
-    if caja_id is not None:
-        query = query.filter(MovimientoCaja.caja_id == caja_id)
-    return query.order_by(MovimientoCaja.fecha.desc()).all()
+    try:
+        movimientos, siguiente, por_tipo = paginar_libro(
+            db,
+            MovimientoCaja,
+            MovimientoCaja.monto,
+            limite=limite,
+            cursor=cursor,
+            caja_id=caja_id,
+            tipo=tipo,
+            desde=desde,
+            hasta=hasta
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    ingresos = sumar_tipos(por_tipo, ["ingreso"])
+    egresos = sumar_tipos(por_tipo, ["egreso"])
+    return {
+        "items": movimientos,
+        "siguiente_cursor": siguiente,
+        "totales": {
+            "movimientos": contar_movimientos(por_tipo),
+            "ingresos": ingresos,
+            "egresos": egresos,
+            "neto": ingresos - egresos,
+            "por_tipo": por_tipo
+        }
+    }
 
 
 @router.post("/proveedores/movimientos", response_model=MovimientoProveedorResponseSchema)
@@ -316,51 +273,84 @@ def crear_movimiento_proveedor(
     db: Session = Depends(get_db),
     usuario=Depends(solo_admin)
 ):
-    tipos_validos = {"cargo", "pago", "abono", "ajuste_cargo", "ajuste_abono"}
-    if data.tipo not in tipos_validos:
-        raise HTTPException(status_code=400, detail=f"Tipo invalido. Use: {sorted(tipos_validos)}")
-
-    movimiento = MovimientoProveedor(
-        proveedor_id=data.proveedor_id,
+    if data.tipo not in TIPOS_MOVIMIENTO_PROVEEDOR:
+        raise HTTPException(status_code=400, detail=f"Tipo invalido. Use: {sorted(TIPOS_MOVIMIENTO_PROVEEDOR)}")
+
+    movimiento = registrar_movimiento_proveedor(
+        db,
+        data.proveedor_id,
+        data.tipo,
+        data.subtotal,
         orden_id=data.orden_id,
         item_id=data.item_id,
-        tipo=data.tipo,
         cantidad=data.cantidad,
         valor_unitario=data.valor_unitario,
-        subtotal=data.subtotal,
         motivo=data.motivo,
         usuario=usuario.get("sub")
     )
-    db.add(movimiento)
     db.commit()
     db.refresh(movimiento)
     return movimiento
 
 
-@router.get("/proveedores/{proveedor_id}/movimientos", response_model=list[MovimientoProveedorResponseSchema])
-def listar_movimientos_proveedor(proveedor_id: int, db: Session = Depends(get_db)):
-    return db.query(MovimientoProveedor).filter(
-        MovimientoProveedor.proveedor_id == proveedor_id
-    ).order_by(MovimientoProveedor.fecha.desc()).all()
+@router.get("/proveedores/saldos", response_model=list[ProveedorSaldoSchema])
+def saldos_proveedores(
+    con_saldo: bool = False,
+    db: Session = Depends(get_db)
+):
+    query = db.query(Proveedor)
+    if con_saldo:
+        query = query.filter(Proveedor.saldo != 0)
+    return [
+        {"proveedor_id": proveedor.id, "nombre": proveedor.nombre, **saldo_de(proveedor)}
+        for proveedor in query.order_by(Proveedor.nombre.asc())
+    ]
+
+
+@router.get("/proveedores/{proveedor_id}/movimientos", response_model=MovimientoProveedorPaginaSchema)
+def listar_movimientos_proveedor(
+    proveedor_id: int,
+    tipo: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    limite: int = LIMITE_POR_DEFECTO,
+    cursor: str | None = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        movimientos, siguiente, por_tipo = paginar_libro(
+            db,
+            MovimientoProveedor,
+            MovimientoProveedor.subtotal,
+            limite=limite,
+            cursor=cursor,
+            proveedor_id=proveedor_id,
+            tipo=tipo,
+            desde=desde,
+            hasta=hasta
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    cargos = sumar_tipos(por_tipo, TIPOS_CARGO)
+    pagos = sumar_tipos(por_tipo, TIPOS_PAGO)
+    return {
+        "items": movimientos,
+        "siguiente_cursor": siguiente,
+        "totales": {
+            "movimientos": contar_movimientos(por_tipo),
+            "cargos": cargos,
+            "pagos": pagos,
+            "saldo": cargos - pagos,
+            "por_tipo": por_tipo
+        }
+    }
 
 
 @router.get("/proveedores/{proveedor_id}/saldo")
 def saldo_proveedor(proveedor_id: int, db: Session = Depends(get_db)):
-    cargos = db.query(func.sum(MovimientoProveedor.subtotal)).filter(
-        MovimientoProveedor.proveedor_id == proveedor_id,
-        MovimientoProveedor.tipo.in_(["cargo", "ajuste_cargo"])
-    ).scalar() or 0.0
-    pagos = db.query(func.sum(MovimientoProveedor.subtotal)).filter(
-        MovimientoProveedor.proveedor_id == proveedor_id,
-        MovimientoProveedor.tipo.in_(["pago", "abono", "ajuste_abono"])
-    ).scalar() or 0.0
-    saldo = cargos - pagos
-    return {
-        "proveedor_id": proveedor_id,
-        "saldo": saldo,
-        "cargos": cargos,
-        "pagos": pagos
-    }
+    proveedor = db.query(Proveedor).filter(Proveedor.id == proveedor_id).first()
+    return {"proveedor_id": proveedor_id, **saldo_de(proveedor)}
 
 
 @router.post("/liquidaciones/mecanicos", response_model=LiquidacionMecanicoResponseSchema)
@@ -373,53 +363,82 @@ def crear_liquidacion_mecanico(
     if not mecanico:
         raise HTTPException(status_code=404, detail="Tecnico no encontrado")
 
-    asignaciones = db.query(OrdenMecanico, OrdenTrabajo).join(
-        OrdenTrabajo, OrdenTrabajo.id == OrdenMecanico.orden_id
-    ).filter(
-        OrdenMecanico.mecanico_id == data.mecanico_id,
-        OrdenTrabajo.estado == "cerrada",
-        OrdenTrabajo.fecha >= data.fecha_inicio,
-        OrdenTrabajo.fecha <= data.fecha_fin
-    ).all()
-
-    liquidacion = LiquidacionMecanico(
-        mecanico_id=data.mecanico_id,
-        fecha_inicio=data.fecha_inicio,
-        fecha_fin=data.fecha_fin,
-        frecuencia=data.frecuencia,
+    (liquidacion, _), = liquidar_mecanicos(
+        db,
+        [mecanico],
+        data.fecha_inicio,
+        data.fecha_fin,
+        data.frecuencia,
         usuario=usuario.get("sub"),
         observaciones=data.observaciones
     )
-    db.add(liquidacion)
-    db.flush()
 
-    total_base = 0.0
-    total_pagado = 0.0
+    db.commit()
+    db.refresh(liquidacion)
+    return liquidacion
 
-    for asignacion, orden in asignaciones:
-        porcentaje = asignacion.porcentaje if asignacion.porcentaje > 0 else mecanico.porcentaje_base
-        base = db.query(func.sum(DetalleOrden.subtotal)).filter(
-            DetalleOrden.orden_id == orden.id
-        ).scalar() or 0.0
-        monto = base * (porcentaje / 100.0)
-
-        detalle = LiquidacionMecanicoDetalle(
-            liquidacion_id=liquidacion.id,
-            orden_id=orden.id,
-            porcentaje=porcentaje,
-            base_calculo=base,
-            monto=monto
-        )
-        db.add(detalle)
-        total_base += base
-        total_pagado += monto
 
-    liquidacion.total_base = total_base
-    liquidacion.total_pagado = total_pagado
+@router.post("/liquidaciones/mecanicos:batch", response_model=LiquidacionLoteResponseSchema)
+def liquidar_todos_los_mecanicos(
+    data: LiquidacionLoteCreateSchema,
+    db: Session = Depends(get_db),
+    usuario=Depends(solo_admin)
+):
+    """
+    Liquida en una sola transaccion a todos los tecnicos activos para el
+    periodo. Omite a los que ya tienen una liquidacion de ese mismo periodo.
+    """
+    if data.fecha_fin < data.fecha_inicio:
+        raise HTTPException(status_code=400, detail="La fecha final es anterior a la inicial")
+
+    mecanicos = db.query(Mecanico).filter(
+        Mecanico.activo == True
+    ).order_by(Mecanico.id.asc()).all()
+
+    liquidados = {
+        mecanico_id
+        for mecanico_id, in db.query(LiquidacionMecanico.mecanico_id).filter(
+            LiquidacionMecanico.mecanico_id.in_([mecanico.id for mecanico in mecanicos]),
+            LiquidacionMecanico.fecha_inicio == data.fecha_inicio,
+            LiquidacionMecanico.fecha_fin == data.fecha_fin
+        )
+    }
+    omitidos = [mecanico.id for mecanico in mecanicos if mecanico.id in liquidados]
+    mecanicos = [mecanico for mecanico in mecanicos if mecanico.id not in liquidados]
+
+    liquidaciones = liquidar_mecanicos(
+        db,
+        mecanicos,
+        data.fecha_inicio,
+        data.fecha_fin,
+        data.frecuencia,
+        usuario=usuario.get("sub"),
+        observaciones=data.observaciones,
+        incluir_sin_ordenes=data.incluir_sin_ordenes
+    )
 
+    por_id = {mecanico.id: mecanico for mecanico in mecanicos}
+    resumen = []
+    for liquidacion, ordenes in liquidaciones:
+        mecanico = por_id[liquidacion.mecanico_id]
+        resumen.append({
+            "liquidacion_id": liquidacion.id,
+            "mecanico_id": mecanico.id,
+            "mecanico": f"{mecanico.nombres} {mecanico.apellidos}".strip(),
+            "ordenes": ordenes,
+            "total_base": liquidacion.total_base,
+            "total_pagado": liquidacion.total_pagado
+        })
     db.commit()
-    db.refresh(liquidacion)
-    return liquidacion
+
+    return {
+        "fecha_inicio": data.fecha_inicio,
+        "fecha_fin": data.fecha_fin,
+        "liquidaciones": resumen,
+        "omitidos": omitidos,
+        "total_base": sum(item["total_base"] for item in resumen),
+        "total_pagado": sum(item["total_pagado"] for item in resumen)
+    }
 
 
 @router.get("/liquidaciones/mecanicos", response_model=list[LiquidacionMecanicoResponseSchema])
@@ -445,6 +464,7 @@ def obtener_liquidacion_mecanico(liquidacion_id: int, db: Session = Depends(get_
 @router.get("/liquidaciones/mecanicos/{liquidacion_id}/pdf")
 def descargar_pdf_liquidacion(
     liquidacion_id: int,
+    request: Request,
     metodo_pago: str | None = None,
     db: Session = Depends(get_db),
     usuario=Depends(solo_admin)
@@ -463,18 +483,36 @@ def descargar_pdf_liquidacion(
         LiquidacionMecanicoDetalle.liquidacion_id == liquidacion.id
     ).order_by(LiquidacionMecanicoDetalle.id.asc()).all()
 
-    ruta = _generar_pdf_nomina(
-        liquidacion=liquidacion,
-        mecanico=mecanico,
-        detalles=detalles,
-        metodo_pago=metodo_pago
-    )
+    datos = {
+        "liquidacion": {
+            "id": liquidacion.id,
+            "fecha_creacion": liquidacion.fecha_creacion,
+            "fecha_inicio": liquidacion.fecha_inicio,
+            "fecha_fin": liquidacion.fecha_fin,
+            "frecuencia": liquidacion.frecuencia,
+            "estado": liquidacion.estado,
+            "total_base": liquidacion.total_base,
+            "total_pagado": liquidacion.total_pagado,
+        },
+        "mecanico": {
+            "nombres": mecanico.nombres,
+            "apellidos": mecanico.apellidos,
+            "documento": mecanico.documento,
+        } if mecanico else None,
+        "detalles": [
+            [det.orden_id, det.porcentaje, det.base_calculo, det.monto]
+            for det in detalles
+        ],
+        "metodo_pago": metodo_pago,
+    }
 
-    return FileResponse(
-        path=ruta,
-        filename=f"nomina_{liquidacion.id}.pdf",
-        media_type="application/pdf"
-    )
+    def generar(ruta):
+        renderizar("nomina", ruta, datos)
+
+    # Cada metodo de pago produce un recibo distinto; se cachean por separado.
+    sufijo = re.sub(r"[^a-z0-9]+", "_", (metodo_pago or "sin_metodo").lower())[:30]
+    documento = f"nomina_{liquidacion.id}_{sufijo}"
+    return respuesta_pdf(request, documento, datos, generar, f"nomina_{liquidacion.id}.pdf")
 
 
 @router.patch("/liquidaciones/mecanicos/{liquidacion_id}/estado")
@@ -517,19 +555,18 @@ def actualizar_estado_liquidacion(
         if mecanico:
             nombre_mecanico = f"{mecanico.nombres} {mecanico.apellidos}".strip()
 
-        movimiento = MovimientoCaja(
-            caja_id=caja.id,
+        registrar_movimiento_caja(
+            db,
+            caja,
             tipo="egreso",
-            concepto=f"Pago nomina tecnico {nombre_mecanico}",
             monto=liquidacion.total_pagado or 0.0,
+            categoria=CategoriaMovimiento.PAGO_NOMINA,
+            concepto=f"Pago nomina tecnico {nombre_mecanico}",
             motivo="Pago de liquidacion",
             orden_id=None,
             proveedor_id=None,
             usuario=usuario.get("sub")
         )
-        db.add(movimiento)
-        db.flush()
-        _actualizar_saldo_caja(db, caja)
 
     liquidacion.estado = estado
     db.commit()
@@ -7,6 +7,12 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from backend.app.core.database import SessionLocal
+from backend.app.core.escritor import ejecutar_escritura
+from backend.app.core.lineas_orden import (
+    agregar_servicio,
+    editar_servicio,
+    eliminar_servicio
+)
 
 from backend.app.models.detalle_orden import DetalleOrden
 from backend.app.models.orden_trabajo import OrdenTrabajo
@@ -46,45 +52,35 @@ def agregar_servicio_a_orden(
     detalle: DetalleOrdenCreate,
     db: Session = Depends(get_db)
 ):
-    orden = db.query(OrdenTrabajo).filter(
-        OrdenTrabajo.id == detalle.orden_id
-    ).first()
-
-    if not orden:
-        raise HTTPException(status_code=404, detail="Orden no existe")
-
-    # 🔒 BLOQUEO SI ESTÁ CERRADA
-    if orden.estado == "cerrada":
-        raise HTTPException(
-            status_code=400,
-            detail="No se puede modificar una orden cerrada. Reabra la orden primero."
-        )
+    def agregar(sesion: Session):
+        orden = sesion.query(OrdenTrabajo).filter(
+            OrdenTrabajo.id == detalle.orden_id
+        ).first()
 
-    servicio = db.query(Servicio).filter(
-        Servicio.id == detalle.servicio_id
-    ).first()
+        if not orden:
+            raise HTTPException(status_code=404, detail="Orden no existe")
 
-    if not servicio:
-        raise HTTPException(status_code=404, detail="Servicio no existe")
+        # 🔒 BLOQUEO SI ESTÁ CERRADA
+        if orden.estado == "cerrada":
+            raise HTTPException(
+                status_code=400,
+                detail="No se puede modificar una orden cerrada. Reabra la orden primero."
+            )
 
-    subtotal = servicio.precio * detalle.cantidad
+        servicio = sesion.query(Servicio).filter(
+            Servicio.id == detalle.servicio_id
+        ).first()
 
-    nuevo_detalle = DetalleOrden(
-        orden_id=detalle.orden_id,
-        servicio_id=detalle.servicio_id,
-        cantidad=detalle.cantidad,
-        precio_unitario=servicio.precio,
-        subtotal=subtotal
-    )
+        if not servicio:
+            raise HTTPException(status_code=404, detail="Servicio no existe")
 
-    db.add(nuevo_detalle)
+        nuevo_detalle = agregar_servicio(sesion, orden, servicio, detalle.cantidad)
+        sesion.flush()
+        return nuevo_detalle.id
 
-    orden.total += subtotal
+    detalle_id = ejecutar_escritura(agregar, db)
 
-    db.commit()
-    db.refresh(nuevo_detalle)
-
-    return nuevo_detalle
+    return db.query(DetalleOrden).filter(DetalleOrden.id == detalle_id).first()
 
 # ======================================================
 # LISTAR SERVICIOS DE UNA ORDEN
@@ -109,35 +105,30 @@ def editar_detalle_orden(
     cantidad: int,
     db: Session = Depends(get_db)
 ):
-    detalle = db.query(DetalleOrden).filter(
-        DetalleOrden.id == detalle_id
-    ).first()
-
-    if not detalle:
-        raise HTTPException(status_code=404, detail="Detalle no encontrado")
-
-    orden = db.query(OrdenTrabajo).filter(
-        OrdenTrabajo.id == detalle.orden_id
-    ).first()
+    def editar(sesion: Session):
+        detalle = sesion.query(DetalleOrden).filter(
+            DetalleOrden.id == detalle_id
+        ).first()
 
-    # 🔒 BLOQUEO SI ESTÁ CERRADA
-    if orden.estado == "cerrada":
-        raise HTTPException(
-            status_code=400,
-            detail="No se puede editar una orden cerrada. Reabra la orden primero."
-        )
+        if not detalle:
+            raise HTTPException(status_code=404, detail="Detalle no encontrado")
 
-    orden.total -= detalle.subtotal
+        orden = sesion.query(OrdenTrabajo).filter(
+            OrdenTrabajo.id == detalle.orden_id
+        ).first()
 
-    detalle.cantidad = cantidad
-    detalle.subtotal = detalle.precio_unitario * cantidad
+        # 🔒 BLOQUEO SI ESTÁ CERRADA
+        if orden.estado == "cerrada":
+            raise HTTPException(
+                status_code=400,
+                detail="No se puede editar una orden cerrada. Reabra la orden primero."
+            )
 
-    orden.total += detalle.subtotal
+        editar_servicio(orden, detalle, cantidad)
 
-    db.commit()
-    db.refresh(detalle)
+    ejecutar_escritura(editar, db)
 
-    return detalle
+    return db.query(DetalleOrden).filter(DetalleOrden.id == detalle_id).first()
 
 # ======================================================
 # ELIMINAR SERVICIO DE ORDEN (CON BLOQUEO)
@@ -148,27 +139,27 @@ def eliminar_detalle_orden(
     detalle_id: int,
     db: Session = Depends(get_db)
 ):
-    detalle = db.query(DetalleOrden).filter(
-        DetalleOrden.id == detalle_id
-    ).first()
+    def eliminar(sesion: Session):
+        detalle = sesion.query(DetalleOrden).filter(
+            DetalleOrden.id == detalle_id
+        ).first()
 
-    if not detalle:
-        raise HTTPException(status_code=404, detail="Detalle no encontrado")
+        if not detalle:
+            raise HTTPException(status_code=404, detail="Detalle no encontrado")
 
-    orden = db.query(OrdenTrabajo).filter(
-        OrdenTrabajo.id == detalle.orden_id
-    ).first()
+        orden = sesion.query(OrdenTrabajo).filter(
+            OrdenTrabajo.id == detalle.orden_id
+        ).first()
 
-    # 🔒 BLOQUEO SI ESTÁ CERRADA
-    if orden.estado == "cerrada":
-        raise HTTPException(
-            status_code=400,
-            detail="No se puede eliminar servicios de una orden cerrada. Reabra la orden primero."
-        )
+        # 🔒 BLOQUEO SI ESTÁ CERRADA
+        if orden.estado == "cerrada":
+            raise HTTPException(
+                status_code=400,
+                detail="No se puede eliminar servicios de una orden cerrada. Reabra la orden primero."
+            )
 
-    orden.total -= detalle.subtotal
+        eliminar_servicio(sesion, orden, detalle)
 
-    db.delete(detalle)
-    db.commit()
+    ejecutar_escritura(eliminar, db)
 
     return {"mensaje": "Servicio eliminado de la orden correctamente"}
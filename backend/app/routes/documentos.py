@@ -0,0 +1,58 @@
+# ======================================================
+# IMPORTS
+# ======================================================
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from backend.app.core.render_pool import estado_trabajo, obtener_trabajo
+from backend.app.core.security import solo_admin
+from backend.app.schemas.documentos import TrabajoDocumentoResponse
+
+# ======================================================
+# ROUTER
+# ======================================================
+
+router = APIRouter(
+    prefix="/documentos",
+    tags=["Documentos"],
+    dependencies=[Depends(solo_admin)]
+)
+
+
+def _trabajo_o_404(trabajo_id: str):
+    trabajo = obtener_trabajo(trabajo_id)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado o vencido")
+    return trabajo
+
+# ======================================================
+# ESTADO DE UN TRABAJO
+# ======================================================
+
+@router.get("/trabajos/{trabajo_id}", response_model=TrabajoDocumentoResponse)
+def consultar_trabajo(trabajo_id: str):
+    return estado_trabajo(_trabajo_o_404(trabajo_id))
+
+# ======================================================
+# DESCARGA
+# ======================================================
+
+@router.get("/trabajos/{trabajo_id}/descarga")
+def descargar_trabajo(trabajo_id: str):
+    trabajo = _trabajo_o_404(trabajo_id)
+    estado = estado_trabajo(trabajo)
+    if estado["estado"] == "error":
+        raise HTTPException(status_code=500, detail=f"No se pudo generar el documento: {estado['error']}")
+    if estado["estado"] != "listo":
+        raise HTTPException(
+            status_code=409,
+            detail="El documento aun no esta listo",
+            headers={"Retry-After": "2"}
+        )
+
+    return FileResponse(
+        path=trabajo["ruta"],
+        filename=trabajo["nombre_archivo"],
+        media_type=trabajo["media_type"]
+    )
@@ -0,0 +1,65 @@
+"""
+Canal de eventos del servidor (Server-Sent Events).
+
+El navegador abre una sola conexion con los temas que le interesan y recibe
+un aviso cuando algo cambia; solo entonces vuelve a consultar los datos.
+"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from backend.app.core.eventos import TEMAS, cancelar, suscribir
+from backend.app.core.security import usuario_autenticado
+
+router = APIRouter(tags=["Eventos"])
+
+# Comentario periodico para que proxies y navegador no cierren la conexion
+# y para detectar clientes que ya se fueron.
+INTERVALO_PING = 15
+
+
+def _mensaje(evento: str, datos: dict) -> str:
+    return f"event: {evento}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+
+
+async def _flujo(request: Request, suscripcion: dict):
+    try:
+        # Si se cae la conexion, el navegador reintenta a los 5 segundos.
+        yield "retry: 5000\n\n"
+        yield _mensaje("conectado", {"temas": sorted(suscripcion["temas"])})
+        while True:
+            if suscripcion["desbordada"]:
+                suscripcion["desbordada"] = False
+                yield _mensaje("resync", {})
+            try:
+                evento = await asyncio.wait_for(suscripcion["cola"].get(), timeout=INTERVALO_PING)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            yield _mensaje(evento["tema"], evento)
+    finally:
+        cancelar(suscripcion)
+
+
+@router.get("/eventos")
+async def eventos(
+    request: Request,
+    temas: str = ",".join(TEMAS),
+    usuario=Depends(usuario_autenticado)
+):
+    pedidos = {tema.strip() for tema in temas.split(",") if tema.strip()}
+    invalidos = pedidos - set(TEMAS)
+    if not pedidos or invalidos:
+        raise HTTPException(status_code=400, detail=f"Temas invalidos: {', '.join(sorted(invalidos)) or '-'}")
+
+    suscripcion = suscribir(pedidos)
+    return StreamingResponse(
+        _flujo(request, suscripcion),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -4,6 +4,7 @@ Sistema MedinAutos
 """
 
 from datetime import date
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import RedirectResponse, HTMLResponse
@@ -16,8 +17,10 @@ from backend.app.models.orden_trabajo import OrdenTrabajo
 from backend.app.models.cliente import Cliente
 from backend.app.models.vehiculo import Vehiculo
 from backend.app.models.recomendacion_regla import RecomendacionRegla
-from backend.app.models.vehiculo_recomendacion import VehiculoRecomendacion
+from backend.app.models.alerta_mantenimiento import AlertaMantenimiento
+from backend.app.core.kilometraje import registrar_ingreso_orden
 from backend.app.core.novedades import construir_alerta_vehiculo
+from backend.app.core.ordenes import paginar_ordenes, resumen_estados
 from backend.app.core.security import (
     verificar_password,
     crear_token
@@ -169,14 +172,58 @@ def vista_prestamos_herramientas(request: Request):
         {"request": request}
     )
 
+def _fecha_filtro(valor: str | None) -> date | None:
+    """
+    El formulario de filtros envia los campos de fecha aunque esten vacios;
+    vacio o mal escrito cuenta como sin filtro.
+    """
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
 @router.get("/ordenes", response_class=HTMLResponse)
-def vista_ordenes(request: Request, db: Session = Depends(get_db)):
-    ordenes = db.query(OrdenTrabajo).order_by(OrdenTrabajo.id.desc()).all()
+def vista_ordenes(
+    request: Request,
+    cursor: str | None = None,
+    estado: str | None = None,
+    desde: str | None = None,
+    hasta: str | None = None,
+    cliente_id: int | None = None,
+    vehiculo_id: int | None = None,
+    forma_pago: str | None = None,
+    db: Session = Depends(get_db)
+):
+    filtros = {
+        "estado": estado,
+        "desde": _fecha_filtro(desde),
+        "hasta": _fecha_filtro(hasta),
+        "cliente_id": cliente_id,
+        "vehiculo_id": vehiculo_id,
+        "forma_pago": forma_pago,
+    }
+    try:
+        ordenes, siguiente = paginar_ordenes(db, cursor=cursor, **filtros)
+    except ValueError:
+        # Cursor manipulado o viejo: se vuelve a la primera pagina.
+        cursor = None
+        ordenes, siguiente = paginar_ordenes(db, **filtros)
+
+    filtros_activos = {k: v for k, v in filtros.items() if v not in (None, "")}
+    siguiente_url = None
+    if siguiente:
+        siguiente_url = "/ordenes?" + urlencode({**filtros_activos, "cursor": siguiente})
+    primera_url = "/ordenes?" + urlencode(filtros_activos) if cursor else None
+
     return templates.TemplateResponse(
         "ordenes/listar.html",
         {
             "request": request,
-            "ordenes": ordenes
+            "ordenes": ordenes,
+            "resumen": resumen_estados(db, **filtros),
+            "filtros": filtros,
+            "siguiente_url": siguiente_url,
+            "primera_url": primera_url
         }
     )
 
@@ -200,6 +247,7 @@ def crear_orden_form(
     cliente_id: int = Form(...),
     vehiculo_id: int = Form(...),
     forma_pago: str = Form(None),
+    km_ingreso: int | None = Form(None),
     db: Session = Depends(get_db)
 ):
     orden = OrdenTrabajo(
@@ -207,11 +255,17 @@ def crear_orden_form(
         cliente_id=cliente_id,
         vehiculo_id=vehiculo_id,
         forma_pago=forma_pago,
+        km_ingreso=km_ingreso,
         estado="abierta",
         total=0.0
     )
 
     db.add(orden)
+    try:
+        registrar_ingreso_orden(db, orden)
+    except ValueError:
+        db.rollback()
+        return RedirectResponse("/ordenes/nuevo?km_error=1", status_code=303)
     db.commit()
     db.refresh(orden)
 
@@ -237,25 +291,13 @@ def vista_detalle_orden(
     vehiculos = db.query(Vehiculo).order_by(Vehiculo.placa.asc()).all()
     alertas = []
     if orden.vehiculo:
-        reglas = db.query(RecomendacionRegla).filter(RecomendacionRegla.activo == True).all()
-        recs = db.query(VehiculoRecomendacion).filter(
-            VehiculoRecomendacion.vehiculo_id == orden.vehiculo_id
-        ).all()
-        rec_map = {rec.regla_id: rec for rec in recs}
-
-        for regla in reglas:
-            rec = rec_map.get(regla.id)
-            if not rec:
-                rec = VehiculoRecomendacion(
-                    vehiculo_id=orden.vehiculo_id,
-                    regla_id=regla.id,
-                    km_base=orden.vehiculo.km_actual or 0,
-                    fecha_base=date.today()
-                )
-                db.add(rec)
-                db.commit()
-                db.refresh(rec)
-            alertas.append(construir_alerta_vehiculo(orden.vehiculo, regla, rec))
+        filas = db.query(AlertaMantenimiento, RecomendacionRegla).join(
+            RecomendacionRegla, RecomendacionRegla.id == AlertaMantenimiento.regla_id
+        ).filter(
+            AlertaMantenimiento.vehiculo_id == orden.vehiculo_id
+        ).order_by(RecomendacionRegla.id.asc()).all()
+        for estado, regla in filas:
+            alertas.append(construir_alerta_vehiculo(orden.vehiculo, regla, estado))
 
     return templates.TemplateResponse(
         "ordenes/detalle.html",
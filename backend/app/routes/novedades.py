@@ -4,21 +4,26 @@ Rutas del modulo Novedades (mantenimiento por km/tiempo).
 
 from datetime import date
 
-from fastapi import APIRouter, Request, Depends, Form
+from fastapi import APIRouter, Request, Depends, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from backend.app.core.templates import templates
 from backend.app.core.database import get_db
-from backend.app.core.novedades import calcular_estado_regla
+from backend.app.core.novedades import alertas_por_vencer, construir_alerta_vehiculo
+from backend.app.models.alerta_mantenimiento import AlertaMantenimiento
 from backend.app.models.vehiculo import Vehiculo
 from backend.app.models.recomendacion_regla import RecomendacionRegla
 from backend.app.models.vehiculo_recomendacion import VehiculoRecomendacion
+from backend.app.schemas.novedades import AlertaPorVencerResponse
 
 
 router = APIRouter(tags=["Novedades"])
 
+# Horizonte del panel "por vencer" de la vista.
+DIAS_POR_VENCER = 30
+
 
 def _coerce_int(valor):
     if valor is None:
@@ -31,72 +36,33 @@ def _coerce_int(valor):
     return int(texto)
 
 
-def _asegurar_recomendacion(db, vehiculo, regla):
-    existente = db.query(VehiculoRecomendacion).filter(
-        VehiculoRecomendacion.vehiculo_id == vehiculo.id,
-        VehiculoRecomendacion.regla_id == regla.id
-    ).first()
-    if existente:
-        return existente
-
-    rec = VehiculoRecomendacion(
-        vehiculo_id=vehiculo.id,
-        regla_id=regla.id,
-        km_base=vehiculo.km_actual or 0,
-        fecha_base=date.today()
-    )
-    db.add(rec)
-    return rec
-
-
 @router.get("/novedades", response_class=HTMLResponse)
 def vista_novedades(request: Request, db: Session = Depends(get_db)):
     reglas = db.query(RecomendacionRegla).order_by(RecomendacionRegla.nombre.asc()).all()
-    vehiculos = db.query(Vehiculo).order_by(Vehiculo.placa.asc()).all()
 
-    recs = db.query(VehiculoRecomendacion).all()
-    rec_map = {(rec.vehiculo_id, rec.regla_id): rec for rec in recs}
+    # Estado precalculado (core/novedades): la vista solo lee.
+    filas = db.query(AlertaMantenimiento, Vehiculo, RecomendacionRegla).join(
+        Vehiculo, Vehiculo.id == AlertaMantenimiento.vehiculo_id
+    ).join(
+        RecomendacionRegla, RecomendacionRegla.id == AlertaMantenimiento.regla_id
+    ).order_by(Vehiculo.placa.asc(), RecomendacionRegla.nombre.asc()).all()
 
     alertas = []
-    for vehiculo in vehiculos:
-        for regla in reglas:
-            if not regla.activo:
-                continue
-            rec = rec_map.get((vehiculo.id, regla.id))
-            if not rec:
-                rec = _asegurar_recomendacion(db, vehiculo, regla)
-                rec_map[(vehiculo.id, regla.id)] = rec
-
-            estado = calcular_estado_regla(vehiculo, regla, rec)
-            alertas.append({
-                "vehiculo_id": vehiculo.id,
-                "placa": vehiculo.placa,
-                "marca": vehiculo.marca,
-                "linea": vehiculo.modelo,
-                "km_actual": vehiculo.km_actual,
-                "regla_id": regla.id,
-                "regla_nombre": regla.nombre,
-                "descripcion": regla.descripcion,
-                "estado": estado["estado"],
-                "progreso": estado["progreso"],
-                "km_restante": estado["km_restante"],
-                "dias_restante": estado["dias_restante"],
-                "km_trans": estado["km_trans"],
-                "dias_trans": estado["dias_trans"],
-            })
-
-    db.commit()
-
     agrupadas = {}
-    for alerta in alertas:
-        vid = alerta["vehiculo_id"]
+    for estado, vehiculo, regla in filas:
+        alerta = construir_alerta_vehiculo(vehiculo, regla, estado)
+        alerta["km_actual"] = vehiculo.km_actual
+        alertas.append(alerta)
+
+        vid = vehiculo.id
         if vid not in agrupadas:
             agrupadas[vid] = {
                 "vehiculo_id": vid,
-                "placa": alerta["placa"],
-                "marca": alerta["marca"],
-                "linea": alerta["linea"],
-                "km_actual": alerta["km_actual"],
+                "placa": vehiculo.placa,
+                "marca": vehiculo.marca,
+                "linea": vehiculo.modelo,
+                "km_actual": vehiculo.km_actual,
+                "km_dia": vehiculo.km_dia,
                 "alertas": []
             }
         agrupadas[vid]["alertas"].append(alerta)
@@ -107,11 +73,21 @@ def vista_novedades(request: Request, db: Session = Depends(get_db)):
             "request": request,
             "reglas": reglas,
             "alertas": alertas,
-            "alertas_vehiculos": list(agrupadas.values())
+            "alertas_vehiculos": list(agrupadas.values()),
+            "por_vencer": alertas_por_vencer(db, DIAS_POR_VENCER),
+            "dias_por_vencer": DIAS_POR_VENCER
         }
     )
 
 
+@router.get("/novedades/por-vencer", response_model=list[AlertaPorVencerResponse])
+def listar_por_vencer(
+    dias: int = Query(30, ge=0, le=365),
+    db: Session = Depends(get_db)
+):
+    return alertas_por_vencer(db, dias)
+
+
 @router.post("/novedades/reglas")
 def crear_regla(
     nombre: str = Form(...),
@@ -145,13 +121,6 @@ def crear_regla(
     except IntegrityError:
         db.rollback()
         return RedirectResponse("/novedades?rule_duplicate=1", status_code=303)
-    db.refresh(regla)
-
-    vehiculos = db.query(Vehiculo).all()
-    for vehiculo in vehiculos:
-        _asegurar_recomendacion(db, vehiculo, regla)
-
-    db.commit()
 
     return RedirectResponse("/novedades?rule_created=1", status_code=303)
 
@@ -2,39 +2,42 @@
 # IMPORTS
 # ======================================================
 
-import os
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from datetime import date, datetime
 
-from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 
+from backend.app.core.caja import posicion_orden, registrar_movimiento_caja
 from backend.app.core.database import get_db
+from backend.app.core.liquidaciones import liquidar_orden_cancelada, recalcular_liquidaciones
+from backend.app.core.escritor import ejecutar_escritura
+from backend.app.core.etag import respuesta_json_con_etag
+from backend.app.core.kilometraje import registrar_ingreso_orden
+from backend.app.core.lineas_orden import aplicar_lote_lineas, validar_orden_editable
+from backend.app.core.pdf_cache import invalidar_documento, respuesta_pdf
+from backend.app.core.render_pool import renderizar
+from backend.app.core.ordenes import LIMITE_POR_DEFECTO, cargar_workspace_orden, paginar_ordenes
 from backend.app.models.caja import Caja
 from backend.app.models.detalle_almacen import DetalleAlmacen
 from backend.app.models.orden_trabajo import OrdenTrabajo
 from backend.app.models.orden_mecanico import OrdenMecanico
-from backend.app.models.mecanico import Mecanico
-from backend.app.models.movimiento_caja import MovimientoCaja
-from backend.app.models.proveedor import Proveedor
+from backend.app.models.movimiento_caja import CategoriaMovimiento
 from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
 from backend.app.models.liquidacion_mecanico_detalle import LiquidacionMecanicoDetalle
 from backend.app.models.almacen_item import AlmacenItem
 from backend.app.models.servicio import Servicio
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from backend.app.schemas.orden_trabajo import (
     OrdenTrabajoCreate,
     OrdenTrabajoUpdate,
-    OrdenTrabajoResponse
+    OrdenTrabajoResponse,
+    OrdenTrabajoPagina,
+    OrdenWorkspaceResponse
 )
 from backend.app.models.detalle_orden import DetalleOrden
+from backend.app.schemas.lineas_orden import LineasLoteRequest, LineasLoteResponse
 
 from backend.app.core.security import admin_o_mecanico
-from backend.app.core.templates import _base_app_dir
 
 # ======================================================
 # ROUTER
@@ -49,210 +52,6 @@ router = APIRouter(
     tags=["Órdenes de Trabajo"]
 )
 
-def _actualizar_saldo_caja(db: Session, caja: Caja):
-    ingresos = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == "ingreso"
-    ).scalar() or 0.0
-    egresos = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == "egreso"
-    ).scalar() or 0.0
-    caja.saldo_final = caja.saldo_inicial + ingresos - egresos
-
-def _calcular_periodo(fecha):
-    import calendar
-    inicio = fecha.replace(day=1)
-    if fecha.day <= 15:
-        fin = fecha.replace(day=15)
-        frecuencia = "quincenal"
-    else:
-        ultimo_dia = calendar.monthrange(fecha.year, fecha.month)[1]
-        fin = fecha.replace(day=ultimo_dia)
-        frecuencia = "quincenal"
-    return inicio, fin, frecuencia
-
-def _obtener_o_crear_liquidacion(db: Session, mecanico_id: int, fecha_base):
-    fecha_inicio, fecha_fin, frecuencia = _calcular_periodo(fecha_base)
-    liquidacion = db.query(LiquidacionMecanico).filter(
-        LiquidacionMecanico.mecanico_id == mecanico_id,
-        LiquidacionMecanico.fecha_inicio == fecha_inicio,
-        LiquidacionMecanico.fecha_fin == fecha_fin,
-        LiquidacionMecanico.estado == "pendiente"
-    ).first()
-    if liquidacion:
-        return liquidacion
-
-    liquidacion = LiquidacionMecanico(
-        mecanico_id=mecanico_id,
-        fecha_inicio=fecha_inicio,
-        fecha_fin=fecha_fin,
-        frecuencia=frecuencia,
-        total_base=0.0,
-        total_pagado=0.0,
-        estado="pendiente"
-    )
-    db.add(liquidacion)
-    db.flush()
-    return liquidacion
-
-def _recalcular_liquidacion(db: Session, liquidacion_id: int):
-    totales = db.query(
-        func.sum(LiquidacionMecanicoDetalle.base_calculo).label("base"),
-        func.sum(LiquidacionMecanicoDetalle.monto).label("monto")
-    ).filter(
-        LiquidacionMecanicoDetalle.liquidacion_id == liquidacion_id
-    ).first()
-    liquidacion = db.query(LiquidacionMecanico).filter(
-        LiquidacionMecanico.id == liquidacion_id
-    ).first()
-    if not liquidacion:
-        return
-    liquidacion.total_base = totales.base or 0.0
-    liquidacion.total_pagado = totales.monto or 0.0
-
-def _formatear_moneda(valor):
-    return f"${(valor or 0):,.0f}".replace(",", ".")
-
-def _obtener_carpeta_pdf():
-    ruta = os.path.join("backend", "app", "static", "pdfs", "ordenes")
-    os.makedirs(ruta, exist_ok=True)
-    return ruta
-
-def _generar_pdf_orden(orden, cliente, vehiculo, servicios, insumos, total_servicios=0.0, total_insumos=0.0):
-    ruta = os.path.join(_obtener_carpeta_pdf(), f"orden_{orden.id}.pdf")
-    doc = SimpleDocTemplate(ruta, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
-    styles = getSampleStyleSheet()
-    story = []
-
-    logo_path = os.path.join(_base_app_dir(), "static", "img", "logo_medinautos.png")
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=90, height=60)
-    else:
-        logo = Paragraph("MEDINAUTOS", styles["Heading2"])
-
-    header = Table([
-        [logo, Paragraph("<b>MEDINAUTOS</b><br/>Telefono: 3166191371", styles["Normal"])],
-        [Paragraph(f"<b>Orden:</b> #{orden.id}", styles["Normal"]),
-         Paragraph(f"<b>Fecha:</b> {orden.fecha.strftime('%Y-%m-%d %I:%M %p') if orden.fecha else '-'}", styles["Normal"])]
-    ], colWidths=[120, 380])
-    header.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(header)
-    story.append(Spacer(1, 12))
-
-    if orden.forma_pago == "efectivo":
-        forma_pago = "Efectivo"
-    elif orden.forma_pago == "transferencia":
-        forma_pago = "Transferencia"
-    else:
-        forma_pago = orden.forma_pago or "No definida"
-    info = Table([
-        [Paragraph("<b>Cliente</b>", styles["Normal"]), ""],
-        [f"{cliente.nombre if cliente else '-'}", f"Documento: {cliente.documento if cliente else '-'}"],
-        [f"Telefono: {cliente.telefono if cliente and cliente.telefono else '-'}", f"Email: {cliente.email if cliente and cliente.email else '-'}"],
-        ["", ""],
-        [Paragraph("<b>Vehiculo</b>", styles["Normal"]), ""],
-        [f"Placa: {vehiculo.placa if vehiculo else '-'}", f"Marca: {vehiculo.marca if vehiculo else '-'}"],
-        [f"Linea: {vehiculo.modelo if vehiculo else '-'}", f"Modelo: {vehiculo.anio if vehiculo and vehiculo.anio else '-'}"],
-        [f"Cilindraje: {vehiculo.cilindraje if vehiculo and vehiculo.cilindraje else '-'}",
-         f"Clase: {vehiculo.clase if vehiculo and vehiculo.clase else '-'}"],
-        [f"Km actual: {vehiculo.km_actual if vehiculo and vehiculo.km_actual is not None else '-'}",
-         f"Color: {vehiculo.color if vehiculo and vehiculo.color else '-'}"],
-        [f"Ingreso: {orden.fecha.strftime('%Y-%m-%d %I:%M %p') if orden.fecha else '-'}",
-         f"Salida: {orden.fecha_salida.strftime('%Y-%m-%d %I:%M %p') if orden.fecha_salida else '-'}"],
-        ["", ""],
-        [Paragraph("<b>Forma de pago</b>", styles["Normal"]), forma_pago],
-    ], colWidths=[260, 260])
-    info.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
-        ("BACKGROUND", (0, 4), (-1, 4), colors.whitesmoke),
-        ("BACKGROUND", (0, 11), (-1, 11), colors.whitesmoke),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-    ]))
-    story.append(info)
-    story.append(Spacer(1, 14))
-
-    def tabla_detalle(titulo, filas):
-        story.append(Paragraph(f"<b>{titulo}</b>", styles["Heading4"]))
-        data = [["Descripcion", "Cantidad", "Precio", "Subtotal"]]
-        for fila in filas:
-            data.append(fila)
-        tabla = Table(data, colWidths=[260, 80, 90, 90])
-        tabla.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-            ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-        ]))
-        story.append(tabla)
-        story.append(Spacer(1, 10))
-
-    if servicios:
-        filas = [[
-            s["nombre"],
-            s["cantidad"],
-            _formatear_moneda(s["precio"]),
-            _formatear_moneda(s["subtotal"])
-        ] for s in servicios]
-        tabla_detalle("Servicios", filas)
-
-    if insumos:
-        filas = [[
-            i["nombre"],
-            i["cantidad"],
-            _formatear_moneda(i["precio"]),
-            _formatear_moneda(i["subtotal"])
-        ] for i in insumos]
-        tabla_detalle("Insumos", filas)
-
-    resumen_totales = Table([
-        ["Total servicios", _formatear_moneda(total_servicios)],
-        ["Total insumos", _formatear_moneda(total_insumos)]
-    ], colWidths=[200, 120])
-    resumen_totales.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
-        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-    ]))
-    story.append(resumen_totales)
-
-    total = orden.total or 0.0
-    resumen = Table([[Paragraph("<b>Total</b>", styles["Normal"]), _formatear_moneda(total)]], colWidths=[400, 120])
-    resumen.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), colors.whitesmoke),
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-    ]))
-    story.append(Spacer(1, 8))
-    story.append(resumen)
-    if orden.descripcion:
-        descripcion = orden.descripcion.replace("\n", "<br/>")
-        story.append(Spacer(1, 12))
-        story.append(Paragraph("<b>Observaciones</b>", styles["Heading4"]))
-        story.append(Paragraph(descripcion, styles["Normal"]))
-    story.append(Spacer(1, 20))
-    firmas = Table([
-        ["Firma cliente", "Firma tecnico", "Firma taller"],
-        ["____________________", "____________________", "____________________"],
-        ["", "", ""],
-        ["Nombre: ____________________", "Nombre: ____________________", "Nombre: ____________________"]
-    ], colWidths=[180, 180, 180])
-    firmas.setStyle(TableStyle([
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(firmas)
-
-    doc.build(story)
-    return ruta
-
 # ======================================================
 # CREAR ORDEN
 # ======================================================
@@ -265,6 +64,11 @@ def crear_orden(
 ):
     orden = OrdenTrabajo(**data.dict())
     db.add(orden)
+    try:
+        registrar_ingreso_orden(db, orden)
+    except ValueError as error:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(error))
     db.commit()
     db.refresh(orden)
     return orden
@@ -273,12 +77,35 @@ def crear_orden(
 # LISTAR ÓRDENES
 # ======================================================
 
-@router.get("/", response_model=list[OrdenTrabajoResponse])
+@router.get("/", response_model=OrdenTrabajoPagina)
 def listar_ordenes(
+    limite: int = LIMITE_POR_DEFECTO,
+    cursor: str | None = None,
+    estado: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    cliente_id: int | None = None,
+    vehiculo_id: int | None = None,
+    forma_pago: str | None = None,
     db: Session = Depends(get_db),
     usuario=Depends(admin_o_mecanico)
 ):
-    return db.query(OrdenTrabajo).all()
+    try:
+        ordenes, siguiente = paginar_ordenes(
+            db,
+            limite=limite,
+            cursor=cursor,
+            estado=estado,
+            desde=desde,
+            hasta=hasta,
+            cliente_id=cliente_id,
+            vehiculo_id=vehiculo_id,
+            forma_pago=forma_pago
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return {"items": ordenes, "siguiente_cursor": siguiente}
 
 # ======================================================
 # OBTENER ORDEN POR ID
@@ -299,6 +126,61 @@ def obtener_orden(
 
     return orden
 
+# ======================================================
+# ESPACIO DE TRABAJO DE LA ORDEN
+# ======================================================
+
+@router.get("/{orden_id}/workspace", response_model=OrdenWorkspaceResponse)
+def obtener_workspace_orden(
+    orden_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    usuario=Depends(admin_o_mecanico)
+):
+    workspace = cargar_workspace_orden(db, orden_id)
+    if not workspace:
+        raise HTTPException(status_code=404, detail="Orden no encontrada")
+
+    datos = OrdenWorkspaceResponse.model_validate(workspace, from_attributes=True)
+    return respuesta_json_con_etag(request, datos)
+
+# ======================================================
+# LINEAS EN LOTE (UNA SOLA TRANSACCION)
+# ======================================================
+
+@router.post("/{orden_id}/lineas:batch", response_model=LineasLoteResponse)
+def aplicar_lineas_en_lote(
+    orden_id: int,
+    data: LineasLoteRequest,
+    db: Session = Depends(get_db),
+    usuario=Depends(admin_o_mecanico)
+):
+    def aplicar(sesion: Session):
+        orden = sesion.query(OrdenTrabajo).filter(OrdenTrabajo.id == orden_id).first()
+        validar_orden_editable(orden, "No se puede modificar una orden cerrada. Reabra la orden primero.")
+
+        aplicadas = aplicar_lote_lineas(sesion, orden, data.operaciones, usuario.get("sub"))
+        sesion.flush()
+
+        total_servicios = sesion.query(func.sum(DetalleOrden.subtotal)).filter(
+            DetalleOrden.orden_id == orden.id
+        ).scalar() or 0.0
+        total_insumos = sesion.query(func.sum(DetalleAlmacen.subtotal)).filter(
+            DetalleAlmacen.orden_id == orden.id
+        ).scalar() or 0.0
+
+        return {
+            "orden_id": orden.id,
+            "aplicadas": aplicadas,
+            "totales": {
+                "servicios": total_servicios,
+                "insumos": total_insumos,
+                "total": orden.total or 0.0,
+            },
+        }
+
+    return ejecutar_escritura(aplicar, db)
+
 # ======================================================
 # PDF ORDEN
 # ======================================================
@@ -306,6 +188,7 @@ def obtener_orden(
 @router.get("/{orden_id}/pdf")
 def descargar_pdf_orden(
     orden_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     usuario=Depends(admin_o_mecanico)
 ):
@@ -315,9 +198,13 @@ def descargar_pdf_orden(
     if not orden:
         raise HTTPException(status_code=404, detail="Orden no encontrada")
 
-    detalles_servicios = db.query(DetalleOrden).filter(
+    # La huella se calcula en cada descarga (tambien en los 304), asi que
+    # los nombres se cargan en la misma consulta de las lineas.
+    detalles_servicios = db.query(DetalleOrden).options(
+        joinedload(DetalleOrden.servicio)
+    ).filter(
         DetalleOrden.orden_id == orden.id
-    ).all()
+    ).order_by(DetalleOrden.id.asc()).all()
     servicios = []
     for detalle in detalles_servicios:
         nombre = detalle.servicio.nombre if detalle.servicio else "Servicio"
@@ -328,9 +215,11 @@ def descargar_pdf_orden(
             "subtotal": detalle.subtotal
         })
 
-    detalles_insumos = db.query(DetalleAlmacen).filter(
+    detalles_insumos = db.query(DetalleAlmacen).options(
+        joinedload(DetalleAlmacen.item)
+    ).filter(
         DetalleAlmacen.orden_id == orden.id
-    ).all()
+    ).order_by(DetalleAlmacen.id.asc()).all()
     insumos = []
     for detalle in detalles_insumos:
         nombre = detalle.item.nombre if detalle.item else "Insumo"
@@ -341,24 +230,44 @@ def descargar_pdf_orden(
             "subtotal": detalle.subtotal
         })
 
-    total_servicios = sum(item["subtotal"] for item in servicios)
-    total_insumos = sum(item["subtotal"] for item in insumos)
-
-    ruta = _generar_pdf_orden(
-        orden=orden,
-        cliente=orden.cliente,
-        vehiculo=orden.vehiculo,
-        servicios=servicios,
-        insumos=insumos,
-        total_servicios=total_servicios,
-        total_insumos=total_insumos
-    )
+    cliente = orden.cliente
+    vehiculo = orden.vehiculo
+
+    # Todo lo que se imprime entra en la huella: si algo cambia, cambia
+    # el ETag y se genera un PDF nuevo.
+    datos = {
+        "orden": {
+            "id": orden.id,
+            "fecha": orden.fecha,
+            "fecha_salida": orden.fecha_salida,
+            "forma_pago": orden.forma_pago,
+            "total": orden.total,
+            "descripcion": orden.descripcion,
+        },
+        "cliente": {
+            "nombre": cliente.nombre,
+            "documento": cliente.documento,
+            "telefono": cliente.telefono,
+            "email": cliente.email,
+        } if cliente else None,
+        "vehiculo": {
+            "placa": vehiculo.placa,
+            "marca": vehiculo.marca,
+            "modelo": vehiculo.modelo,
+            "anio": vehiculo.anio,
+            "cilindraje": vehiculo.cilindraje,
+            "clase": vehiculo.clase,
+            "km_actual": vehiculo.km_actual,
+            "color": vehiculo.color,
+        } if vehiculo else None,
+        "servicios": servicios,
+        "insumos": insumos,
+    }
 
-    return FileResponse(
-        path=ruta,
-        filename=f"orden_{orden.id}.pdf",
-        media_type="application/pdf"
-    )
+    def generar(ruta):
+        renderizar("orden", ruta, datos)
+
+    return respuesta_pdf(request, f"orden_{orden.id}", datos, generar, f"orden_{orden.id}.pdf")
 
 # ======================================================
 # ACTUALIZAR ORDEN
@@ -404,127 +313,39 @@ def cambiar_estado(
             detail=f"Estado inválido. Use: {estados_validos}"
         )
 
-    orden = db.query(OrdenTrabajo).filter(
-        OrdenTrabajo.id == orden_id
-    ).first()
-
-    if not orden:
-        raise HTTPException(status_code=404, detail="Orden no encontrada")
-
-    if nuevo_estado == "cancelada" and orden.estado != "cancelada":
-        caja = db.query(Caja).filter(Caja.estado == "abierta").first()
-        if not caja:
-            raise HTTPException(
-                status_code=400,
-                detail="Debe existir una caja abierta para cancelar la orden"
-            )
-
-        ingreso = MovimientoCaja(
-            caja_id=caja.id,
-            tipo="ingreso",
-            concepto=f"Ingreso por orden {orden.id}",
-            monto=orden.total or 0.0,
-            motivo=f"Cambio de estado a {nuevo_estado}",
-            orden_id=orden.id,
-            usuario=usuario.get("sub")
-        )
-        db.add(ingreso)
-
-        total_proveedor = db.query(func.sum(DetalleAlmacen.subtotal_proveedor)).filter(
-            DetalleAlmacen.orden_id == orden.id
-        ).scalar() or 0.0
-
-        proveedores_nombres = db.query(Proveedor.nombre).join(
-            DetalleAlmacen, DetalleAlmacen.proveedor_id == Proveedor.id
-        ).filter(
-            DetalleAlmacen.orden_id == orden.id,
-            Proveedor.id.isnot(None)
-        ).distinct().all()
-        proveedores_texto = ", ".join(sorted({p[0] for p in proveedores_nombres})) or "Proveedor"
-
-        if total_proveedor > 0:
-            egreso_proveedores = MovimientoCaja(
-                caja_id=caja.id,
-                tipo="egreso",
-                concepto=f"Pago pendiente proveedor {proveedores_texto} orden {orden.id}",
-                monto=total_proveedor,
-                motivo=f"Cambio de estado a {nuevo_estado}",
-                orden_id=orden.id,
-                usuario=usuario.get("sub")
-            )
-            db.add(egreso_proveedores)
+    def cambiar(sesion: Session):
+        orden = sesion.query(OrdenTrabajo).filter(
+            OrdenTrabajo.id == orden_id
+        ).first()
 
-        total_servicios = db.query(func.sum(DetalleOrden.subtotal)).filter(
-            DetalleOrden.orden_id == orden.id
-        ).scalar() or 0.0
+        if not orden:
+            raise HTTPException(status_code=404, detail="Orden no encontrada")
 
-        asignaciones = db.query(OrdenMecanico, Mecanico).join(
-            Mecanico, Mecanico.id == OrdenMecanico.mecanico_id
-        ).filter(OrdenMecanico.orden_id == orden.id).all()
-
-        total_mecanicos = 0.0
-        nombres_mecanicos = []
-        liquidaciones_actualizadas = set()
-        for asignacion, mecanico in asignaciones:
-            porcentaje = asignacion.porcentaje or mecanico.porcentaje_base or 0.0
-            monto = total_servicios * (porcentaje / 100.0)
-            asignacion.porcentaje = porcentaje
-            asignacion.monto = monto
-            total_mecanicos += monto
-            nombres_mecanicos.append(f"{mecanico.nombres} {mecanico.apellidos}".strip())
-
-            if monto > 0:
-                fecha_base = (orden.fecha or datetime.utcnow()).date()
-                liquidacion = _obtener_o_crear_liquidacion(
-                    db, mecanico_id=asignacion.mecanico_id, fecha_base=fecha_base
+        if nuevo_estado == "cancelada" and orden.estado != "cancelada":
+            caja = sesion.query(Caja).filter(Caja.estado == "abierta").first()
+            if not caja:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Debe existir una caja abierta para cancelar la orden"
                 )
-                detalle = db.query(LiquidacionMecanicoDetalle).filter(
-                    LiquidacionMecanicoDetalle.liquidacion_id == liquidacion.id,
-                    LiquidacionMecanicoDetalle.orden_id == orden.id
-                ).first()
-                if detalle:
-                    detalle.porcentaje = porcentaje
-                    detalle.base_calculo = total_servicios
-                    detalle.monto = monto
-                else:
-                    db.add(LiquidacionMecanicoDetalle(
-                        liquidacion_id=liquidacion.id,
-                        orden_id=orden.id,
-                        porcentaje=porcentaje,
-                        base_calculo=total_servicios,
-                        monto=monto
-                    ))
-                liquidaciones_actualizadas.add(liquidacion.id)
-
-        if liquidaciones_actualizadas:
-            db.flush()
-            for liquidacion_id in liquidaciones_actualizadas:
-                _recalcular_liquidacion(db, liquidacion_id)
-
-        if total_mecanicos > 0:
-            nombres_unicos = ", ".join(sorted(set(nombres_mecanicos))) or "Tecnico"
-            egreso_mecanicos = MovimientoCaja(
-                caja_id=caja.id,
-                tipo="egreso",
-                concepto=f"Pago pendiente tecnico {nombres_unicos} orden {orden.id}",
-                monto=total_mecanicos,
-                motivo=f"Cambio de estado a {nuevo_estado}",
-                orden_id=orden.id,
-                usuario=usuario.get("sub")
+
+            liquidar_orden_cancelada(
+                sesion,
+                orden,
+                caja,
+                usuario=usuario.get("sub"),
+                motivo=f"Cambio de estado a {nuevo_estado}"
             )
-            db.add(egreso_mecanicos)
 
-        db.flush()
-        _actualizar_saldo_caja(db, caja)
+        orden.estado = nuevo_estado
+        if nuevo_estado == "cerrada":
+            orden.fecha_salida = datetime.utcnow()
 
-    orden.estado = nuevo_estado
-    if nuevo_estado == "cerrada":
-        orden.fecha_salida = datetime.utcnow()
-    db.commit()
+    ejecutar_escritura(cambiar, db)
 
     return {
         "mensaje": "Estado actualizado correctamente",
-        "estado": orden.estado
+        "estado": nuevo_estado
     }
 
 # ======================================================
@@ -558,74 +379,31 @@ def reabrir_orden(
             detail="Debe existir una caja abierta para reabrir la orden"
         )
 
-    ingreso_total = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.orden_id == orden.id,
-        MovimientoCaja.tipo == "ingreso",
-        MovimientoCaja.concepto == f"Ingreso por orden {orden.id}"
-    ).scalar() or 0.0
-
-    proveedores_total = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.orden_id == orden.id,
-        MovimientoCaja.tipo == "egreso",
-        MovimientoCaja.concepto == f"Provision proveedores orden {orden.id}"
-    ).scalar() or 0.0
-
-    mecanicos_total = db.query(func.sum(MovimientoCaja.monto)).filter(
-        MovimientoCaja.orden_id == orden.id,
-        MovimientoCaja.tipo == "egreso",
-        MovimientoCaja.concepto == f"Provision tecnicos orden {orden.id}"
-    ).scalar() or 0.0
-
-    if ingreso_total > 0:
-        reverso_existente = db.query(MovimientoCaja).filter(
-            MovimientoCaja.orden_id == orden.id,
-            MovimientoCaja.tipo == "egreso",
-            MovimientoCaja.concepto == f"Reversion ingreso orden {orden.id}"
-        ).first()
-        if not reverso_existente:
-            db.add(MovimientoCaja(
-                caja_id=caja.id,
-                tipo="egreso",
-                concepto=f"Reversion ingreso orden {orden.id}",
-                monto=ingreso_total,
-                motivo=motivo,
-                orden_id=orden.id,
-                usuario=usuario.get("sub")
-            ))
-
-    if proveedores_total > 0:
-        reverso_existente = db.query(MovimientoCaja).filter(
-            MovimientoCaja.orden_id == orden.id,
-            MovimientoCaja.tipo == "ingreso",
-            MovimientoCaja.concepto == f"Reversion provision proveedores orden {orden.id}"
-        ).first()
-        if not reverso_existente:
-            db.add(MovimientoCaja(
-                caja_id=caja.id,
-                tipo="ingreso",
-                concepto=f"Reversion provision proveedores orden {orden.id}",
-                monto=proveedores_total,
-                motivo=motivo,
-                orden_id=orden.id,
-                usuario=usuario.get("sub")
-            ))
-
-    if mecanicos_total > 0:
-        reverso_existente = db.query(MovimientoCaja).filter(
-            MovimientoCaja.orden_id == orden.id,
-            MovimientoCaja.tipo == "ingreso",
-            MovimientoCaja.concepto == f"Reversion provision tecnicos orden {orden.id}"
-        ).first()
-        if not reverso_existente:
-            db.add(MovimientoCaja(
-                caja_id=caja.id,
-                tipo="ingreso",
-                concepto=f"Reversion provision tecnicos orden {orden.id}",
-                monto=mecanicos_total,
+    # Neto por categoria: lo provisionado menos lo ya revertido. Solo se
+    # revierte el saldo pendiente, asi reabrir varias veces no duplica nada.
+    posicion = posicion_orden(db, orden.id)
+    reversiones = (
+        ("egreso", CategoriaMovimiento.INGRESO_ORDEN, CategoriaMovimiento.REVERSION_INGRESO,
+         f"Reversion ingreso orden {orden.id}"),
+        ("ingreso", CategoriaMovimiento.PROVISION_PROVEEDORES, CategoriaMovimiento.REVERSION_PROVEEDORES,
+         f"Reversion provision proveedores orden {orden.id}"),
+        ("ingreso", CategoriaMovimiento.PROVISION_TECNICOS, CategoriaMovimiento.REVERSION_TECNICOS,
+         f"Reversion provision tecnicos orden {orden.id}"),
+    )
+    for tipo, categoria, categoria_reversion, concepto in reversiones:
+        pendiente = posicion.get(categoria.value, 0.0) - posicion.get(categoria_reversion.value, 0.0)
+        if pendiente > 0.005:
+            registrar_movimiento_caja(
+                db,
+                caja,
+                tipo=tipo,
+                monto=pendiente,
+                categoria=categoria_reversion,
+                concepto=concepto,
                 motivo=motivo,
                 orden_id=orden.id,
                 usuario=usuario.get("sub")
-            ))
+            )
 
     db.query(OrdenMecanico).filter(
         OrdenMecanico.orden_id == orden.id
@@ -643,11 +421,7 @@ def reabrir_orden(
             LiquidacionMecanicoDetalle.orden_id == orden.id,
             LiquidacionMecanicoDetalle.liquidacion_id.in_([p[0] for p in pendientes])
         ).delete(synchronize_session=False)
-        for liquidacion_id, in pendientes:
-            _recalcular_liquidacion(db, liquidacion_id)
-
-    db.flush()
-    _actualizar_saldo_caja(db, caja)
+        recalcular_liquidaciones(db, [p[0] for p in pendientes])
 
     orden.estado = "en_proceso"
     orden.fecha_salida = None
@@ -684,5 +458,6 @@ def eliminar_orden(
 
     db.delete(orden)
     db.commit()
+    invalidar_documento(f"orden_{orden_id}")
 
     return {"mensaje": "Orden eliminada correctamente"}
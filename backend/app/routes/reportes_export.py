@@ -2,21 +2,22 @@
 # IMPORTS
 # ======================================================
 
+import csv
+import io
+import json
 import os
 from datetime import datetime, date, time
 
 from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from backend.app.core.templates import _base_app_dir
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from openpyxl import Workbook
+from starlette.background import BackgroundTask
 
-from backend.app.core.database import get_db
+from backend.app.core.database import SessionLocal, get_db
+from backend.app.core.render_pool import encolar_trabajo, estado_trabajo, renderizar, ruta_temporal
+from backend.app.models.cliente import Cliente
 from backend.app.models.orden_trabajo import OrdenTrabajo
+from backend.app.models.vehiculo import Vehiculo
 from backend.app.core.security import solo_admin
 
 # ======================================================
@@ -30,6 +31,17 @@ router = APIRouter(
 
 ESTADOS_FINALES = ["cerrada", "cancelada"]
 
+# Hasta este numero de filas el reporte se genera y se entrega en la misma
+# solicitud; por encima se devuelve un trabajo (202) para consultar despues.
+UMBRAL_SINCRONO = 200
+
+# Filas que se traen por lote del cursor en las exportaciones.
+LOTE_FILAS = 500
+BLOQUE_BYTES = 64 * 1024
+
+MEDIA_PDF = "application/pdf"
+MEDIA_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
 
 def _rango_datetime(fecha_inicio: date | None, fecha_fin: date | None):
     inicio = datetime.combine(fecha_inicio, time.min) if fecha_inicio else None
@@ -37,10 +49,6 @@ def _rango_datetime(fecha_inicio: date | None, fecha_fin: date | None):
     return inicio, fin
 
 
-def _formatear_moneda(valor):
-    return f"${(valor or 0):,.0f}".replace(",", ".")
-
-
 def _formatear_fecha(valor):
     if not valor:
         return "-"
@@ -48,6 +56,47 @@ def _formatear_fecha(valor):
         return valor.strftime("%Y-%m-%d %I:%M %p")
     return str(valor)
 
+
+def _ordenes_finalizadas(db: Session, fecha_inicio: date | None, fecha_fin: date | None):
+    inicio, fin = _rango_datetime(fecha_inicio, fecha_fin)
+    query = db.query(OrdenTrabajo).filter(OrdenTrabajo.estado.in_(ESTADOS_FINALES))
+    if inicio:
+        query = query.filter(OrdenTrabajo.fecha >= inicio)
+    if fin:
+        query = query.filter(OrdenTrabajo.fecha <= fin)
+    return query
+
+
+def _borrar(ruta: str):
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def _entregar_documento(tipo: str, datos, filas: int, nombre_archivo: str, media_type: str, asincrono: bool):
+    """
+    Camino rapido: reportes pequenos se renderizan en el pool y se entregan
+    de inmediato. Los grandes (o si se pide asincrono) quedan como trabajo.
+    """
+    if asincrono or filas > UMBRAL_SINCRONO:
+        trabajo = encolar_trabajo(tipo, datos, nombre_archivo, media_type)
+        return JSONResponse(status_code=202, content=estado_trabajo(trabajo))
+
+    ruta = ruta_temporal(os.path.splitext(nombre_archivo)[1])
+    try:
+        renderizar(tipo, ruta, datos)
+    except Exception:
+        _borrar(ruta)
+        raise
+    return FileResponse(
+        path=ruta,
+        filename=nombre_archivo,
+        media_type=media_type,
+        background=BackgroundTask(os.remove, ruta)
+    )
+
+
 # ======================================================
 # REPORTE PDF - ORDENES FINALIZADAS
 # ======================================================
@@ -56,35 +105,10 @@ def _formatear_fecha(valor):
 def reporte_ordenes_pdf(
     fecha_inicio: date | None = None,
     fecha_fin: date | None = None,
+    asincrono: bool = False,
     db: Session = Depends(get_db),
     usuario=Depends(solo_admin)
 ):
-    carpeta = os.path.join("backend", "app", "static", "pdfs", "reportes")
-    os.makedirs(carpeta, exist_ok=True)
-    archivo = os.path.join(carpeta, "ordenes_cerradas.pdf")
-
-    doc = SimpleDocTemplate(archivo, pagesize=letter, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
-    styles = getSampleStyleSheet()
-    story = []
-
-    logo_path = os.path.join(_base_app_dir(), "static", "img", "logo_medinautos.png")
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=90, height=60)
-    else:
-        logo = Paragraph("MEDINAUTOS", styles["Heading2"])
-
-    header = Table([
-        [logo, Paragraph("<b>MEDINAUTOS</b><br/>Telefono: 3166191371", styles["Normal"])],
-        [Paragraph("<b>Reporte de ordenes finalizadas</b>", styles["Heading3"]), ""],
-    ], colWidths=[120, 420])
-    header.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(header)
-    story.append(Spacer(1, 10))
-
     rango = "Todos los registros"
     if fecha_inicio and fecha_fin:
         rango = f"{fecha_inicio} a {fecha_fin}"
@@ -93,118 +117,151 @@ def reporte_ordenes_pdf(
     elif fecha_fin:
         rango = f"Hasta {fecha_fin}"
 
-    info = Table([
-        ["Rango:", rango],
-        ["Generado:", datetime.utcnow().strftime("%Y-%m-%d %I:%M %p")]
-    ], colWidths=[90, 450])
-    info.setStyle(TableStyle([
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-        ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
-    ]))
-    story.append(info)
-    story.append(Spacer(1, 12))
-
-    inicio, fin = _rango_datetime(fecha_inicio, fecha_fin)
-    query = db.query(OrdenTrabajo).filter(OrdenTrabajo.estado.in_(ESTADOS_FINALES))
-    if inicio:
-        query = query.filter(OrdenTrabajo.fecha >= inicio)
-    if fin:
-        query = query.filter(OrdenTrabajo.fecha <= fin)
-    ordenes = query.order_by(OrdenTrabajo.fecha.desc()).all()
-
-    data = [["Orden", "Fecha", "Estado", "Cliente", "Vehiculo", "Total"]]
-    total_acumulado = 0.0
-    for orden in ordenes:
-        cliente = orden.cliente.nombre if orden.cliente else "-"
-        vehiculo = orden.vehiculo.placa if orden.vehiculo else "-"
-        total = orden.total or 0.0
-        total_acumulado += total
-        data.append([
-            f"#{orden.id}",
-            _formatear_fecha(orden.fecha),
-            (orden.estado or "-").capitalize(),
-            cliente,
-            vehiculo,
-            _formatear_moneda(total)
-        ])
-
-    if len(data) == 1:
-        data.append(["-", "-", "-", "-", "-", _formatear_moneda(0)])
-
-    tabla = Table(data, colWidths=[60, 130, 80, 160, 85, 90])
-    tabla.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("ALIGN", (5, 1), (5, -1), "RIGHT"),
-        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-    ]))
-    story.append(tabla)
-    story.append(Spacer(1, 12))
-
-    resumen = Table([
-        ["Total ordenes:", str(len(ordenes))],
-        ["Total generado:", _formatear_moneda(total_acumulado)]
-    ], colWidths=[140, 150])
-    resumen.setStyle(TableStyle([
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-        ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
-        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-    ]))
-    story.append(resumen)
-
-    doc.build(story)
-
-    return FileResponse(
-        path=archivo,
-        filename=os.path.basename(archivo),
-        media_type="application/pdf"
+    filas = _ordenes_finalizadas(db, fecha_inicio, fecha_fin).with_entities(
+        OrdenTrabajo.id,
+        OrdenTrabajo.fecha,
+        OrdenTrabajo.estado,
+        Cliente.nombre,
+        Vehiculo.placa,
+        OrdenTrabajo.total
+    ).outerjoin(
+        Cliente, Cliente.id == OrdenTrabajo.cliente_id
+    ).outerjoin(
+        Vehiculo, Vehiculo.id == OrdenTrabajo.vehiculo_id
+    ).order_by(OrdenTrabajo.fecha.desc()).yield_per(LOTE_FILAS)
+
+    datos = {
+        "rango": rango,
+        "generado": datetime.utcnow().strftime("%Y-%m-%d %I:%M %p"),
+        "filas": [
+            [orden_id, _formatear_fecha(fecha), estado, cliente, placa, total]
+            for orden_id, fecha, estado, cliente, placa, total in filas
+        ],
+    }
+
+    return _entregar_documento(
+        "reporte_ordenes", datos, len(datos["filas"]), "ordenes_cerradas.pdf", MEDIA_PDF, asincrono
     )
 
 # ======================================================
-# REPORTE EXCEL - INGRESOS
+# EXPORTACIONES DE INGRESOS
 # ======================================================
+# Las filas salen de un cursor por lotes con solo las columnas necesarias.
+# CSV y NDJSON se escriben a la respuesta a medida que llegan; el Excel se
+# arma en el pool de renderizado (camino rapido o trabajo 202, como el PDF).
+# En ningun caso la memoria depende del rango.
+
+def _filas_ingresos(fecha_inicio: date | None, fecha_fin: date | None):
+    # Sesion propia: el generador se consume despues de que FastAPI cierra
+    # la sesion de la solicitud.
+    db = SessionLocal()
+    try:
+        query = _ordenes_finalizadas(db, fecha_inicio, fecha_fin).with_entities(
+            OrdenTrabajo.id,
+            OrdenTrabajo.fecha,
+            OrdenTrabajo.estado,
+            OrdenTrabajo.total
+        ).order_by(OrdenTrabajo.fecha.asc(), OrdenTrabajo.id.asc())
+        for fila in query.yield_per(LOTE_FILAS):
+            yield fila
+    finally:
+        db.close()
+
+
+def _volcar_filas_xlsx(fecha_inicio: date | None, fecha_fin: date | None):
+    """
+    Escribe las filas del Excel a un archivo JSON lines para el pool de
+    renderizado. Devuelve (ruta, cantidad de filas).
+    """
+    ruta = os.path.abspath(ruta_temporal(".jsonl"))
+    cantidad = 0
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        for orden_id, fecha, estado, total in _filas_ingresos(fecha_inicio, fecha_fin):
+            archivo.write(json.dumps([orden_id, _formatear_fecha(fecha), estado, total]) + "\n")
+            cantidad += 1
+    return ruta, cantidad
+
+
+def _stream_csv(fecha_inicio: date | None, fecha_fin: date | None):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    # BOM para que Excel reconozca UTF-8 al abrir el CSV.
+    buffer.write("\ufeff")
+    escritor.writerow(["id_orden", "fecha", "estado", "total"])
+    for orden_id, fecha, estado, total in _filas_ingresos(fecha_inicio, fecha_fin):
+        escritor.writerow([orden_id, _formatear_fecha(fecha), estado, total])
+        if buffer.tell() >= BLOQUE_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _stream_ndjson(fecha_inicio: date | None, fecha_fin: date | None):
+    lineas = []
+    tamano = 0
+    for orden_id, fecha, estado, total in _filas_ingresos(fecha_inicio, fecha_fin):
+        linea = json.dumps({
+            "id_orden": orden_id,
+            "fecha": fecha.isoformat() if fecha else None,
+            "estado": estado,
+            "total": total,
+        }, ensure_ascii=False) + "\n"
+        lineas.append(linea)
+        tamano += len(linea)
+        if tamano >= BLOQUE_BYTES:
+            yield "".join(lineas)
+            lineas.clear()
+            tamano = 0
+    yield "".join(lineas)
+
+
+def _respuesta_stream(contenido, media_type: str, nombre_archivo: str):
+    return StreamingResponse(
+        contenido,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nombre_archivo}"'}
+    )
+
 
 @router.get("/ingresos/excel")
 def reporte_ingresos_excel(
     fecha_inicio: date | None = None,
     fecha_fin: date | None = None,
-    db: Session = Depends(get_db),
+    asincrono: bool = False,
     usuario=Depends(solo_admin)
 ):
-    carpeta = os.path.join("backend", "app", "static", "pdfs", "reportes")
-    os.makedirs(carpeta, exist_ok=True)
-    archivo = os.path.join(carpeta, "ingresos_medinautos.xlsx")
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Ingresos"
-
-    # Encabezados
-    ws.append(["ID Orden", "Fecha", "Estado", "Total"])
-
-    inicio, fin = _rango_datetime(fecha_inicio, fecha_fin)
-    query = db.query(OrdenTrabajo).filter(OrdenTrabajo.estado.in_(ESTADOS_FINALES))
-    if inicio:
-        query = query.filter(OrdenTrabajo.fecha >= inicio)
-    if fin:
-        query = query.filter(OrdenTrabajo.fecha <= fin)
-    ordenes = query.all()
-
-    for orden in ordenes:
-        ws.append([
-            orden.id,
-            _formatear_fecha(orden.fecha),
-            orden.estado,
-            orden.total
-        ])
+    # openpyxl usa CPU y retiene el GIL: el libro se arma en el pool, a
+    # partir de las filas volcadas a disco, no en el hilo de la solicitud.
+    ruta_filas, cantidad = _volcar_filas_xlsx(fecha_inicio, fecha_fin)
+    try:
+        return _entregar_documento(
+            "ingresos_excel", {"archivo_filas": ruta_filas}, cantidad,
+            "ingresos_medinautos.xlsx", MEDIA_XLSX, asincrono
+        )
+    except Exception:
+        # Si el pool no tomo el trabajo (429) nadie mas borra las filas.
+        _borrar(ruta_filas)
+        raise
+
+
+@router.get("/ingresos/csv")
+def reporte_ingresos_csv(
+    fecha_inicio: date | None = None,
+    fecha_fin: date | None = None,
+    usuario=Depends(solo_admin)
+):
+    return _respuesta_stream(
+        _stream_csv(fecha_inicio, fecha_fin), "text/csv; charset=utf-8", "ingresos_medinautos.csv"
+    )
 
-    wb.save(archivo)
 
-    return FileResponse(
-        path=archivo,
-        filename=os.path.basename(archivo),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+@router.get("/ingresos/ndjson")
+def reporte_ingresos_ndjson(
+    fecha_inicio: date | None = None,
+    fecha_fin: date | None = None,
+    usuario=Depends(solo_admin)
+):
+    return _respuesta_stream(
+        _stream_ndjson(fecha_inicio, fecha_fin), "application/x-ndjson", "ingresos_medinautos.ndjson"
     )
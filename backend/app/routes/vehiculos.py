@@ -33,12 +33,10 @@ from sqlalchemy.exc import IntegrityError
 # BASE DE DATOS Y MODELOS
 # ===============================
 from backend.app.core.database import get_db
-from datetime import date
+from backend.app.core.kilometraje import registrar_lectura
 
 from backend.app.models.vehiculo import Vehiculo
 from backend.app.models.cliente import Cliente
-from backend.app.models.recomendacion_regla import RecomendacionRegla
-from backend.app.models.vehiculo_recomendacion import VehiculoRecomendacion
 
 # ===============================
 # CONFIGURACIÓN DEL ROUTER
@@ -122,9 +120,9 @@ def crear_vehiculo(
         color=color,
         cilindraje=cilindraje,
         clase=clase,
-        km_actual=km_actual,
         cliente_id=cliente_id
     )
+    registrar_lectura(db, vehiculo, km_actual, "alta")
 
     db.add(vehiculo)
     db.add(vehiculo)
@@ -138,15 +136,7 @@ def crear_vehiculo(
             status_code=HTTP_303_SEE_OTHER
         )
 
-    reglas = db.query(RecomendacionRegla).filter(RecomendacionRegla.activo == True).all()
-    for regla in reglas:
-        db.add(VehiculoRecomendacion(
-            vehiculo_id=vehiculo.id,
-            regla_id=regla.id,
-            km_base=vehiculo.km_actual or 0,
-            fecha_base=date.today()
-        ))
-    db.commit()
+    # El seguimiento de novedades lo crea core/novedades al confirmar.
 
     return RedirectResponse(
         "/vehiculos?created=1",
@@ -239,8 +229,8 @@ def editar_vehiculo(
     vehiculo.color = color
     vehiculo.cilindraje = cilindraje
     vehiculo.clase = clase
-    if km_actual is not None:
-        vehiculo.km_actual = km_actual
+    if km_actual is not None and km_actual != vehiculo.km_actual:
+        registrar_lectura(db, vehiculo, km_actual, "edicion")
     vehiculo.cliente_id = cliente_id
 
     db.commit()
@@ -24,6 +24,8 @@ class CajaResponseSchema(BaseModel):
     fecha_cierre: Optional[datetime] = None
     saldo_inicial: float
     saldo_final: float
+    total_ingresos: Optional[float] = 0.0
+    total_egresos: Optional[float] = 0.0
     estado: str
     observaciones: Optional[str] = None
     usuario_apertura: Optional[str] = None
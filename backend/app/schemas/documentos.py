@@ -0,0 +1,18 @@
+"""
+Schemas para trabajos de renderizado de documentos
+"""
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+class TrabajoDocumentoResponse(BaseModel):
+    trabajo_id: str
+    tipo: str
+    estado: Literal["en_cola", "procesando", "listo", "error"]
+    posicion: int
+    error: Optional[str] = None
+    nombre_archivo: str
+    url_estado: str
+    url_descarga: str
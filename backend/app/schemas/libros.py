@@ -0,0 +1,10 @@
+"""
+Schemas comunes de los libros de movimientos paginados
+"""
+
+from pydantic import BaseModel
+
+
+class TotalesTipoSchema(BaseModel):
+    movimientos: int
+    total: float
@@ -0,0 +1,39 @@
+"""
+Schemas para operaciones en lote sobre las lineas de una orden
+"""
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from backend.app.schemas.orden_trabajo import OrdenWorkspaceTotales
+
+
+class OperacionLinea(BaseModel):
+    accion: Literal["agregar", "editar", "eliminar"]
+    tipo: Literal["servicio", "insumo"]
+    servicio_id: Optional[int] = None
+    item_id: Optional[int] = None
+    detalle_id: Optional[int] = None
+    cantidad: Optional[float] = None
+
+    @model_validator(mode="after")
+    def validar_referencias(self):
+        if self.accion == "agregar":
+            if self.tipo == "servicio" and self.servicio_id is None:
+                raise ValueError("servicio_id es obligatorio para agregar un servicio")
+            if self.tipo == "insumo" and self.item_id is None:
+                raise ValueError("item_id es obligatorio para agregar un insumo")
+        elif self.detalle_id is None:
+            raise ValueError("detalle_id es obligatorio para editar o eliminar")
+        return self
+
+
+class LineasLoteRequest(BaseModel):
+    operaciones: list[OperacionLinea] = Field(..., min_length=1, max_length=100)
+
+
+class LineasLoteResponse(BaseModel):
+    orden_id: int
+    aplicadas: int
+    totales: OrdenWorkspaceTotales
@@ -43,3 +43,29 @@ class LiquidacionMecanicoResponseSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class LiquidacionLoteCreateSchema(BaseModel):
+    fecha_inicio: date
+    fecha_fin: date
+    frecuencia: str = Field(..., max_length=20)
+    observaciones: Optional[str] = Field(None, max_length=255)
+    incluir_sin_ordenes: bool = False
+
+
+class LiquidacionLoteItemSchema(BaseModel):
+    liquidacion_id: int
+    mecanico_id: int
+    mecanico: str
+    ordenes: int
+    total_base: float
+    total_pagado: float
+
+
+class LiquidacionLoteResponseSchema(BaseModel):
+    fecha_inicio: date
+    fecha_fin: date
+    liquidaciones: list[LiquidacionLoteItemSchema]
+    omitidos: list[int]
+    total_base: float
+    total_pagado: float
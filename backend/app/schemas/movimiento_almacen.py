@@ -7,6 +7,8 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from backend.app.schemas.libros import TotalesTipoSchema
+
 
 class MovimientoAlmacenResponseSchema(BaseModel):
     """Schema de respuesta para movimientos."""
@@ -25,3 +27,18 @@ class MovimientoAlmacenResponseSchema(BaseModel):
         """Config de Pydantic para mapeo ORM."""
 
         from_attributes = True
+
+
+class TotalesMovimientosAlmacenSchema(BaseModel):
+    """Totales de la ventana; total es la suma de cantidades por tipo."""
+
+    movimientos: int
+    por_tipo: dict[str, TotalesTipoSchema]
+
+
+class MovimientoAlmacenPaginaSchema(BaseModel):
+    """Pagina de movimientos con el cursor de la siguiente."""
+
+    items: list[MovimientoAlmacenResponseSchema]
+    siguiente_cursor: Optional[str] = None
+    totales: TotalesMovimientosAlmacenSchema
@@ -7,6 +7,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from backend.app.schemas.libros import TotalesTipoSchema
+
 
 class MovimientoCajaCreateSchema(BaseModel):
     caja_id: Optional[int] = None
@@ -22,6 +24,7 @@ class MovimientoCajaResponseSchema(BaseModel):
     id: int
     caja_id: int
     tipo: str
+    categoria: Optional[str] = None
     concepto: str
     monto: float
     fecha: datetime
@@ -32,3 +35,17 @@ class MovimientoCajaResponseSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TotalesMovimientosCajaSchema(BaseModel):
+    movimientos: int
+    ingresos: float
+    egresos: float
+    neto: float
+    por_tipo: dict[str, TotalesTipoSchema]
+
+
+class MovimientoCajaPaginaSchema(BaseModel):
+    items: list[MovimientoCajaResponseSchema]
+    siguiente_cursor: Optional[str] = None
+    totales: TotalesMovimientosCajaSchema
@@ -7,6 +7,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from backend.app.schemas.libros import TotalesTipoSchema
+
 
 class MovimientoProveedorCreateSchema(BaseModel):
     proveedor_id: int
@@ -34,3 +36,25 @@ class MovimientoProveedorResponseSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ProveedorSaldoSchema(BaseModel):
+    proveedor_id: int
+    nombre: str
+    cargos: float
+    pagos: float
+    saldo: float
+
+
+class TotalesMovimientosProveedorSchema(BaseModel):
+    movimientos: int
+    cargos: float
+    pagos: float
+    saldo: float
+    por_tipo: dict[str, TotalesTipoSchema]
+
+
+class MovimientoProveedorPaginaSchema(BaseModel):
+    items: list[MovimientoProveedorResponseSchema]
+    siguiente_cursor: Optional[str] = None
+    totales: TotalesMovimientosProveedorSchema
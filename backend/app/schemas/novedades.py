@@ -0,0 +1,27 @@
+"""
+Schemas del modulo Novedades
+"""
+
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class AlertaPorVencerResponse(BaseModel):
+    vehiculo_id: int
+    placa: str
+    marca: str
+    linea: str
+    cliente: str
+    telefono: str
+    km_actual: Optional[int] = None
+    km_dia: Optional[float] = None
+    regla_id: int
+    regla_nombre: str
+    descripcion: Optional[str] = None
+    estado: str
+    progreso: int
+    km_restante: Optional[int] = None
+    dias_restante: Optional[int] = None
+    fecha_proyectada: date
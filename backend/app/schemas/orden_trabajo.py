@@ -2,12 +2,15 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
+from backend.app.schemas.mecanico import MecanicoAsignacionResponseSchema
+
 
 class OrdenTrabajoBase(BaseModel):
     descripcion: str
     estado: Optional[str] = "abierta"
     total: Optional[float] = 0.0
     forma_pago: Optional[str] = None
+    km_ingreso: Optional[int] = None
     cliente_id: int
     vehiculo_id: int
 
@@ -33,3 +36,62 @@ class OrdenTrabajoResponse(OrdenTrabajoBase):
 
     class Config:
         from_attributes = True
+
+
+class OrdenClienteResumen(BaseModel):
+    id: int
+    nombre: str
+
+    class Config:
+        from_attributes = True
+
+
+class OrdenVehiculoResumen(BaseModel):
+    id: int
+    placa: str
+
+    class Config:
+        from_attributes = True
+
+
+class OrdenTrabajoListado(OrdenTrabajoResponse):
+    cliente: Optional[OrdenClienteResumen] = None
+    vehiculo: Optional[OrdenVehiculoResumen] = None
+
+
+class OrdenTrabajoPagina(BaseModel):
+    items: list[OrdenTrabajoListado]
+    siguiente_cursor: Optional[str] = None
+
+
+class OrdenWorkspaceServicio(BaseModel):
+    id: int
+    servicio_id: int
+    servicio_nombre: Optional[str] = None
+    cantidad: int
+    precio_unitario: float
+    subtotal: float
+
+
+class OrdenWorkspaceInsumo(BaseModel):
+    id: int
+    item_id: int
+    item_nombre: Optional[str] = None
+    unidad: Optional[str] = None
+    cantidad: float
+    precio_unitario: float
+    subtotal: float
+
+
+class OrdenWorkspaceTotales(BaseModel):
+    servicios: float
+    insumos: float
+    total: float
+
+
+class OrdenWorkspaceResponse(BaseModel):
+    orden: OrdenTrabajoListado
+    servicios: list[OrdenWorkspaceServicio]
+    insumos: list[OrdenWorkspaceInsumo]
+    mecanicos: list[MecanicoAsignacionResponseSchema]
+    totales: OrdenWorkspaceTotales
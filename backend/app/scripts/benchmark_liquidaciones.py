@@ -0,0 +1,267 @@
+"""
+Benchmark de la liquidacion de nomina de tecnicos (core/liquidaciones).
+
+Sobre una base temporal con los datos de prueba y ordenes cerradas
+sinteticas, liquida el mismo periodo de tres formas y compara:
+- por orden (N+1): el calculo anterior, una suma de servicios por orden;
+- por tecnico: una llamada a crear_liquidacion_mecanico por tecnico, como
+  hacia la recepcion en cada cierre de quincena;
+- lote: una sola llamada a liquidar_todos_los_mecanicos.
+
+Cada forma hace commit; entre repeticiones se borran las liquidaciones
+creadas. Antes de comparar verifica que las tres den los mismos totales.
+
+Uso:
+    python -m backend.app.scripts.benchmark_liquidaciones [tecnicos] [ordenes_por_tecnico]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+
+REPETICIONES = 3
+LINEAS_POR_ORDEN = 3
+
+
+def _sembrar(tecnicos, ordenes_por_tecnico, fecha_inicio):
+    """Tecnicos nuevos con sus ordenes cerradas dentro del periodo."""
+    from backend.app.core.database import SessionLocal
+    from backend.app.models.detalle_orden import DetalleOrden
+    from backend.app.models.mecanico import Mecanico
+    from backend.app.models.orden_mecanico import OrdenMecanico
+    from backend.app.models.orden_trabajo import OrdenTrabajo
+    from backend.app.models.servicio import Servicio
+    from backend.app.models.vehiculo import Vehiculo
+
+    azar = random.Random(11)
+    db = SessionLocal()
+    try:
+        vehiculo = db.query(Vehiculo).first()
+        servicios = [s.id for s in db.query(Servicio.id).limit(5)]
+
+        mecanicos = [
+            Mecanico(
+                nombres=f"Tecnico {numero}",
+                apellidos="Benchmark",
+                documento=f"BENCH-{numero}",
+                porcentaje_base=azar.choice([30.0, 35.0, 40.0])
+            )
+            for numero in range(tecnicos)
+        ]
+        db.add_all(mecanicos)
+        db.flush()
+
+        for mecanico in mecanicos:
+            ordenes = [
+                OrdenTrabajo(
+                    descripcion="Benchmark de nomina",
+                    estado="cerrada",
+                    fecha=datetime.combine(fecha_inicio, datetime.min.time())
+                    + timedelta(days=azar.randint(0, 12), hours=azar.randint(7, 18)),
+                    cliente_id=vehiculo.cliente_id,
+                    vehiculo_id=vehiculo.id
+                )
+                for _ in range(ordenes_por_tecnico)
+            ]
+            db.add_all(ordenes)
+            db.flush()
+            for orden in ordenes:
+                db.add(OrdenMecanico(
+                    orden_id=orden.id,
+                    mecanico_id=mecanico.id,
+                    porcentaje=azar.choice([0.0, 0.0, 25.0, 50.0])
+                ))
+                for _ in range(LINEAS_POR_ORDEN):
+                    precio = float(azar.randint(20, 300) * 1000)
+                    db.add(DetalleOrden(
+                        orden_id=orden.id,
+                        servicio_id=azar.choice(servicios),
+                        cantidad=1,
+                        precio_unitario=precio,
+                        subtotal=precio
+                    ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _por_orden(db, mecanico, fecha_inicio, fecha_fin):
+    """El calculo anterior: una consulta de suma por cada orden asignada."""
+    from sqlalchemy import func
+
+    from backend.app.models.detalle_orden import DetalleOrden
+    from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
+    from backend.app.models.liquidacion_mecanico_detalle import LiquidacionMecanicoDetalle
+    from backend.app.models.orden_mecanico import OrdenMecanico
+    from backend.app.models.orden_trabajo import OrdenTrabajo
+
+    asignaciones = db.query(OrdenMecanico, OrdenTrabajo).join(
+        OrdenTrabajo, OrdenTrabajo.id == OrdenMecanico.orden_id
+    ).filter(
+        OrdenMecanico.mecanico_id == mecanico.id,
+        OrdenTrabajo.estado == "cerrada",
+        OrdenTrabajo.fecha >= fecha_inicio,
+        OrdenTrabajo.fecha <= fecha_fin
+    ).all()
+
+    liquidacion = LiquidacionMecanico(
+        mecanico_id=mecanico.id,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        frecuencia="quincenal"
+    )
+    db.add(liquidacion)
+    db.flush()
+
+    total_base = 0.0
+    total_pagado = 0.0
+    for asignacion, orden in asignaciones:
+        porcentaje = asignacion.porcentaje if asignacion.porcentaje > 0 else mecanico.porcentaje_base
+        base = db.query(func.sum(DetalleOrden.subtotal)).filter(
+            DetalleOrden.orden_id == orden.id
+        ).scalar() or 0.0
+        monto = base * (porcentaje / 100.0)
+        db.add(LiquidacionMecanicoDetalle(
+            liquidacion_id=liquidacion.id,
+            orden_id=orden.id,
+            porcentaje=porcentaje,
+            base_calculo=base,
+            monto=monto
+        ))
+        total_base += base
+        total_pagado += monto
+
+    liquidacion.total_base = total_base
+    liquidacion.total_pagado = total_pagado
+    db.commit()
+
+
+def _totales_y_limpiar(fecha_inicio, fecha_fin):
+    """Devuelve {mecanico_id: (base, pagado, detalles)} y borra el periodo."""
+    from sqlalchemy import func
+
+    from backend.app.core.database import SessionLocal
+    from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
+    from backend.app.models.liquidacion_mecanico_detalle import LiquidacionMecanicoDetalle
+
+    db = SessionLocal()
+    try:
+        periodo = db.query(LiquidacionMecanico.id).filter(
+            LiquidacionMecanico.fecha_inicio == fecha_inicio,
+            LiquidacionMecanico.fecha_fin == fecha_fin
+        )
+        totales = {
+            fila.mecanico_id: (round(fila.base, 2), round(fila.pagado, 2), fila.detalles)
+            for fila in db.query(
+                LiquidacionMecanico.mecanico_id,
+                func.sum(LiquidacionMecanicoDetalle.base_calculo).label("base"),
+                func.sum(LiquidacionMecanicoDetalle.monto).label("pagado"),
+                func.count(LiquidacionMecanicoDetalle.id).label("detalles")
+            ).join(
+                LiquidacionMecanicoDetalle,
+                LiquidacionMecanicoDetalle.liquidacion_id == LiquidacionMecanico.id
+            ).filter(
+                LiquidacionMecanico.id.in_(periodo)
+            ).group_by(LiquidacionMecanico.mecanico_id)
+        }
+        db.query(LiquidacionMecanicoDetalle).filter(
+            LiquidacionMecanicoDetalle.liquidacion_id.in_(periodo)
+        ).delete(synchronize_session=False)
+        db.query(LiquidacionMecanico).filter(
+            LiquidacionMecanico.fecha_inicio == fecha_inicio,
+            LiquidacionMecanico.fecha_fin == fecha_fin
+        ).delete(synchronize_session=False)
+        db.commit()
+        return totales
+    finally:
+        db.close()
+
+
+def _medir(funcion, fecha_inicio, fecha_fin):
+    from backend.app.core.database import SessionLocal
+
+    tiempos = []
+    totales = None
+    for _ in range(REPETICIONES):
+        db = SessionLocal()
+        try:
+            inicio = time.perf_counter()
+            funcion(db)
+            tiempos.append(time.perf_counter() - inicio)
+        finally:
+            db.close()
+        totales = _totales_y_limpiar(fecha_inicio, fecha_fin)
+    return min(tiempos), totales
+
+
+def main(tecnicos=20, ordenes_por_tecnico=200):
+    from backend.app.core.database import SessionLocal
+    from backend.app.models.mecanico import Mecanico
+    from backend.app.routes.contabilidad import crear_liquidacion_mecanico, liquidar_todos_los_mecanicos
+    from backend.app.schemas.liquidacion_mecanico import (
+        LiquidacionLoteCreateSchema,
+        LiquidacionMecanicoCreateSchema,
+    )
+    from backend.app.scripts.seed_demo import seed
+
+    seed()
+    # Un periodo ya pasado para no mezclarse con las ordenes sembradas.
+    fecha_inicio = date.today().replace(day=1) - timedelta(days=400)
+    fecha_fin = fecha_inicio + timedelta(days=14)
+    _sembrar(tecnicos, ordenes_por_tecnico, fecha_inicio)
+
+    db = SessionLocal()
+    try:
+        mecanicos = db.query(Mecanico).filter(Mecanico.activo == True).order_by(Mecanico.id).all()
+        db.expunge_all()
+    finally:
+        db.close()
+    usuario = {"sub": "benchmark", "rol": "admin"}
+
+    def por_orden(db):
+        for mecanico in mecanicos:
+            _por_orden(db, mecanico, fecha_inicio, fecha_fin)
+
+    def por_tecnico(db):
+        for mecanico in mecanicos:
+            datos = LiquidacionMecanicoCreateSchema(
+                mecanico_id=mecanico.id,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                frecuencia="quincenal"
+            )
+            crear_liquidacion_mecanico(datos, db, usuario)
+
+    def lote(db):
+        datos = LiquidacionLoteCreateSchema(
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            frecuencia="quincenal"
+        )
+        liquidar_todos_los_mecanicos(datos, db, usuario)
+
+    print(f"{len(mecanicos)} tecnicos activos, {tecnicos * ordenes_por_tecnico} ordenes cerradas en el periodo\n")
+    print(f"{'modo':<20}{'segundos':>10}{'mejora':>9}")
+    base, esperado = _medir(por_orden, fecha_inicio, fecha_fin)
+    print(f"{'por orden (N+1)':<20}{base:>10.3f}{1:>8.1f}x")
+    for nombre, funcion in (("por tecnico", por_tecnico), ("lote", lote)):
+        segundos, totales = _medir(funcion, fecha_inicio, fecha_fin)
+        if totales != esperado:
+            raise SystemExit(f"{nombre}: los totales no coinciden con el calculo por orden")
+        print(f"{nombre:<20}{segundos:>10.3f}{base / segundos:>8.1f}x")
+
+
+if __name__ == "__main__":
+    argumentos = [int(valor) for valor in sys.argv[1:3]]
+    # La base es relativa al directorio actual: se usa uno temporal.
+    with tempfile.TemporaryDirectory() as directorio:
+        anterior = os.getcwd()
+        os.chdir(directorio)
+        try:
+            main(*argumentos)
+        finally:
+            os.chdir(anterior)
@@ -0,0 +1,102 @@
+"""
+Benchmark del evaluador de reglas de mantenimiento (core/novedades).
+
+Compara, para una flota sintetica, el calculo par por par con
+calcular_estado_regla contra evaluar_lote. Antes de medir verifica que ambos
+den lo mismo.
+
+Uso:
+    python -m backend.app.scripts.benchmark_novedades [vehiculos] [reglas]
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from backend.app.core.novedades import CAMPOS_ESTADO, calcular_estado_regla, evaluar_lote
+
+
+def _flota(vehiculos, reglas, hoy):
+    azar = random.Random(7)
+    flota = [
+        SimpleNamespace(km_actual=None if azar.random() < 0.05 else azar.randint(0, 300000))
+        for _ in range(vehiculos)
+    ]
+    catalogo = [
+        SimpleNamespace(
+            intervalo_km=azar.choice([None, 5000, 10000, 20000, 40000]),
+            intervalo_dias=azar.choice([None, 90, 180, 365, 730]),
+            tolerancia_km=azar.choice([0, 200, 500]),
+            tolerancia_dias=azar.choice([0, 3, 7]),
+        )
+        for _ in range(reglas)
+    ]
+    for regla in catalogo:
+        if not regla.intervalo_km and not regla.intervalo_dias:
+            regla.intervalo_km = 10000
+
+    pares = []
+    for vehiculo in flota:
+        for regla in catalogo:
+            km = vehiculo.km_actual or 0
+            rec = SimpleNamespace(
+                km_base=None if azar.random() < 0.02 else max(km - azar.randint(0, 45000), 0),
+                fecha_base=hoy - timedelta(days=azar.randint(-5, 800)),
+            )
+            pares.append((vehiculo, regla, rec))
+    return pares
+
+
+def _columnas(pares):
+    return (
+        [vehiculo.km_actual for vehiculo, _, _ in pares],
+        [rec.km_base for _, _, rec in pares],
+        [rec.fecha_base for _, _, rec in pares],
+        [regla.intervalo_km for _, regla, _ in pares],
+        [regla.intervalo_dias for _, regla, _ in pares],
+        [regla.tolerancia_km for _, regla, _ in pares],
+        [regla.tolerancia_dias for _, regla, _ in pares],
+    )
+
+
+def _medir(funcion, repeticiones):
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def _verificar(nombre, esperado, lote):
+    for campo in CAMPOS_ESTADO:
+        diferencias = sum(1 for a, b in zip(esperado[campo], lote[campo]) if a != b)
+        if diferencias:
+            raise SystemExit(f"{nombre}: {diferencias} diferencias en '{campo}'")
+
+
+def main(vehiculos=10000, reglas=30, repeticiones=3):
+    hoy = date.today()
+    pares = _flota(vehiculos, reglas, hoy)
+    columnas = _columnas(pares)
+    print(f"{vehiculos} vehiculos x {reglas} reglas = {len(pares)} pares\n")
+
+    def por_par():
+        estados = [calcular_estado_regla(v, r, rec, hoy) for v, r, rec in pares]
+        return {campo: [estado[campo] for estado in estados] for campo in CAMPOS_ESTADO}
+
+    base, esperado = _medir(por_par, repeticiones)
+    print(f"{'modo':<24}{'segundos':>10}{'pares/s':>12}{'mejora':>9}")
+    print(f"{'por par (objetos)':<24}{base:>10.2f}{len(pares) / base:>12,.0f}{1:>8.1f}x")
+
+    segundos, lote = _medir(lambda: evaluar_lote(*columnas, hoy=hoy), repeticiones)
+    _verificar("lote", esperado, lote)
+    print(f"{'lote (columnas)':<24}{segundos:>10.2f}{len(pares) / segundos:>12,.0f}{base / segundos:>8.1f}x")
+
+
+if __name__ == "__main__":
+    argumentos = [int(valor) for valor in sys.argv[1:3]]
+    main(*argumentos)
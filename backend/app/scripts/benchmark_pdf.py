@@ -0,0 +1,141 @@
+"""
+Micro-benchmark del motor de PDFs (core/pdf).
+
+Mide el tiempo por documento de cada plantilla en dos modos:
+- antes: como se generaban antes del motor compartido (logo leido del disco
+  a resolucion original, hoja de estilos nueva y codificacion ASCII85).
+- ahora: recursos precalculados una vez por proceso.
+
+Uso:
+    python -m backend.app.scripts.benchmark_pdf [repeticiones]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from unittest import mock
+
+from reportlab import rl_config
+from reportlab.platypus import Image
+
+from backend.app.core import documentos, pdf
+from backend.app.core.templates import _base_app_dir
+
+
+def _datos_orden():
+    return {
+        "orden": {
+            "id": 1024,
+            "fecha": datetime(2024, 5, 2, 9, 30),
+            "fecha_salida": datetime(2024, 5, 3, 17, 0),
+            "forma_pago": "efectivo",
+            "total": 845000,
+            "descripcion": "Cambio de aceite y revision general.\nCliente reporta ruido en frenos.",
+        },
+        "cliente": {"nombre": "Cliente Demo", "documento": "1234567", "telefono": "3000000000", "email": None},
+        "vehiculo": {
+            "placa": "ABC123", "marca": "Renault", "modelo": "Logan", "anio": 2018,
+            "cilindraje": "1600", "clase": "Automovil", "km_actual": 85200, "color": "Gris",
+        },
+        "servicios": [
+            {"nombre": f"Servicio {i}", "cantidad": 1, "precio": 50000, "subtotal": 50000}
+            for i in range(8)
+        ],
+        "insumos": [
+            {"nombre": f"Insumo {i}", "cantidad": 2, "precio": 22500, "subtotal": 45000}
+            for i in range(10)
+        ],
+    }
+
+
+def _datos_nomina():
+    return {
+        "liquidacion": {
+            "id": 77,
+            "fecha_creacion": datetime(2024, 5, 31, 18, 0),
+            "fecha_inicio": date(2024, 5, 16),
+            "fecha_fin": date(2024, 5, 31),
+            "frecuencia": "quincenal",
+            "estado": "pagada",
+            "total_base": 3200000,
+            "total_pagado": 960000,
+        },
+        "mecanico": {"nombres": "Tecnico", "apellidos": "Demo", "documento": "998877"},
+        "detalles": [[1000 + i, 30, 200000, 60000] for i in range(16)],
+        "metodo_pago": "transferencia",
+    }
+
+
+def _datos_reporte(filas=300):
+    return {
+        "rango": "2024-01-01 a 2024-06-30",
+        "generado": "2024-07-01 08:00 AM",
+        "filas": [
+            [i, "2024-03-15 10:00 AM", "cerrada", f"Cliente {i}", f"PLC{i:03d}", 150000 + i]
+            for i in range(filas)
+        ],
+    }
+
+
+def _logo_desde_disco():
+    ruta = os.path.join(_base_app_dir(), "static", "img", "logo_medinautos.png")
+    return Image(ruta, width=pdf.LOGO_ANCHO, height=pdf.LOGO_ALTO)
+
+
+def _medir(renderizar, datos, repeticiones, antes):
+    carpeta = tempfile.mkdtemp(prefix="benchmark_pdf_")
+    ruta = os.path.join(carpeta, "documento.pdf")
+    renderizar(ruta, datos)  # calentamiento
+
+    tiempos = []
+    for _ in range(repeticiones):
+        if antes:
+            pdf.estilos.cache_clear()
+        inicio = time.perf_counter()
+        renderizar(ruta, datos)
+        tiempos.append(time.perf_counter() - inicio)
+    tamano = os.path.getsize(ruta)
+    os.remove(ruta)
+    os.rmdir(carpeta)
+
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2] * 1000, tamano
+
+
+def _modo_antes():
+    return [
+        mock.patch.object(rl_config, "useA85", 1),
+        mock.patch.object(pdf, "logo", _logo_desde_disco),
+    ]
+
+
+def main(repeticiones=20):
+    casos = [
+        ("orden", pdf.documento_orden, _datos_orden()),
+        ("nomina", pdf.recibo_nomina, _datos_nomina()),
+        ("reporte (300 filas)", documentos.renderizar_reporte_ordenes, _datos_reporte()),
+    ]
+
+    print(f"Mediana de {repeticiones} documentos por plantilla\n")
+    print(f"{'plantilla':<22}{'antes ms':>10}{'ahora ms':>10}{'mejora':>9}{'KB antes':>10}{'KB ahora':>10}")
+    for nombre, renderizar, datos in casos:
+        parches = _modo_antes()
+        for parche in parches:
+            parche.start()
+        try:
+            antes, tamano_antes = _medir(renderizar, datos, repeticiones, antes=True)
+        finally:
+            for parche in parches:
+                parche.stop()
+
+        ahora, tamano_ahora = _medir(renderizar, datos, repeticiones, antes=False)
+        print(
+            f"{nombre:<22}{antes:>10.1f}{ahora:>10.1f}{antes / ahora:>8.1f}x"
+            f"{tamano_antes / 1024:>10.0f}{tamano_ahora / 1024:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,196 @@
+"""
+Prueba de estres de escrituras concurrentes (core/escritor).
+
+Simula tecnicos agregando insumos y servicios a ordenes abiertas mientras la
+caja cierra otras ordenes, todos a la vez, llamando a las mismas funciones de
+las rutas. Corre la misma carga en modo directo (cada ruta con su
+transaccion) y con el escritor unico, sobre una base temporal con los datos
+de prueba, y compara:
+- escrituras por segundo;
+- latencia p50, p99 y maxima;
+- errores ("database is locked", tiempo agotado, otros);
+- stock descontado de menos (actualizaciones perdidas).
+
+Uso:
+    python -m backend.app.scripts.estres_escrituras [tecnicos] [operaciones]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+ORDENES_POR_TECNICO = 4
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    indice = min(int(round(p / 100 * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def _preparar(tecnicos, operaciones):
+    """Crea ordenes abiertas para los tecnicos y para la caja."""
+    from backend.app.core.database import SessionLocal
+    from backend.app.models.almacen_item import AlmacenItem
+    from backend.app.models.orden_trabajo import OrdenTrabajo
+    from backend.app.models.servicio import Servicio
+    from backend.app.models.vehiculo import Vehiculo
+
+    db = SessionLocal()
+    try:
+        vehiculo = db.query(Vehiculo).first()
+        items = db.query(AlmacenItem).limit(3).all()
+        for item in items:
+            item.stock_actual = 1_000_000.0
+        servicios = [s.id for s in db.query(Servicio.id).limit(3)]
+
+        def nuevas(cantidad):
+            ordenes = [
+                OrdenTrabajo(
+                    descripcion="Estres de escrituras",
+                    estado="abierta",
+                    cliente_id=vehiculo.cliente_id,
+                    vehiculo_id=vehiculo.id
+                )
+                for _ in range(cantidad)
+            ]
+            db.add_all(ordenes)
+            db.flush()
+            return [orden.id for orden in ordenes]
+
+        trabajo = nuevas(tecnicos * ORDENES_POR_TECNICO)
+        por_cerrar = nuevas(operaciones)
+        db.commit()
+        return trabajo, por_cerrar, [item.id for item in items], servicios
+    finally:
+        db.close()
+
+
+def _stock(item_ids):
+    from backend.app.core.database import SessionLocal
+    from backend.app.models.almacen_item import AlmacenItem
+
+    db = SessionLocal()
+    try:
+        return {
+            item.id: item.stock_actual
+            for item in db.query(AlmacenItem).filter(AlmacenItem.id.in_(item_ids))
+        }
+    finally:
+        db.close()
+
+
+def _correr(nombre, tecnicos, operaciones):
+    from fastapi import HTTPException
+
+    from backend.app.core.database import SessionLocal
+    from backend.app.routes.detalle_almacen import agregar_insumo_a_orden
+    from backend.app.routes.detalle_orden import agregar_servicio_a_orden
+    from backend.app.routes.ordenes_trabajo import cambiar_estado
+    from backend.app.schemas.detalle_almacen import DetalleAlmacenCreate
+    from backend.app.schemas.detalle_orden import DetalleOrdenCreate
+
+    trabajo, por_cerrar, item_ids, servicios = _preparar(tecnicos, operaciones)
+    stock_inicial = _stock(item_ids)
+    descontado = Counter()
+    latencias = []
+    errores = Counter()
+    bloqueo = threading.Lock()
+    usuario = {"sub": "estres", "rol": "admin"}
+
+    def medir(operacion):
+        db = SessionLocal()
+        inicio = time.perf_counter()
+        try:
+            operacion(db)
+            error = None
+        except HTTPException as exc:
+            error = f"HTTP {exc.status_code}"
+        except Exception as exc:
+            error = "database is locked" if "locked" in str(exc) else type(exc).__name__
+        finally:
+            db.close()
+        with bloqueo:
+            latencias.append(time.perf_counter() - inicio)
+            if error:
+                errores[error] += 1
+        return error is None
+
+    def tecnico(numero):
+        azar = random.Random(numero)
+        ordenes = trabajo[numero * ORDENES_POR_TECNICO:(numero + 1) * ORDENES_POR_TECNICO]
+        for _ in range(operaciones):
+            orden_id = azar.choice(ordenes)
+            if azar.random() < 0.7:
+                item_id = azar.choice(item_ids)
+                datos = DetalleAlmacenCreate(orden_id=orden_id, item_id=item_id, cantidad=1)
+                if medir(lambda db: agregar_insumo_a_orden(datos, db, usuario)):
+                    with bloqueo:
+                        descontado[item_id] += 1
+            else:
+                datos = DetalleOrdenCreate(orden_id=orden_id, servicio_id=azar.choice(servicios), cantidad=1)
+                medir(lambda db: agregar_servicio_a_orden(datos, db))
+
+    def caja():
+        for orden_id in por_cerrar:
+            medir(lambda db: cambiar_estado(orden_id, "cerrada", db, usuario))
+
+    hilos = [threading.Thread(target=tecnico, args=(n,)) for n in range(tecnicos)]
+    hilos.append(threading.Thread(target=caja))
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    stock_final = _stock(item_ids)
+    perdidas = sum(
+        stock_final[item_id] - (stock_inicial[item_id] - descontado[item_id])
+        for item_id in item_ids
+    )
+    exitosas = len(latencias) - sum(errores.values())
+    print(
+        f"{nombre:<16}{exitosas / segundos:>10,.0f}"
+        f"{_percentil(latencias, 50) * 1000:>9.1f}"
+        f"{_percentil(latencias, 99) * 1000:>9.1f}"
+        f"{max(latencias) * 1000:>9.1f}"
+        f"{sum(errores.values()):>8}{perdidas:>10.0f}"
+    )
+    for error, cantidad in errores.most_common():
+        print(f"{'':<16}  {cantidad} x {error}")
+
+
+def main(tecnicos=8, operaciones=150):
+    from backend.app.core import escritor
+    from backend.app.scripts.seed_demo import seed
+
+    seed()
+    print(f"{tecnicos} tecnicos x {operaciones} operaciones + caja cerrando {operaciones} ordenes\n")
+    print(f"{'modo':<16}{'escr/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errores':>8}{'stock +':>10}")
+
+    _correr("directo", tecnicos, operaciones)
+    escritor.iniciar_escritor()
+    try:
+        _correr("escritor unico", tecnicos, operaciones)
+    finally:
+        escritor.detener_escritor()
+
+
+if __name__ == "__main__":
+    argumentos = [int(valor) for valor in sys.argv[1:3]]
+    # La base es relativa al directorio actual: se usa uno temporal.
+    with tempfile.TemporaryDirectory() as directorio:
+        anterior = os.getcwd()
+        os.chdir(directorio)
+        try:
+            main(*argumentos)
+        finally:
+            os.chdir(anterior)
@@ -0,0 +1,199 @@
+"""
+Prueba de estres del descuento de stock (core/almacen).
+
+Varios tecnicos sacan a la vez, de a una unidad, el mismo insumo con stock
+limitado; entre todos piden mas unidades de las que hay. Corre la carga con:
+- leer y restar: el flujo anterior (se lee stock_actual, se compara en
+  Python y se escribe el valor restado);
+- UPDATE condicional: la ruta actual (agregar_insumo_a_orden);
+- UPDATE condicional con el escritor unico (core/escritor).
+
+Para cada modo muestra escrituras por segundo, latencia, cuantas unidades
+se entregaron (lineas en ordenes) frente al stock inicial y el stock final.
+Sobreventa = unidades entregadas de mas; debe ser 0.
+
+Uso:
+    python -m backend.app.scripts.estres_stock [tecnicos] [intentos] [stock]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    indice = min(int(round(p / 100 * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def _preparar(tecnicos, stock):
+    """Un insumo nuevo con el stock dado y una orden abierta por tecnico."""
+    from backend.app.core.database import SessionLocal
+    from backend.app.models.almacen_item import AlmacenItem
+    from backend.app.models.orden_trabajo import OrdenTrabajo
+    from backend.app.models.vehiculo import Vehiculo
+
+    db = SessionLocal()
+    try:
+        vehiculo = db.query(Vehiculo).first()
+        base = db.query(AlmacenItem).filter(AlmacenItem.proveedor_id.isnot(None)).first()
+        item = AlmacenItem(
+            nombre=f"Estres de stock {time.perf_counter_ns()}",
+            proveedor_id=base.proveedor_id,
+            valor_proveedor=base.valor_proveedor,
+            valor_taller=base.valor_taller,
+            stock_actual=float(stock),
+            stock_minimo=0.0
+        )
+        ordenes = [
+            OrdenTrabajo(
+                descripcion="Estres de stock",
+                estado="abierta",
+                cliente_id=vehiculo.cliente_id,
+                vehiculo_id=vehiculo.id
+            )
+            for _ in range(tecnicos)
+        ]
+        db.add(item)
+        db.add_all(ordenes)
+        db.commit()
+        return item.id, [orden.id for orden in ordenes]
+    finally:
+        db.close()
+
+
+def _resultado(item_id):
+    from sqlalchemy import func
+
+    from backend.app.core.database import SessionLocal
+    from backend.app.models.almacen_item import AlmacenItem
+    from backend.app.models.detalle_almacen import DetalleAlmacen
+
+    db = SessionLocal()
+    try:
+        entregadas = db.query(func.coalesce(func.sum(DetalleAlmacen.cantidad), 0.0)).filter(
+            DetalleAlmacen.item_id == item_id
+        ).scalar()
+        stock = db.query(AlmacenItem.stock_actual).filter(AlmacenItem.id == item_id).scalar()
+        return entregadas, stock
+    finally:
+        db.close()
+
+
+def _leer_y_restar(item_id, orden_id, db, usuario):
+    """El flujo anterior: comparacion en Python y valor absoluto al escribir."""
+    from fastapi import HTTPException
+
+    from backend.app.core.lineas_orden import agregar_insumo
+    from backend.app.models.almacen_item import AlmacenItem
+    from backend.app.models.orden_trabajo import OrdenTrabajo
+
+    orden = db.query(OrdenTrabajo).filter(OrdenTrabajo.id == orden_id).first()
+    item = db.query(AlmacenItem).filter(AlmacenItem.id == item_id).first()
+    if item.stock_actual < 1:
+        raise HTTPException(status_code=400, detail="Stock insuficiente")
+    agregar_insumo(db, orden, item, 1, usuario.get("sub"), mover_stock=False)
+    item.stock_actual -= 1
+    db.commit()
+
+
+def _correr(nombre, tecnicos, intentos, stock, anterior=False):
+    from fastapi import HTTPException
+
+    from backend.app.core.database import SessionLocal
+    from backend.app.routes.detalle_almacen import agregar_insumo_a_orden
+    from backend.app.schemas.detalle_almacen import DetalleAlmacenCreate
+
+    item_id, ordenes = _preparar(tecnicos, stock)
+    latencias = []
+    resultados = Counter()
+    bloqueo = threading.Lock()
+    usuario = {"sub": "estres", "rol": "admin"}
+    salida = threading.Barrier(tecnicos)
+
+    def tecnico(numero):
+        orden_id = ordenes[numero]
+        datos = DetalleAlmacenCreate(orden_id=orden_id, item_id=item_id, cantidad=1)
+        salida.wait()
+        for _ in range(intentos):
+            db = SessionLocal()
+            inicio = time.perf_counter()
+            try:
+                if anterior:
+                    _leer_y_restar(item_id, orden_id, db, usuario)
+                else:
+                    agregar_insumo_a_orden(datos, db, usuario)
+                resultado = "ok"
+            except HTTPException as exc:
+                resultado = exc.detail if exc.status_code == 400 else f"HTTP {exc.status_code}"
+            except Exception as exc:
+                db.rollback()
+                resultado = "database is locked" if "locked" in str(exc) else type(exc).__name__
+            finally:
+                db.close()
+            with bloqueo:
+                latencias.append(time.perf_counter() - inicio)
+                resultados[resultado] += 1
+
+    hilos = [threading.Thread(target=tecnico, args=(n,)) for n in range(tecnicos)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    entregadas, stock_final = _resultado(item_id)
+    print(
+        f"{nombre:<24}{resultados['ok'] / segundos:>8,.0f}"
+        f"{_percentil(latencias, 50) * 1000:>9.1f}"
+        f"{_percentil(latencias, 99) * 1000:>9.1f}"
+        f"{resultados['ok']:>7}{resultados['Stock insuficiente']:>10}"
+        f"{entregadas:>11.0f}{stock_final:>8.0f}{max(entregadas - stock, 0):>12.0f}"
+    )
+    for error, cantidad in resultados.most_common():
+        if error not in ("ok", "Stock insuficiente"):
+            print(f"{'':<24}  {cantidad} x {error}")
+    return entregadas - stock
+
+
+def main(tecnicos=16, intentos=25, stock=200):
+    from backend.app.core import escritor
+    from backend.app.scripts.seed_demo import seed
+
+    seed()
+    print(f"{tecnicos} tecnicos x {intentos} intentos de 1 unidad, stock inicial {stock}\n")
+    print(
+        f"{'modo':<24}{'ok/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'ok':>7}{'sin stock':>10}"
+        f"{'entregadas':>11}{'stock':>8}{'sobreventa':>12}"
+    )
+
+    _correr("leer y restar (antes)", tecnicos, intentos, stock, anterior=True)
+    sobreventa = _correr("UPDATE condicional", tecnicos, intentos, stock)
+    escritor.iniciar_escritor()
+    try:
+        sobreventa = max(sobreventa, _correr("condicional + escritor", tecnicos, intentos, stock))
+    finally:
+        escritor.detener_escritor()
+
+    if sobreventa > 0:
+        print("\nHubo sobreventa con el UPDATE condicional.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    argumentos = [int(valor) for valor in sys.argv[1:4]]
+    # La base es relativa al directorio actual: se usa uno temporal.
+    with tempfile.TemporaryDirectory() as directorio:
+        anterior = os.getcwd()
+        os.chdir(directorio)
+        try:
+            main(*argumentos)
+        finally:
+            os.chdir(anterior)
@@ -1,7 +1,10 @@
 import random
 from datetime import datetime, timedelta, date
 
-from backend.app.core.database import Base, SessionLocal, engine
+from backend.app.core.caja import verificar_caja
+from backend.app.core.database import SessionLocal
+from backend.app.core.migraciones import migrar
+from backend.app.core.proveedores import recalcular_saldos_proveedores
 from backend.app.core.security import encriptar_password
 from backend.app.models.usuario import Usuario
 from backend.app.models.cliente import Cliente
@@ -15,7 +18,7 @@ from backend.app.models.caja import Caja
 from backend.app.models.orden_trabajo import OrdenTrabajo
 from backend.app.models.detalle_orden import DetalleOrden
 from backend.app.models.detalle_almacen import DetalleAlmacen
-from backend.app.models.movimiento_caja import MovimientoCaja
+from backend.app.models.movimiento_caja import CategoriaMovimiento, MovimientoCaja
 from backend.app.models.movimiento_proveedor import MovimientoProveedor
 from backend.app.models.orden_mecanico import OrdenMecanico
 from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
@@ -76,7 +79,7 @@ def recalcular_liquidacion(db, liquidacion_id):
 
 
 def seed():
-    Base.metadata.create_all(bind=engine)
+    migrar()
     db = SessionLocal()
 
     try:
@@ -320,6 +323,7 @@ def seed():
                 db.add(MovimientoCaja(
                     caja_id=caja.id,
                     tipo="ingreso",
+                    categoria=CategoriaMovimiento.INGRESO_ORDEN.value,
                     concepto=f"Ingreso por orden {orden.id}",
                     monto=total,
                     motivo="Orden cancelada",
@@ -331,6 +335,7 @@ def seed():
                 db.add(MovimientoCaja(
                     caja_id=caja.id,
                     tipo="egreso",
+                    categoria=CategoriaMovimiento.PROVISION_PROVEEDORES.value,
                     concepto=f"Pago pendiente proveedor {proveedores_texto} orden {orden.id}",
                     monto=total_proveedor,
                     motivo="Provision proveedores",
@@ -343,6 +348,7 @@ def seed():
                     db.add(MovimientoCaja(
                         caja_id=caja.id,
                         tipo="egreso",
+                        categoria=CategoriaMovimiento.PROVISION_TECNICOS.value,
                         concepto=f"Pago pendiente tecnico {nombres_unicos} orden {orden.id}",
                         monto=total_mecanicos,
                         motivo="Provision tecnicos",
@@ -353,6 +359,7 @@ def seed():
         db.add(MovimientoCaja(
             caja_id=caja.id,
             tipo="ingreso",
+            categoria=CategoriaMovimiento.MANUAL.value,
             concepto="Ingreso manual",
             monto=250000,
             motivo="Ingreso de prueba",
@@ -362,6 +369,7 @@ def seed():
         db.add(MovimientoCaja(
             caja_id=caja.id,
             tipo="egreso",
+            categoria=CategoriaMovimiento.MANUAL.value,
             concepto="Gasto operativo",
             monto=120000,
             motivo="Pago de servicios",
@@ -385,6 +393,7 @@ def seed():
             db.add(MovimientoCaja(
                 caja_id=caja.id,
                 tipo="egreso",
+                categoria=CategoriaMovimiento.PAGO_PROVEEDOR.value,
                 concepto=f"Pago proveedor {prov.nombre}",
                 monto=pago,
                 motivo="Pago parcial",
@@ -404,21 +413,16 @@ def seed():
             db.add(MovimientoCaja(
                 caja_id=caja.id,
                 tipo="egreso",
+                categoria=CategoriaMovimiento.PAGO_NOMINA.value,
                 concepto=f"Pago nomina tecnico {nombre_mecanico}",
                 monto=liq.total_pagado or 0.0,
                 motivo="Pago demo",
                 usuario="admin"
             ))
 
-        ingresos = db.query(MovimientoCaja.monto).filter(
-            MovimientoCaja.caja_id == caja.id,
-            MovimientoCaja.tipo == "ingreso"
-        ).all()
-        egresos = db.query(MovimientoCaja.monto).filter(
-            MovimientoCaja.caja_id == caja.id,
-            MovimientoCaja.tipo == "egreso"
-        ).all()
-        caja.saldo_final = caja.saldo_inicial + sum([i[0] for i in ingresos]) - sum([e[0] for e in egresos])
+        db.flush()
+        verificar_caja(db, caja, corregir=True)
+        recalcular_saldos_proveedores(db)
 
         db.commit()
         print("Datos de prueba cargados.")
@@ -53,10 +53,14 @@ def seed_novedades_demo():
                     VehiculoRecomendacion.vehiculo_id == vehiculo.id,
                     VehiculoRecomendacion.regla_id == regla.id
                 ).first()
-                if rec:
-                    continue
                 km_base = max((vehiculo.km_actual or 0) - (regla.intervalo_km or 0) + (500 * i), 0)
                 fecha_base = hoy - timedelta(days=max((regla.intervalo_dias or 0) - (2 * i), 0))
+                # Los vehiculos nuevos ya traen seguimiento desde la fecha de
+                # alta: se retrocede para que aparezcan alertas.
+                if rec:
+                    rec.km_base = km_base
+                    rec.fecha_base = fecha_base
+                    continue
                 db.add(VehiculoRecomendacion(
                     vehiculo_id=vehiculo.id,
                     regla_id=regla.id,
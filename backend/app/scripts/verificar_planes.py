@@ -0,0 +1,182 @@
+"""
+Verifica con EXPLAIN QUERY PLAN que las consultas frecuentes usen indices.
+
+Carga los datos de prueba (seed_demo) en una base temporal, llama a los
+endpoints con filtros frecuentes, captura cada SELECT, UPDATE y DELETE que
+emiten y falla si el plan de alguno recorre una tabla completa (SCAN, aun
+recorriendo un indice entero). Sale con codigo 1 si encuentra alguno.
+
+Uso:
+    python -m backend.app.scripts.verificar_planes
+"""
+
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+
+
+# (nombre, metodo, ruta, tablas que puede recorrer). Las rutas se completan
+# con los ids sembrados.
+CONSULTAS = [
+    ("ordenes por estado", "GET", "/api/ordenes/?estado=cerrada", ()),
+    ("ordenes por estado y fecha", "GET", "/api/ordenes/?estado=cerrada&desde={desde}&hasta={hasta}", ()),
+    ("ordenes por vehiculo", "GET", "/api/ordenes/?vehiculo_id={vehiculo}", ()),
+    ("ordenes por cliente", "GET", "/api/ordenes/?cliente_id={cliente}", ()),
+    ("workspace de orden", "GET", "/api/ordenes/{orden}/workspace", ()),
+    ("servicios de orden", "GET", "/api/detalle-orden/orden/{orden}", ()),
+    ("insumos de orden", "GET", "/api/detalle-almacen/orden/{orden}", ()),
+    ("tecnicos de orden", "GET", "/api/mecanicos/ordenes/{orden}", ()),
+    ("ordenes de tecnico", "GET", "/api/mecanicos/{mecanico}/ordenes", ()),
+    ("caja abierta", "GET", "/api/contabilidad/cajas/abierta", ()),
+    ("movimientos de caja", "GET", "/api/contabilidad/movimientos?caja_id={caja}", ()),
+    ("movimientos de caja por tipo", "GET", "/api/contabilidad/movimientos?caja_id={caja}&tipo=egreso", ()),
+    ("movimientos de caja por fecha", "GET", "/api/contabilidad/movimientos?desde={desde}&hasta={hasta}", ()),
+    ("verificar caja", "GET", "/api/contabilidad/cajas/{caja}/verificar", ()),
+    ("posicion de orden", "GET", "/api/contabilidad/ordenes/{orden}/posicion", ()),
+    ("movimientos de proveedor", "GET", "/api/contabilidad/proveedores/{proveedor}/movimientos", ()),
+    (
+        "movimientos de proveedor por fecha", "GET",
+        "/api/contabilidad/proveedores/{proveedor}/movimientos?desde={desde}&hasta={hasta}&tipo=cargo", ()
+    ),
+    ("saldo de proveedor", "GET", "/api/contabilidad/proveedores/{proveedor}/saldo", ()),
+    # Lista a todos los proveedores; el orden sale del indice unico de nombre.
+    ("saldos de proveedores", "GET", "/api/contabilidad/proveedores/saldos", ("proveedores",)),
+    ("liquidacion", "GET", "/api/contabilidad/liquidaciones/mecanicos/{liquidacion}", ()),
+    ("ingresos por fecha", "GET", "/api/reportes/ingresos-por-fecha?fecha_inicio={desde}&fecha_fin={hasta}", ()),
+    ("ordenes cerradas", "GET", "/api/reportes/ordenes-cerradas?fecha_inicio={desde}&fecha_fin={hasta}", ()),
+    ("movimientos de item", "GET", "/api/almacen/movimientos?item_id={item}", ()),
+    ("movimientos de almacen por fecha", "GET", "/api/almacen/movimientos?desde={desde}&hasta={hasta}", ()),
+    ("reabastecimiento", "GET", "/api/almacen/reabastecimiento", ("almacen_items",)),
+    ("prestamos activos", "GET", "/api/herramientas/prestamos?activos=true", ()),
+    # Conteos y totales de todo el historial; el resultado queda en cache.
+    (
+        "dashboard", "GET", "/dashboard/data",
+        ("clientes", "vehiculos", "ordenes_trabajo", "detalle_orden", "mecanicos")
+    ),
+    ("novedades por vencer", "GET", "/novedades/por-vencer", ()),
+    ("cancelar orden", "PUT", "/api/ordenes/{orden}/estado?nuevo_estado=cancelada", ()),
+]
+
+TIPOS_SENTENCIA = ("SELECT", "UPDATE", "DELETE")
+SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def _ids(db):
+    from backend.app.models.caja import Caja
+    from backend.app.models.liquidacion_mecanico import LiquidacionMecanico
+    from backend.app.models.movimiento_almacen import MovimientoAlmacen
+    from backend.app.models.orden_mecanico import OrdenMecanico
+    from backend.app.models.orden_trabajo import OrdenTrabajo
+    from backend.app.models.movimiento_proveedor import MovimientoProveedor
+
+    orden = db.query(OrdenTrabajo).join(
+        OrdenMecanico, OrdenMecanico.orden_id == OrdenTrabajo.id
+    ).filter(OrdenTrabajo.estado == "cerrada").first()
+    hoy = date.today()
+    return {
+        "orden": orden.id,
+        "vehiculo": orden.vehiculo_id,
+        "cliente": orden.cliente_id,
+        "mecanico": orden.asignaciones_mecanicos[0].mecanico_id,
+        "caja": db.query(Caja.id).filter(Caja.estado == "abierta").scalar(),
+        "proveedor": db.query(MovimientoProveedor.proveedor_id).limit(1).scalar(),
+        "liquidacion": db.query(LiquidacionMecanico.id).limit(1).scalar(),
+        "item": db.query(MovimientoAlmacen.item_id).limit(1).scalar() or 1,
+        "desde": (hoy - timedelta(days=90)).isoformat(),
+        "hasta": hoy.isoformat(),
+    }
+
+
+def _recorridos(conexion, sentencia, parametros, tablas):
+    """Tablas que el plan de la sentencia recorre completas."""
+    plan = conexion.exec_driver_sql("EXPLAIN QUERY PLAN " + sentencia, parametros).all()
+    recorridas = []
+    for fila in plan:
+        detalle = fila[-1]
+        coincidencia = SCAN.match(detalle)
+        if coincidencia and coincidencia.group(1) in tablas:
+            recorridas.append(detalle)
+    return recorridas
+
+
+def verificar():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from backend.app.core.database import Base, SessionLocal, engine
+    from backend.app.core.security import crear_token
+    from backend.app.scripts.seed_demo import seed
+
+    seed()
+    from backend.app import main
+
+    db = SessionLocal()
+    try:
+        ids = _ids(db)
+    finally:
+        db.close()
+
+    capturadas = []
+
+    def capturar(conn, cursor, sentencia, parametros, context, executemany):
+        if sentencia.lstrip().upper().startswith(TIPOS_SENTENCIA):
+            capturadas.append((sentencia, parametros))
+
+    cliente = TestClient(main.app)
+    cliente.cookies.set("access_token", crear_token({"sub": "admin", "rol": "admin"}))
+    tablas = set(Base.metadata.tables)
+
+    fallas = 0
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        for nombre, metodo, ruta, permitidas in CONSULTAS:
+            capturadas.clear()
+            respuesta = cliente.request(metodo, ruta.format(**ids))
+            sentencias = list(capturadas)
+            if respuesta.status_code >= 400:
+                print(f"ERROR  {nombre}: HTTP {respuesta.status_code} {respuesta.text[:200]}")
+                fallas += 1
+                continue
+
+            problemas = []
+            with engine.connect() as conexion:
+                for sentencia, parametros in sentencias:
+                    recorribles = tablas - set(permitidas)
+                    for detalle in _recorridos(conexion, sentencia, parametros, recorribles):
+                        problemas.append((detalle, sentencia))
+
+            if problemas:
+                fallas += 1
+                print(f"SCAN   {nombre}")
+                for detalle, sentencia in problemas:
+                    print(f"         {detalle}")
+                    print(f"         {' '.join(sentencia.split())[:300]}")
+            else:
+                print(f"OK     {nombre} ({len(sentencias)} sentencias)")
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+    return fallas
+
+
+def main():
+    # La base es relativa al directorio actual (./medinautos.db), asi que
+    # se trabaja dentro de un directorio temporal para no tocar la real.
+    with tempfile.TemporaryDirectory() as directorio:
+        anterior = os.getcwd()
+        os.chdir(directorio)
+        try:
+            fallas = verificar()
+        finally:
+            os.chdir(anterior)
+
+    if fallas:
+        print(f"\n{fallas} consultas sin indice adecuado.")
+        sys.exit(1)
+    print("\nTodas las consultas usan indices.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ const API_BASE = "/api";
 let cajaActual = null;
 let mecanicosCache = [];
 let itemsCache = new Map();
+let saldosProveedores = new Map();
+let cursorMovimientos = null;
+let cursorProveedor = null;
 
 document.addEventListener("DOMContentLoaded", () => {
     const formAbrir = document.getElementById("form-abrir-caja");
@@ -33,6 +36,14 @@ document.addEventListener("DOMContentLoaded", () => {
     if (btnRecargar) {
         btnRecargar.addEventListener("click", () => cargarMovimientos());
     }
+    const btnMasMovimientos = document.getElementById("btn-mas-movimientos");
+    if (btnMasMovimientos) {
+        btnMasMovimientos.addEventListener("click", () => cargarMovimientos(true));
+    }
+    const btnMasProveedor = document.getElementById("btn-mas-proveedor");
+    if (btnMasProveedor) {
+        btnMasProveedor.addEventListener("click", () => cargarProveedorDetalle(true));
+    }
     if (proveedorSelect) {
         proveedorSelect.addEventListener("change", () => cargarProveedorDetalle());
     }
@@ -68,14 +79,13 @@ async function inicializarContabilidad() {
     iniciarAutoRefresco();
 }
 
+// La caja se recarga cuando el servidor avisa de movimientos o cambios de
+// estado (tambien los hechos desde otra pestana o equipo).
 function iniciarAutoRefresco() {
-    const REFRESCO_MS = 30000;
-    setInterval(async () => {
-        if (cajaActual) {
-            await cargarCaja();
-            await cargarMovimientos();
-        }
-    }, REFRESCO_MS);
+    escucharCambios(["caja"], async () => {
+        await cargarCaja();
+        await cargarMovimientos();
+    });
 }
 
 async function cargarCaja() {
@@ -266,6 +276,7 @@ async function onCrearMovimiento(event) {
             if (proveedorSelect) {
                 proveedorSelect.value = String(payload.proveedor_id);
             }
+            await cargarSaldosProveedores();
             await cargarProveedorDetalle();
         }
         Swal.fire({ icon: "success", title: "Movimiento registrado" });
@@ -274,28 +285,36 @@ async function onCrearMovimiento(event) {
     }
 }
 
-async function cargarMovimientos() {
+async function cargarMovimientos(anexar = false) {
     const tabla = document.querySelector("#tabla-movimientos tbody");
     if (!tabla) {
         return;
     }
 
     try {
-        let url = `${API_BASE}/contabilidad/movimientos`;
+        // El servidor entrega paginas (cursor) con los totales del filtro.
+        const params = new URLSearchParams();
         if (cajaActual) {
-            url = `${url}?caja_id=${cajaActual.id}`;
+            params.set("caja_id", cajaActual.id);
         }
-        const response = await fetch(url);
+        if (anexar && cursorMovimientos) {
+            params.set("cursor", cursorMovimientos);
+        }
+        const response = await fetch(`${API_BASE}/contabilidad/movimientos?${params}`);
         if (!response.ok) {
             const detalle = await obtenerDetalleError(response);
             throw new Error(detalle || "No se pudieron cargar los movimientos.");
         }
-        const movimientos = await response.json();
-        if (!movimientos.length) {
+        const pagina = await response.json();
+        const movimientos = pagina.items;
+        cursorMovimientos = pagina.siguiente_cursor;
+        actualizarPaginacion("btn-mas-movimientos", cursorMovimientos);
+        actualizarTotalesMovimientos(pagina.totales);
+        if (!anexar && !movimientos.length) {
             tabla.innerHTML = `<tr><td colspan="6" class="table-empty">Sin movimientos registrados.</td></tr>`;
             return;
         }
-        tabla.innerHTML = movimientos.map((mov) => `
+        const filas = movimientos.map((mov) => `
             <tr>
                 <td>${formatearFecha(mov.fecha)}</td>
                 <td>${mov.tipo}</td>
@@ -305,11 +324,34 @@ async function cargarMovimientos() {
                 <td>${mov.proveedor_id ?? "-"}</td>
             </tr>
         `).join("");
+        if (anexar) {
+            tabla.insertAdjacentHTML("beforeend", filas);
+        } else {
+            tabla.innerHTML = filas;
+        }
     } catch (error) {
+        actualizarPaginacion("btn-mas-movimientos", null);
         tabla.innerHTML = `<tr><td colspan="6" class="table-empty">${error.message}</td></tr>`;
     }
 }
 
+function actualizarPaginacion(botonId, cursor) {
+    const boton = document.getElementById(botonId);
+    if (boton) {
+        boton.hidden = !cursor;
+    }
+}
+
+function actualizarTotalesMovimientos(totales) {
+    const resumen = document.getElementById("movimientos-totales");
+    if (!resumen) {
+        return;
+    }
+    resumen.textContent = totales && totales.movimientos
+        ? `${totales.movimientos} movimientos - Ingresos ${formatearMoneda(totales.ingresos)} - Egresos ${formatearMoneda(totales.egresos)}`
+        : "";
+}
+
 async function cargarProveedores() {
     const select = document.getElementById("proveedor-select");
     if (!select) {
@@ -347,15 +389,33 @@ async function cargarProveedoresMovimiento(select) {
     }
 }
 
-async function cargarOrdenesParaMovimiento(select) {
-    try {
-        const response = await fetch(`${API_BASE}/ordenes/`);
+async function listarOrdenesPorEstado(estado) {
+    // El listado es paginado: se recorren todas las paginas del estado.
+    const ordenes = [];
+    let cursor = null;
+    do {
+        const params = new URLSearchParams({ estado, limite: 200 });
+        if (cursor) {
+            params.set("cursor", cursor);
+        }
+        const response = await fetch(`${API_BASE}/ordenes/?${params}`);
         if (!response.ok) {
             const detalle = await obtenerDetalleError(response);
             throw new Error(detalle || "No se pudieron cargar las ordenes.");
         }
-        const ordenes = await response.json();
-        const visibles = ordenes.filter((orden) => ["abierta", "en_proceso", "cerrada"].includes(orden.estado));
+        const pagina = await response.json();
+        ordenes.push(...pagina.items);
+        cursor = pagina.siguiente_cursor;
+    } while (cursor);
+    return ordenes;
+}
+
+async function cargarOrdenesParaMovimiento(select) {
+    try {
+        const porEstado = await Promise.all(
+            ["abierta", "en_proceso", "cerrada"].map(listarOrdenesPorEstado)
+        );
+        const visibles = porEstado.flat().sort((a, b) => b.id - a.id);
         select.innerHTML = `<option value="">Sin orden</option>` +
             visibles.map((orden) => {
                 const cliente = orden.cliente ? orden.cliente.nombre : "";
@@ -371,7 +431,7 @@ async function cargarOrdenesParaMovimiento(select) {
     }
 }
 
-async function cargarProveedorDetalle() {
+async function cargarProveedorDetalle(anexar = false) {
     const select = document.getElementById("proveedor-select");
     const proveedorId = select ? select.value : null;
     const tabla = document.querySelector("#tabla-proveedor tbody");
@@ -383,30 +443,37 @@ async function cargarProveedorDetalle() {
     if (!proveedorId) {
         tabla.innerHTML = `<tr><td colspan="6" class="table-empty">Selecciona un proveedor.</td></tr>`;
         actualizarSaldoProveedor(null);
+        actualizarPaginacion("btn-mas-proveedor", null);
         return;
     }
 
     try {
-        const [saldoResp, movResp] = await Promise.all([
-            fetch(`${API_BASE}/contabilidad/proveedores/${proveedorId}/saldo`),
-            fetch(`${API_BASE}/contabilidad/proveedores/${proveedorId}/movimientos`)
+        const params = new URLSearchParams();
+        if (anexar && cursorProveedor) {
+            params.set("cursor", cursorProveedor);
+        }
+        const [movResp] = await Promise.all([
+            fetch(`${API_BASE}/contabilidad/proveedores/${proveedorId}/movimientos?${params}`),
+            saldosProveedores.size ? null : cargarSaldosProveedores()
         ]);
 
-        if (!saldoResp.ok || !movResp.ok) {
-            const detalle = await obtenerDetalleError(saldoResp.ok ? movResp : saldoResp);
+        if (!movResp.ok) {
+            const detalle = await obtenerDetalleError(movResp);
             throw new Error(detalle || "No se pudo cargar el proveedor.");
         }
 
-        const saldo = await saldoResp.json();
-        const movimientos = await movResp.json();
-        actualizarSaldoProveedor(saldo);
+        const pagina = await movResp.json();
+        const movimientos = pagina.items;
+        cursorProveedor = pagina.siguiente_cursor;
+        actualizarPaginacion("btn-mas-proveedor", cursorProveedor);
+        actualizarSaldoProveedor(saldosProveedores.get(Number(proveedorId)) || null);
 
-        if (!movimientos.length) {
+        if (!anexar && !movimientos.length) {
             tabla.innerHTML = `<tr><td colspan="7" class="table-empty">No hay movimientos.</td></tr>`;
             return;
         }
 
-        tabla.innerHTML = movimientos.map((mov) => `
+        const filas = movimientos.map((mov) => `
             <tr>
                 <td>${formatearFecha(mov.fecha)}</td>
                 <td>${mov.tipo}</td>
@@ -417,7 +484,13 @@ async function cargarProveedorDetalle() {
                 <td>${mov.motivo ?? "-"}</td>
             </tr>
         `).join("");
+        if (anexar) {
+            tabla.insertAdjacentHTML("beforeend", filas);
+        } else {
+            tabla.innerHTML = filas;
+        }
     } catch (error) {
+        actualizarPaginacion("btn-mas-proveedor", null);
         tabla.innerHTML = `<tr><td colspan="7" class="table-empty">${error.message}</td></tr>`;
     }
 }
@@ -442,15 +515,22 @@ function obtenerNombreItem(itemId) {
     return itemsCache.get(itemId) || `#${itemId}`;
 }
 
+async function cargarSaldosProveedores() {
+    // Un solo pedido con los saldos de todos los proveedores.
+    const response = await fetch(`${API_BASE}/contabilidad/proveedores/saldos`);
+    if (!response.ok) {
+        const detalle = await obtenerDetalleError(response);
+        throw new Error(detalle || "No se pudieron cargar los saldos de proveedores.");
+    }
+    const saldos = await response.json();
+    saldosProveedores = new Map(saldos.map((saldo) => [saldo.proveedor_id, saldo]));
+}
+
 async function validarSaldoProveedor(proveedorId, monto) {
     try {
-        const response = await fetch(`${API_BASE}/contabilidad/proveedores/${proveedorId}/saldo`);
-        if (!response.ok) {
-            const detalle = await obtenerDetalleError(response);
-            throw new Error(detalle || "No se pudo validar el saldo del proveedor.");
-        }
-        const saldo = await response.json();
-        if (monto > saldo.saldo) {
+        await cargarSaldosProveedores();
+        const saldo = saldosProveedores.get(Number(proveedorId));
+        if (monto > (saldo ? saldo.saldo : 0)) {
             mostrarError("Proveedor", "El monto excede el saldo pendiente del proveedor.");
             return false;
         }
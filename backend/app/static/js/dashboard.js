@@ -3,17 +3,33 @@
 // ================================
 
 document.addEventListener("DOMContentLoaded", async () => {
+    await Promise.all([cargarDashboard(true), cargarReabastecimiento()]);
+    // Sin sondeo: se recarga solo cuando el servidor avisa que cambio algo.
+    escucharCambios(["dashboard", "inventario"], (temas) => {
+        if (temas.has("dashboard")) {
+            cargarDashboard(false);
+        }
+        if (temas.has("inventario")) {
+            cargarReabastecimiento();
+        }
+    });
+});
+
+async function cargarDashboard(animar) {
+    const contador = animar ? animateCounter : (element, target) => {
+        if (element) element.textContent = target;
+    };
     try {
         const response = await fetch("/dashboard/data");
         const data = await response.json();
 
-        animateCounter(
+        contador(
             document.getElementById("total-clientes"),
             data.clientes,
             1200
         );
 
-        animateCounter(
+        contador(
             document.getElementById("total-vehiculos"),
             data.vehiculos,
             1200
@@ -52,7 +68,7 @@ document.addEventListener("DOMContentLoaded", async () => {
             document.getElementById("alertas-resumen"),
             data
         );
-        animateCounter(
+        contador(
             document.getElementById("cumple-hoy-total"),
             data.cumple_hoy_total || 0,
             900
@@ -60,7 +76,27 @@ document.addEventListener("DOMContentLoaded", async () => {
     } catch (error) {
         console.error("Error cargando datos del dashboard:", error);
     }
-});
+}
+
+async function cargarReabastecimiento() {
+    const tarjeta = document.getElementById("reabastecimiento-card");
+    try {
+        const response = await fetch("/api/almacen/reabastecimiento");
+        if (!response.ok) {
+            // Solo el administrador ve el almacen.
+            if (tarjeta) tarjeta.hidden = true;
+            return;
+        }
+        const data = await response.json();
+        renderReabastecimiento(
+            document.getElementById("reabastecimiento"),
+            document.getElementById("reabastecimiento-resumen"),
+            data
+        );
+    } catch (error) {
+        console.error("Error cargando el reabastecimiento:", error);
+    }
+}
 
 
 // ================================
@@ -258,6 +294,44 @@ function renderAlertasResumen(contenedor, data) {
     `;
 }
 
+function renderReabastecimiento(contenedor, resumen, data) {
+    if (!contenedor) {
+        return;
+    }
+    const proveedores = data.proveedores || [];
+    if (resumen) {
+        resumen.textContent = proveedores.length === 0
+            ? `Consumo de los ultimos ${data.ventana_dias} dias; nada por pedir.`
+            : `${data.items_total} insumo${data.items_total === 1 ? "" : "s"} por pedir `
+                + `(${data.items_bajo_minimo} bajo el minimo) - ${formatCurrency(data.costo_estimado)}. `
+                + `Consumo de los ultimos ${data.ventana_dias} dias, entrega en ${data.plazo_dias}.`;
+    }
+    if (proveedores.length === 0) {
+        contenedor.innerHTML = `<li class="empty">Sin insumos por pedir.</li>`;
+        return;
+    }
+
+    contenedor.innerHTML = proveedores.map((grupo) => {
+        const items = grupo.items.map((item) => {
+            const dias = item.dias_restantes === null
+                ? "bajo el minimo"
+                : `${item.dias_restantes} dias de stock`;
+            return `${item.nombre}: pedir ${item.cantidad_sugerida} ${item.unidad} (${dias})`;
+        }).join(" | ");
+        return `
+            <li class="alerta-vencida-item">
+                <a class="alerta-vencida-link" href="/almacen">
+                    <div class="alerta-item-main">
+                        <span class="alerta-placa-link">${grupo.proveedor}</span>
+                        <span class="alerta-total">${formatCurrency(grupo.costo_estimado)}</span>
+                    </div>
+                    <div class="alerta-item-meta">${items}</div>
+                </a>
+            </li>
+        `;
+    }).join("");
+}
+
 function formatearFecha(valor) {
     if (!valor) {
         return "-";
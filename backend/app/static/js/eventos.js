@@ -0,0 +1,43 @@
+// ======================================================
+// EVENTOS EN VIVO - MEDINAUTOS
+// Una conexion SSE por pagina; avisa cuando cambian datos
+// ======================================================
+
+// Llama a alCambiar(temas) cuando el servidor publica cambios en alguno de
+// los temas. Los avisos seguidos se agrupan en una sola llamada.
+function escucharCambios(temas, alCambiar, esperaMs = 400) {
+    if (!window.EventSource) {
+        return null;
+    }
+
+    const fuente = new EventSource(`/eventos?temas=${encodeURIComponent(temas.join(","))}`);
+    const pendientes = new Set();
+    let temporizador = null;
+    let conexiones = 0;
+
+    const avisar = (nuevos) => {
+        nuevos.forEach(tema => pendientes.add(tema));
+        clearTimeout(temporizador);
+        temporizador = setTimeout(() => {
+            const cambiados = new Set(pendientes);
+            pendientes.clear();
+            alCambiar(cambiados);
+        }, esperaMs);
+    };
+
+    temas.forEach(tema => {
+        fuente.addEventListener(tema, () => avisar([tema]));
+    });
+
+    // Tras una reconexion pudo perderse algun aviso: se recarga todo.
+    fuente.addEventListener("conectado", () => {
+        conexiones += 1;
+        if (conexiones > 1) {
+            avisar(temas);
+        }
+    });
+    fuente.addEventListener("resync", () => avisar(temas));
+
+    window.addEventListener("beforeunload", () => fuente.close());
+    return fuente;
+}
@@ -14,11 +14,6 @@ document.addEventListener("DOMContentLoaded", () => {
     if (ordenLayout) {
         prepararDetalleOrden(ordenLayout);
     }
-
-    const kpiContainer = document.querySelector(".ordenes-kpi");
-    if (kpiContainer) {
-        actualizarKPIsOrdenes();
-    }
 });
 
 function actualizarTotalesDetalle(totalServicios, totalInsumos) {
@@ -32,33 +27,21 @@ function actualizarTotalesDetalle(totalServicios, totalInsumos) {
     }
 }
 
-function actualizarKPIsOrdenes() {
-    const estados = Array.from(document.querySelectorAll(".orden-numero"))
-        .map((celda) => (celda.dataset.estado || "abierta"));
-
-    const resumen = estados.reduce((acc, estado) => {
-        acc.total += 1;
-        if (estado === "cerrada") {
-            acc.cerrada += 1;
-        } else if (estado === "en_proceso") {
-            acc.proceso += 1;
-        } else if (estado === "cancelada") {
-            acc.cancelada += 1;
-        } else {
-            acc.abierta += 1;
+function descontarKPIOrden(estado) {
+    // Los KPIs vienen calculados del servidor sobre todo el filtro, no
+    // sobre la pagina visible; al eliminar solo se descuenta la fila.
+    const ids = {
+        cerrada: "kpi-cerradas",
+        en_proceso: "kpi-proceso",
+        abierta: "kpi-abiertas"
+    };
+    const kpi = estado === "cancelada" ? null : (ids[estado] || ids.abierta);
+    [kpi, "kpi-total"].forEach((id) => {
+        const el = id ? document.getElementById(id) : null;
+        if (el) {
+            el.textContent = Math.max(0, (parseInt(el.textContent, 10) || 0) - 1);
         }
-        return acc;
-    }, { abierta: 0, proceso: 0, cerrada: 0, cancelada: 0, total: 0 });
-
-    const kpiAbiertas = document.getElementById("kpi-abiertas");
-    const kpiProceso = document.getElementById("kpi-proceso");
-    const kpiCerradas = document.getElementById("kpi-cerradas");
-    const kpiTotal = document.getElementById("kpi-total");
-
-    if (kpiAbiertas) kpiAbiertas.textContent = resumen.abierta;
-    if (kpiProceso) kpiProceso.textContent = resumen.proceso;
-    if (kpiCerradas) kpiCerradas.textContent = resumen.cerrada;
-    if (kpiTotal) kpiTotal.textContent = resumen.total;
+    });
 }
 
 function prepararEliminacionOrdenes(botones) {
@@ -93,9 +76,10 @@ function prepararEliminacionOrdenes(botones) {
 
                     const fila = boton.closest("tr");
                     if (fila) {
+                        const celda = fila.querySelector(".orden-numero");
+                        descontarKPIOrden(celda ? celda.dataset.estado : "abierta");
                         fila.remove();
                     }
-                    actualizarKPIsOrdenes();
                     const tabla = document.querySelector(".ordenes-table tbody");
                     if (tabla && tabla.querySelectorAll("tr[data-id]").length === 0) {
                         tabla.innerHTML = `<tr><td colspan="7" class="servicios-empty">No hay ordenes registradas.</td></tr>`;
@@ -132,8 +116,8 @@ function prepararDetalleOrden(layout) {
     const mecanicoBody = document.getElementById("mecanico-body");
     const mecanicoSelect = document.querySelector("[data-role='mecanico-select']");
     const totalLabel = document.getElementById("orden-total");
-    let serviciosMap = {};
-    let insumosMap = {};
+    const vistas = { detalleBody, insumoBody, mecanicoBody, totalLabel };
+    const recargar = () => cargarWorkspace(ordenId, vistas, recargar);
 
     if (formOrden) {
         formOrden.addEventListener("submit", async (event) => {
@@ -247,8 +231,7 @@ function prepararDetalleOrden(layout) {
                 }
 
                 detalleForm.reset();
-                await cargarDetalleOrden(ordenId, detalleBody, serviciosMap);
-                await refrescarOrden(ordenId, totalLabel);
+                await recargar();
 
                 Swal.fire({
                     icon: "success",
@@ -265,26 +248,22 @@ function prepararDetalleOrden(layout) {
         });
     }
 
+    // Los catalogos solo alimentan los selectores; las lineas de la orden
+    // llegan ya con sus nombres en el workspace.
     if (servicioSelect) {
-        cargarServicios(servicioSelect).then((mapa) => {
-            serviciosMap = mapa;
+        cargarServicios(servicioSelect).then(() => {
             activarSelectBuscable(servicioSelect, "Buscar servicio...");
-            if (detalleBody) {
-                cargarDetalleOrden(ordenId, detalleBody, serviciosMap);
-            }
         });
     }
 
     if (insumoSelect) {
-        cargarInsumos(insumoSelect).then((mapa) => {
-            insumosMap = mapa;
+        cargarInsumos(insumoSelect).then(() => {
             activarSelectBuscable(insumoSelect, "Buscar insumo...");
-            if (insumoBody) {
-                cargarDetalleInsumos(ordenId, insumoBody, insumosMap);
-            }
         });
     }
 
+    recargar();
+
     if (insumoForm && insumoBody && insumoSelect) {
         insumoForm.addEventListener("submit", async (event) => {
             event.preventDefault();
@@ -320,8 +299,7 @@ function prepararDetalleOrden(layout) {
                 }
 
                 insumoForm.reset();
-                await cargarDetalleInsumos(ordenId, insumoBody, insumosMap);
-                await refrescarOrden(ordenId, totalLabel);
+                await recargar();
 
                 Swal.fire({
                     icon: "success",
@@ -344,10 +322,6 @@ function prepararDetalleOrden(layout) {
         });
     }
 
-    if (mecanicoBody) {
-        cargarAsignacionesMecanicos(ordenId, mecanicoBody);
-    }
-
     if (mecanicoForm && mecanicoBody && mecanicoSelect) {
         mecanicoForm.addEventListener("submit", async (event) => {
             event.preventDefault();
@@ -382,7 +356,7 @@ function prepararDetalleOrden(layout) {
                 }
 
                 mecanicoForm.reset();
-                await cargarAsignacionesMecanicos(ordenId, mecanicoBody);
+                await recargar();
 
                 Swal.fire({
                     icon: "success",
@@ -401,8 +375,6 @@ function prepararDetalleOrden(layout) {
 }
 
 async function cargarServicios(select) {
-    const mapa = {};
-
     try {
         const response = await fetch(`${API_BASE}/servicios/`);
         if (!response.ok) {
@@ -413,7 +385,6 @@ async function cargarServicios(select) {
         const activos = servicios.filter((servicio) => servicio.activo);
 
         activos.forEach((servicio) => {
-            mapa[servicio.id] = servicio.nombre;
             const option = document.createElement("option");
             option.value = servicio.id;
             option.textContent = `${servicio.nombre} ($${formatearPrecio(servicio.precio)})`;
@@ -422,64 +393,91 @@ async function cargarServicios(select) {
     } catch (error) {
         console.error(error);
     }
-
-    return mapa;
 }
 
-async function cargarDetalleOrden(ordenId, detalleBody, serviciosMap) {
+const workspaceEtags = {};
+
+async function cargarWorkspace(ordenId, vistas, recargar) {
+    const headers = {};
+    if (workspaceEtags[ordenId]) {
+        headers["If-None-Match"] = workspaceEtags[ordenId];
+    }
+
     try {
-        const response = await fetch(`${API_BASE}/detalle-orden/orden/${ordenId}`);
+        const response = await fetch(`${API_BASE}/ordenes/${ordenId}/workspace`, {
+            headers,
+            cache: "no-store"
+        });
+        if (response.status === 304) {
+            return;
+        }
         if (!response.ok) {
-            throw new Error("No se pudo cargar el detalle.");
+            throw new Error("No se pudo cargar la orden.");
         }
 
-        const detalles = await response.json();
-        const totalServicios = detalles.reduce((acc, detalle) => acc + Number(detalle.subtotal || 0), 0);
-        window.__totalServicios = totalServicios;
-        actualizarTotalesDetalle(totalServicios, window.__totalInsumos || 0);
-
-        if (!detalles || detalles.length === 0) {
-            detalleBody.innerHTML = `
-                <tr>
-                    <td colspan="5" class="servicios-empty">No hay servicios agregados.</td>
-                </tr>
-            `;
-            window.__totalServicios = 0;
-            actualizarTotalesDetalle(0, window.__totalInsumos || 0);
-            return;
-        }
+        const data = await response.json();
+        workspaceEtags[ordenId] = response.headers.get("ETag");
 
-        detalleBody.innerHTML = detalles.map((detalle) => {
-            const nombreServicio = serviciosMap[detalle.servicio_id] || `Servicio #${detalle.servicio_id}`;
-            return `
-                <tr data-id="${detalle.id}">
-                    <td>${nombreServicio}</td>
-                    <td>${detalle.cantidad}</td>
-                    <td>$${formatearPrecio(detalle.precio_unitario)}</td>
-                    <td>$${formatearPrecio(detalle.subtotal)}</td>
-                    <td class="acciones">
-                        <button type="button" class="btn-icon btn-edit btn-detalle-edit" data-id="${detalle.id}"
-                            data-cantidad="${detalle.cantidad}">
-                            <i class="fa-solid fa-pen-to-square"></i>
-                        </button>
-                        <button type="button" class="btn-icon btn-delete btn-detalle-delete" data-id="${detalle.id}">
-                            <i class="fa-solid fa-trash"></i>
-                        </button>
-                    </td>
-                </tr>
-            `;
-        }).join("");
-
-        prepararAccionesDetalle(detalleBody, ordenId, serviciosMap);
+        actualizarTotalesDetalle(data.totales.servicios, data.totales.insumos);
+        if (vistas.totalLabel) {
+            vistas.totalLabel.textContent = `$${formatearPrecio(data.totales.total || 0)}`;
+        }
+        if (vistas.detalleBody) {
+            renderizarServicios(vistas.detalleBody, data.servicios, recargar);
+        }
+        if (vistas.insumoBody) {
+            renderizarInsumos(vistas.insumoBody, data.insumos, recargar);
+        }
+        if (vistas.mecanicoBody) {
+            renderizarMecanicos(vistas.mecanicoBody, data.mecanicos, ordenId, recargar);
+        }
     } catch (error) {
+        delete workspaceEtags[ordenId];
+        [vistas.detalleBody, vistas.insumoBody, vistas.mecanicoBody].forEach((body) => {
+            if (body) {
+                body.innerHTML = `
+                    <tr>
+                        <td colspan="5" class="servicios-empty">${error.message}</td>
+                    </tr>
+                `;
+            }
+        });
+        actualizarTotalesDetalle(0, 0);
+    }
+}
+
+function renderizarServicios(detalleBody, detalles, recargar) {
+    if (!detalles || detalles.length === 0) {
         detalleBody.innerHTML = `
             <tr>
-                <td colspan="5" class="servicios-empty">${error.message}</td>
+                <td colspan="5" class="servicios-empty">No hay servicios agregados.</td>
             </tr>
         `;
-        window.__totalServicios = 0;
-        actualizarTotalesDetalle(0, window.__totalInsumos || 0);
+        return;
     }
+
+    detalleBody.innerHTML = detalles.map((detalle) => {
+        const nombreServicio = detalle.servicio_nombre || `Servicio #${detalle.servicio_id}`;
+        return `
+            <tr data-id="${detalle.id}">
+                <td>${nombreServicio}</td>
+                <td>${detalle.cantidad}</td>
+                <td>$${formatearPrecio(detalle.precio_unitario)}</td>
+                <td>$${formatearPrecio(detalle.subtotal)}</td>
+                <td class="acciones">
+                    <button type="button" class="btn-icon btn-edit btn-detalle-edit" data-id="${detalle.id}"
+                        data-cantidad="${detalle.cantidad}">
+                        <i class="fa-solid fa-pen-to-square"></i>
+                    </button>
+                    <button type="button" class="btn-icon btn-delete btn-detalle-delete" data-id="${detalle.id}">
+                        <i class="fa-solid fa-trash"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+    }).join("");
+
+    prepararAccionesDetalle(detalleBody, recargar);
 }
 
 async function cargarMecanicos(select) {
@@ -607,57 +605,42 @@ function activarSelectBuscable(select, placeholder) {
     select.dataset.searchReady = "true";
 }
 
-async function cargarAsignacionesMecanicos(ordenId, mecanicoBody) {
-    try {
-        const response = await fetch(`${API_BASE}/mecanicos/ordenes/${ordenId}`);
-        if (!response.ok) {
-            throw new Error("No se pudieron cargar los tecnicos.");
-        }
-
-        const asignaciones = await response.json();
-
-        if (!asignaciones || asignaciones.length === 0) {
-            mecanicoBody.innerHTML = `
-                <tr>
-                    <td colspan="5" class="servicios-empty">No hay tecnicos asignados.</td>
-                </tr>
-            `;
-            return;
-        }
-
-        mecanicoBody.innerHTML = asignaciones.map((asignacion) => {
-            const mecanico = asignacion.mecanico || {};
-            const nombre = `${mecanico.nombres || ""} ${mecanico.apellidos || ""}`.trim();
-            const especialidad = mecanico.especialidad || "-";
-            const observaciones = asignacion.observaciones || "-";
-            const fecha = formatearFecha(asignacion.fecha_asignacion);
-
-            return `
-                <tr data-mecanico-id="${mecanico.id}">
-                    <td>${nombre || "Tecnico"}</td>
-                    <td>${especialidad}</td>
-                    <td>${fecha}</td>
-                    <td>${observaciones}</td>
-                    <td class="acciones">
-                        <button type="button" class="btn-icon btn-delete btn-mecanico-delete" data-mecanico-id="${mecanico.id}">
-                            <i class="fa-solid fa-user-minus"></i>
-                        </button>
-                    </td>
-                </tr>
-            `;
-        }).join("");
-
-        prepararAccionesMecanicos(mecanicoBody, ordenId);
-    } catch (error) {
+function renderizarMecanicos(mecanicoBody, asignaciones, ordenId, recargar) {
+    if (!asignaciones || asignaciones.length === 0) {
         mecanicoBody.innerHTML = `
             <tr>
-                <td colspan="5" class="servicios-empty">${error.message}</td>
+                <td colspan="5" class="servicios-empty">No hay tecnicos asignados.</td>
             </tr>
         `;
+        return;
     }
+
+    mecanicoBody.innerHTML = asignaciones.map((asignacion) => {
+        const mecanico = asignacion.mecanico || {};
+        const nombre = `${mecanico.nombres || ""} ${mecanico.apellidos || ""}`.trim();
+        const especialidad = mecanico.especialidad || "-";
+        const observaciones = asignacion.observaciones || "-";
+        const fecha = formatearFecha(asignacion.fecha_asignacion);
+
+        return `
+            <tr data-mecanico-id="${mecanico.id}">
+                <td>${nombre || "Tecnico"}</td>
+                <td>${especialidad}</td>
+                <td>${fecha}</td>
+                <td>${observaciones}</td>
+                <td class="acciones">
+                    <button type="button" class="btn-icon btn-delete btn-mecanico-delete" data-mecanico-id="${mecanico.id}">
+                        <i class="fa-solid fa-user-minus"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+    }).join("");
+
+    prepararAccionesMecanicos(mecanicoBody, ordenId, recargar);
 }
 
-function prepararAccionesMecanicos(mecanicoBody, ordenId) {
+function prepararAccionesMecanicos(mecanicoBody, ordenId, recargar) {
     mecanicoBody.querySelectorAll(".btn-mecanico-delete").forEach((boton) => {
         boton.addEventListener("click", () => {
             const mecanicoId = boton.dataset.mecanicoId;
@@ -687,7 +670,7 @@ function prepararAccionesMecanicos(mecanicoBody, ordenId) {
                         throw new Error(detalle || "No se pudo quitar el tecnico.");
                     }
 
-                    await cargarAsignacionesMecanicos(ordenId, mecanicoBody);
+                    await recargar();
                 } catch (error) {
                     Swal.fire({
                         icon: "error",
@@ -700,7 +683,7 @@ function prepararAccionesMecanicos(mecanicoBody, ordenId) {
     });
 }
 
-function prepararAccionesDetalle(detalleBody, ordenId, serviciosMap) {
+function prepararAccionesDetalle(detalleBody, recargar) {
     detalleBody.querySelectorAll(".btn-detalle-edit").forEach((boton) => {
         boton.addEventListener("click", async () => {
             const detalleId = boton.dataset.id;
@@ -739,8 +722,7 @@ function prepararAccionesDetalle(detalleBody, ordenId, serviciosMap) {
                     throw new Error(detalle || "No se pudo actualizar el servicio.");
                 }
 
-                await cargarDetalleOrden(ordenId, detalleBody, serviciosMap);
-                await refrescarOrden(ordenId, document.getElementById("orden-total"));
+                await recargar();
             } catch (error) {
                 Swal.fire({
                     icon: "error",
@@ -779,8 +761,7 @@ function prepararAccionesDetalle(detalleBody, ordenId, serviciosMap) {
                         throw new Error(detalle || "No se pudo eliminar el servicio.");
                     }
 
-                    await cargarDetalleOrden(ordenId, detalleBody, serviciosMap);
-                    await refrescarOrden(ordenId, document.getElementById("orden-total"));
+                    await recargar();
                 } catch (error) {
                     Swal.fire({
                         icon: "error",
@@ -794,8 +775,6 @@ function prepararAccionesDetalle(detalleBody, ordenId, serviciosMap) {
 }
 
 async function cargarInsumos(select) {
-    const mapa = {};
-
     try {
         const response = await fetch(`${API_BASE}/almacen/items`);
         if (!response.ok) {
@@ -806,11 +785,6 @@ async function cargarInsumos(select) {
         const activos = items.filter((item) => item.activo);
 
         activos.forEach((item) => {
-            mapa[item.id] = {
-                nombre: item.nombre,
-                valor: item.valor_taller
-            };
-
             const option = document.createElement("option");
             option.value = item.id;
             option.textContent = `${item.nombre} (${item.unidad}) - $${formatearPrecio(item.valor_taller)}`;
@@ -819,68 +793,43 @@ async function cargarInsumos(select) {
     } catch (error) {
         console.error(error);
     }
-
-    return mapa;
 }
 
-async function cargarDetalleInsumos(ordenId, insumoBody, insumosMap) {
-    try {
-        const response = await fetch(`${API_BASE}/detalle-almacen/orden/${ordenId}`);
-        if (!response.ok) {
-            throw new Error("No se pudo cargar el detalle de insumos.");
-        }
-
-        const detalles = await response.json();
-        const totalInsumos = detalles.reduce((acc, detalle) => acc + Number(detalle.subtotal || 0), 0);
-        window.__totalInsumos = totalInsumos;
-        actualizarTotalesDetalle(window.__totalServicios || 0, totalInsumos);
-
-        if (!detalles || detalles.length === 0) {
-            insumoBody.innerHTML = `
-                <tr>
-                    <td colspan="5" class="servicios-empty">No hay insumos agregados.</td>
-                </tr>
-            `;
-            window.__totalInsumos = 0;
-            actualizarTotalesDetalle(window.__totalServicios || 0, 0);
-            return;
-        }
-
-        insumoBody.innerHTML = detalles.map((detalle) => {
-            const item = insumosMap[detalle.item_id];
-            const nombre = item ? item.nombre : `Insumo #${detalle.item_id}`;
-            return `
-                <tr data-id="${detalle.id}">
-                    <td>${nombre}</td>
-                    <td>${detalle.cantidad}</td>
-                    <td>$${formatearPrecio(detalle.precio_unitario)}</td>
-                    <td>$${formatearPrecio(detalle.subtotal)}</td>
-                    <td class="acciones">
-                        <button type="button" class="btn-icon btn-edit btn-insumo-edit" data-id="${detalle.id}"
-                            data-cantidad="${detalle.cantidad}">
-                            <i class="fa-solid fa-pen-to-square"></i>
-                        </button>
-                        <button type="button" class="btn-icon btn-delete btn-insumo-delete" data-id="${detalle.id}">
-                            <i class="fa-solid fa-trash"></i>
-                        </button>
-                    </td>
-                </tr>
-            `;
-        }).join("");
-
-        prepararAccionesInsumos(insumoBody, ordenId, insumosMap);
-    } catch (error) {
+function renderizarInsumos(insumoBody, detalles, recargar) {
+    if (!detalles || detalles.length === 0) {
         insumoBody.innerHTML = `
             <tr>
-                <td colspan="5" class="servicios-empty">${error.message}</td>
+                <td colspan="5" class="servicios-empty">No hay insumos agregados.</td>
             </tr>
         `;
-        window.__totalInsumos = 0;
-        actualizarTotalesDetalle(window.__totalServicios || 0, 0);
+        return;
     }
+
+    insumoBody.innerHTML = detalles.map((detalle) => {
+        const nombre = detalle.item_nombre || `Insumo #${detalle.item_id}`;
+        return `
+            <tr data-id="${detalle.id}">
+                <td>${nombre}</td>
+                <td>${detalle.cantidad}</td>
+                <td>$${formatearPrecio(detalle.precio_unitario)}</td>
+                <td>$${formatearPrecio(detalle.subtotal)}</td>
+                <td class="acciones">
+                    <button type="button" class="btn-icon btn-edit btn-insumo-edit" data-id="${detalle.id}"
+                        data-cantidad="${detalle.cantidad}">
+                        <i class="fa-solid fa-pen-to-square"></i>
+                    </button>
+                    <button type="button" class="btn-icon btn-delete btn-insumo-delete" data-id="${detalle.id}">
+                        <i class="fa-solid fa-trash"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+    }).join("");
+
+    prepararAccionesInsumos(insumoBody, recargar);
 }
 
-function prepararAccionesInsumos(insumoBody, ordenId, insumosMap) {
+function prepararAccionesInsumos(insumoBody, recargar) {
     insumoBody.querySelectorAll(".btn-insumo-edit").forEach((boton) => {
         boton.addEventListener("click", async () => {
             const detalleId = boton.dataset.id;
@@ -920,8 +869,7 @@ function prepararAccionesInsumos(insumoBody, ordenId, insumosMap) {
                     throw new Error(detalle || "No se pudo actualizar el insumo.");
                 }
 
-                await cargarDetalleInsumos(ordenId, insumoBody, insumosMap);
-                await refrescarOrden(ordenId, document.getElementById("orden-total"));
+                await recargar();
             } catch (error) {
                 Swal.fire({
                     icon: "error",
@@ -960,8 +908,7 @@ function prepararAccionesInsumos(insumoBody, ordenId, insumosMap) {
                         throw new Error(detalle || "No se pudo eliminar el insumo.");
                     }
 
-                    await cargarDetalleInsumos(ordenId, insumoBody, insumosMap);
-                    await refrescarOrden(ordenId, document.getElementById("orden-total"));
+                    await recargar();
                 } catch (error) {
                     Swal.fire({
                         icon: "error",
@@ -974,24 +921,6 @@ function prepararAccionesInsumos(insumoBody, ordenId, insumosMap) {
     });
 }
 
-async function refrescarOrden(ordenId, totalLabel) {
-    if (!totalLabel) {
-        return;
-    }
-
-    try {
-        const response = await fetch(`${API_BASE}/ordenes/${ordenId}`);
-        if (!response.ok) {
-            return;
-        }
-
-        const data = await response.json();
-        totalLabel.textContent = `$${formatearPrecio(data.total || 0)}`;
-    } catch (error) {
-        console.error(error);
-    }
-}
-
 function formatearPrecio(valor) {
     return Number(valor).toLocaleString("es-CO", {
         minimumFractionDigits: 0,
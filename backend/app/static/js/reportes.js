@@ -9,11 +9,13 @@ document.addEventListener("DOMContentLoaded", () => {
     const btnLimpiar = document.getElementById("btn-limpiar-reportes");
     const btnPdf = document.getElementById("btn-pdf-ordenes");
     const btnExcel = document.getElementById("btn-excel-ingresos");
+    const btnCsv = document.getElementById("btn-csv-ingresos");
 
     btnAplicar?.addEventListener("click", aplicarFiltros);
     btnLimpiar?.addEventListener("click", () => limpiarFiltros(true));
     btnPdf?.addEventListener("click", descargarPdfOrdenes);
     btnExcel?.addEventListener("click", descargarExcelIngresos);
+    btnCsv?.addEventListener("click", () => descargarIngresos("csv", "ingresos_medinautos.csv"));
 
     cargarReportes();
 });
@@ -180,16 +182,104 @@ function descargarPdfOrdenes() {
         return;
     }
     const url = `${API_BASE}/reportes/ordenes-cerradas/pdf${armarQuery(desde, hasta)}`;
-    window.open(url, "_blank");
+    descargarDocumento(url, "ordenes_cerradas.pdf");
 }
 
+// El Excel se genera en el pool de documentos: pequeno llega directo y
+// grande como trabajo (202), igual que el PDF.
 function descargarExcelIngresos() {
     const { desde, hasta } = obtenerRango();
     if (!validarRango(desde, hasta)) {
         return;
     }
     const url = `${API_BASE}/reportes/ingresos/excel${armarQuery(desde, hasta)}`;
-    window.open(url, "_blank");
+    descargarDocumento(url, "ingresos_medinautos.xlsx");
+}
+
+// CSV y NDJSON llegan en streaming: se descargan con un enlace para que el
+// navegador escriba al disco sin armar un blob en memoria.
+function descargarIngresos(formato, nombreArchivo) {
+    const { desde, hasta } = obtenerRango();
+    if (!validarRango(desde, hasta)) {
+        return;
+    }
+    abrirDescarga(`${API_BASE}/reportes/ingresos/${formato}${armarQuery(desde, hasta)}`, nombreArchivo);
+}
+
+// Los reportes pequenos llegan directo (200). Los grandes se generan en
+// segundo plano (202): se consulta el trabajo hasta que este listo.
+async function descargarDocumento(url, nombreArchivo) {
+    try {
+        const response = await fetch(url);
+        if (response.status === 429) {
+            const error = await response.json().catch(() => ({}));
+            Swal.fire({
+                icon: "info",
+                title: "Generador ocupado",
+                text: error.detail || "Hay muchos documentos en cola, intente de nuevo en unos segundos."
+            });
+            return;
+        }
+        if (!response.ok) {
+            throw new Error("No se pudo generar el documento");
+        }
+        if (response.status === 202) {
+            const trabajo = await response.json();
+            await esperarTrabajo(trabajo);
+            return;
+        }
+        guardarArchivo(await response.blob(), nombreArchivo);
+    } catch (error) {
+        Swal.fire({ icon: "error", title: "Error", text: error.message });
+    }
+}
+
+async function esperarTrabajo(trabajo) {
+    Swal.fire({
+        title: "Generando documento",
+        text: textoTrabajo(trabajo),
+        allowOutsideClick: false,
+        didOpen: () => Swal.showLoading()
+    });
+
+    while (trabajo.estado === "en_cola" || trabajo.estado === "procesando") {
+        await new Promise(resolve => setTimeout(resolve, 1500));
+        const response = await fetch(trabajo.url_estado);
+        if (!response.ok) {
+            throw new Error("El trabajo ya no esta disponible");
+        }
+        trabajo = await response.json();
+        Swal.update({ text: textoTrabajo(trabajo) });
+        Swal.showLoading();
+    }
+
+    Swal.close();
+    if (trabajo.estado === "error") {
+        throw new Error(trabajo.error || "No se pudo generar el documento");
+    }
+    abrirDescarga(trabajo.url_descarga, trabajo.nombre_archivo);
+}
+
+function textoTrabajo(trabajo) {
+    if (trabajo.estado === "en_cola") {
+        return `En cola, posicion ${trabajo.posicion}...`;
+    }
+    return "Procesando...";
+}
+
+function abrirDescarga(url, nombreArchivo) {
+    const enlace = document.createElement("a");
+    enlace.href = url;
+    enlace.download = nombreArchivo;
+    document.body.appendChild(enlace);
+    enlace.click();
+    enlace.remove();
+}
+
+function guardarArchivo(blob, nombreArchivo) {
+    const url = URL.createObjectURL(blob);
+    abrirDescarga(url, nombreArchivo);
+    setTimeout(() => URL.revokeObjectURL(url), 1000);
 }
 
 function formatearMoneda(valor) {
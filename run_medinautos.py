@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 import threading
@@ -44,8 +45,16 @@ def main():
         log_level="info",
     )
     server = uvicorn.Server(config)
-    server.run()
+    try:
+        server.run()
+    finally:
+        # Deja todo el WAL dentro de medinautos.db antes de salir.
+        from backend.app.core.checkpoints import cerrar_base
+        cerrar_base()
 
 
 if __name__ == "__main__":
+    # El pool de renderizado usa procesos hijos; en el exe congelado
+    # freeze_support evita que cada hijo vuelva a levantar el servidor.
+    multiprocessing.freeze_support()
     main()